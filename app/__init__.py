@@ -29,19 +29,42 @@ def create_app(config_name='default'):
     jwt.init_app(app)
     ma.init_app(app)
     
+    from app.services.audit import audit
+    from app.services.catalog_cache import catalog_cache
+    from app.services.permissions import permissions
+    from app.services.principals import principals
+    from app.services.token_revocation import token_revocation
+    from app.utils.password_hashing import password_hasher
+    from app.utils.rate_limit import rate_limiter
+    from app.utils.response_cache import response_cache
+    audit.init_app(app)
+    catalog_cache.init_app(app)
+    permissions.init_app(app)
+    principals.init_app(app)
+    token_revocation.init_app(app)
+    response_cache.init_app(app)
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
+    
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.users import users_bp
     from app.routes.main import main_bp
     from app.routes.tickets import bp as tickets_bp
+    from app.routes.audit import audit_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(tickets_bp, url_prefix='/api/tickets')
+    app.register_blueprint(audit_bp, url_prefix='/api/audit')
     
     # Error handlers
     from app.utils.error_handlers import register_error_handlers
     register_error_handlers(app)
     
+    # Response compression (gzip / brotli)
+    from app.utils.compression import register_compression
+    register_compression(app)
+    
     return app
\ No newline at end of file
@@ -9,8 +9,12 @@ from .soporteplus_models import (
     EstadoTiquet,
     Usuario,
     Tiquet,
+    TiquetContador,
+    TiquetResumenDiario,
     Comentarios,
-    LogTransaccional
+    LogTransaccional,
+    LogTransaccionalArchivo,
+    TokenRevocado
 )
 
 __all__ = [
@@ -24,6 +28,10 @@ __all__ = [
     'EstadoTiquet',
     'Usuario',
     'Tiquet',
+    'TiquetContador',
+    'TiquetResumenDiario',
     'Comentarios',
-    'LogTransaccional'
+    'LogTransaccional',
+    'LogTransaccionalArchivo',
+    'TokenRevocado'
 ]
\ No newline at end of file
@@ -1,7 +1,7 @@
 from app import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, create_refresh_token
+from app.utils.password_hashing import password_hasher
+from flask_jwt_extended import create_refresh_token
 from datetime import timedelta
 
 
@@ -99,6 +99,11 @@ class EstadoTiquet(db.Model):
 class Usuario(db.Model):
     """Modelo para Usuario - Usuarios del sistema original"""
     __tablename__ = 'Usuario'
+    __table_args__ = (
+        # Unicidad garantizada por la BD; el login busca por email en el índice
+        db.Index('ux_usuario_email', 'email', unique=True),
+        db.Index('ux_usuario_nombre', 'Nombre', unique=True),
+    )
     
     ID_usuario = db.Column(db.Integer, primary_key=True, autoincrement=True)
     Nombre = db.Column(db.String(255), nullable=False)
@@ -108,19 +113,21 @@ class Usuario(db.Model):
     password = db.Column(db.String(255), nullable=False)
     
     def set_password(self, password):
-        """Establecer contraseña hasheada"""
-        self.password = generate_password_hash(password)
+        """Establecer contraseña hasheada (en el pool de procesos)"""
+        self.password = password_hasher.hash(password)
     
     def check_password(self, password):
-        """Verificar contraseña"""
-        return check_password_hash(self.password, password)
+        """Verificar contraseña (en el pool de procesos)"""
+        return password_hasher.verify(self.password, password)
+    
+    def password_needs_rehash(self):
+        """Verificar si el hash usa otro método o coste que el configurado"""
+        return password_hasher.needs_rehash(self.password)
     
     def get_tokens(self):
-        """Generar tokens JWT para el usuario"""
-        access_token = create_access_token(
-            identity=str(self.ID_usuario),
-            expires_delta=timedelta(hours=1)
-        )
+        """Generar tokens JWT para el usuario (con los claims de permisos de su rol)"""
+        from app.services.permissions import permissions  # evita el import circular
+        access_token = permissions.access_token(self.ID_usuario, self.ID_Rol)
         refresh_token = create_refresh_token(
             identity=str(self.ID_usuario),
             expires_delta=timedelta(days=30)
@@ -152,6 +159,19 @@ class Usuario(db.Model):
 class Tiquet(db.Model):
     """Modelo para Tiquet - Tickets del sistema"""
     __tablename__ = 'Tiquet'
+    __table_args__ = (
+        # Índices para los filtros y el orden del listado de tickets
+        db.Index('ix_tiquet_fecha_apertura_id', 'Fecha_apertura', 'Id_Tiquet'),
+        db.Index('ix_tiquet_estado_criticidad_fecha', 'Estado', 'Criticidad', 'Fecha_apertura'),
+        db.Index('ix_tiquet_user_asig_estado', 'User_asig', 'Estado'),
+        db.Index('ix_tiquet_categoria_fecha', 'Categoria', 'Fecha_apertura'),
+        db.Index('ix_tiquet_ubicacion_fecha', 'Ubicacion', 'Fecha_apertura'),
+        db.Index('ix_tiquet_estado_fecha_apertura', 'Estado', 'Fecha_apertura', 'Id_Tiquet'),
+        # Uno por cada ``?sort=``: (campo, Id_Tiquet) como el keyset
+        db.Index('ix_tiquet_fecha_cierre_id', 'Fecha_cierre', 'Id_Tiquet'),
+        db.Index('ix_tiquet_criticidad_id', 'Criticidad', 'Id_Tiquet'),
+        db.Index('ix_tiquet_estado_id', 'Estado', 'Id_Tiquet'),
+    )
     
     Id_Tiquet = db.Column(db.Integer, primary_key=True, autoincrement=True)
     Categoria = db.Column(db.Integer, db.ForeignKey('Cat_tiquet.Categoria'), nullable=True)
@@ -175,6 +195,42 @@ class Tiquet(db.Model):
         return f'<Tiquet {self.Id_Tiquet}>'
 
 
+class TiquetContador(db.Model):
+    """Modelo para Tiquet_contador - Conteo de tickets por estado y criticidad.
+
+    Se mantiene en la misma transacción que cada alta, cambio o baja de
+    tickets; ``Valor`` = 0 agrupa los tickets sin estado o criticidad.
+    """
+    __tablename__ = 'Tiquet_contador'
+    
+    Dimension = db.Column(db.String(20), primary_key=True)  # 'estado' o 'criticidad'
+    Valor = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    Cantidad = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<TiquetContador {self.Dimension}={self.Valor}: {self.Cantidad}>'
+
+
+class TiquetResumenDiario(db.Model):
+    """Modelo para Tiquet_resumen_diario - Tickets abiertos y cerrados por día.
+
+    Una fila por fecha x estado x criticidad x categoría (0 = sin asignar),
+    mantenida junto con Tiquet_contador a partir de Fecha_apertura y
+    Fecha_cierre.
+    """
+    __tablename__ = 'Tiquet_resumen_diario'
+    
+    Fecha = db.Column(db.Date, primary_key=True)
+    Estado = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    Criticidad = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    Categoria = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    Abiertos = db.Column(db.Integer, nullable=False, default=0)
+    Cerrados = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<TiquetResumenDiario {self.Fecha}>'
+
+
 class Comentarios(db.Model):
     """Modelo para Comentarios - Comentarios de tickets"""
     __tablename__ = 'Comentarios'
@@ -187,6 +243,11 @@ class Comentarios(db.Model):
     Id_Tiquet = db.Column(db.Integer, db.ForeignKey('Tiquet.Id_Tiquet'), nullable=True)
     Fecha = db.Column(db.Date, nullable=True)
     
+    __table_args__ = (
+        # Comentarios de un ticket en orden (paginación por cursor) y conteos
+        db.Index('ix_comentarios_tiquet_fecha', 'Id_Tiquet', 'Fecha', 'ID_comentario'),
+    )
+    
     # Relaciones
     usuario_rel = db.relationship('Usuario', backref='comentarios')
     tiquet_rel = db.relationship('Tiquet', backref='comentarios')
@@ -200,14 +261,56 @@ class LogTransaccional(db.Model):
     __tablename__ = 'Log_transaccional'
     
     Id_log = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    Usuario = db.Column(db.Integer, db.ForeignKey('Usuario.ID_usuario'), nullable=True)
-    Tiquet = db.Column(db.Integer, db.ForeignKey('Tiquet.Id_Tiquet'), nullable=True)
+    # Sin llaves foráneas: el historial conserva los ids de tickets y
+    # usuarios eliminados
+    Usuario = db.Column(db.Integer, nullable=True)
+    Tiquet = db.Column(db.Integer, nullable=True)
     Accion = db.Column(db.String(255), nullable=True)
-    # Fecha = db.Column(db.DateTime, default=datetime.utcnow)  # Comentado temporalmente - verificar nombre real en BD
+    Fecha = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Historial de un ticket y actividad de un usuario por rango de fechas
+        db.Index('ix_log_tiquet_fecha', 'Tiquet', 'Fecha', 'Id_log'),
+        db.Index('ix_log_usuario_fecha', 'Usuario', 'Fecha', 'Id_log'),
+    )
+    
+    # Relaciones de solo lectura: borrar un ticket o usuario no toca sus entradas
+    usuario_rel = db.relationship(
+        'Usuario', primaryjoin='foreign(LogTransaccional.Usuario) == Usuario.ID_usuario', viewonly=True
+    )
+    tiquet_rel = db.relationship(
+        'Tiquet', primaryjoin='foreign(LogTransaccional.Tiquet) == Tiquet.Id_Tiquet', viewonly=True
+    )
     
-    # Relaciones
-    usuario_rel = db.relationship('Usuario', backref='logs')
-    tiquet_rel = db.relationship('Tiquet', backref='logs')
+    def __repr__(self):
+        return f'<LogTransaccional {self.Id_log}>'
+
+
+class LogTransaccionalArchivo(db.Model):
+    """Modelo para Log_transaccional_archivo - Entradas de auditoría antiguas.
+
+    Mismas columnas que Log_transaccional pero sin llaves foráneas, para que
+    el archivo sobreviva a los tickets y usuarios eliminados.
+    """
+    __tablename__ = 'Log_transaccional_archivo'
+    
+    Id_log = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    Usuario = db.Column(db.Integer, nullable=True)
+    Tiquet = db.Column(db.Integer, nullable=True)
+    Accion = db.Column(db.String(255), nullable=True)
+    Fecha = db.Column(db.DateTime, nullable=True, index=True)
+    
+    def __repr__(self):
+        return f'<LogTransaccionalArchivo {self.Id_log}>'
+
+class TokenRevocado(db.Model):
+    """Modelo para Token_revocado - JWT revocados (logout) hasta su expiración"""
+    __tablename__ = 'Token_revocado'
+    
+    Jti = db.Column(db.String(36), primary_key=True)
+    ID_usuario = db.Column(db.Integer, nullable=True)
+    Expira = db.Column(db.DateTime, nullable=False, index=True)
+    Fecha = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     def __repr__(self):
-        return f'<LogTransaccional {self.Id_log}>'
\ No newline at end of file
+        return f'<TokenRevocado {self.Jti}>'
\ No newline at end of file
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from marshmallow import Schema, fields
+
+from app.models.soporteplus_models import LogTransaccional
+from app.services import BaseService, InvalidCursorError
+from app.services.permissions import requires_permission
+from app.utils.params import parse_fecha, parse_limit
+
+audit_bp = Blueprint('audit', __name__)
+
+# Más recientes primero; Id_log desempata entradas del mismo instante
+LOG_KEYSET = (LogTransaccional.Fecha, LogTransaccional.Id_log)
+
+
+class LogTransaccionalSchema(Schema):
+    """Schema para entradas de auditoría"""
+    Id_log = fields.Int(dump_only=True)
+    Usuario = fields.Int(dump_only=True)
+    Tiquet = fields.Int(dump_only=True)
+    Accion = fields.Str(dump_only=True)
+    Fecha = fields.Raw(dump_only=True)
+
+
+logs_schema = LogTransaccionalSchema(many=True)
+
+
+def _log_page(column, value):
+    """Página de entradas con ``column == value`` usando su índice (columna, Fecha)"""
+    try:
+        limit = parse_limit()
+        query = LogTransaccional.query.filter(column == value)
+        if request.args.get('desde'):
+            query = query.filter(LogTransaccional.Fecha >= parse_fecha(request.args['desde'], 'desde'))
+        if request.args.get('hasta'):
+            hasta = parse_fecha(request.args['hasta'], 'hasta') + timedelta(days=1)
+            query = query.filter(LogTransaccional.Fecha < hasta)
+        entries, next_cursor = BaseService.paginate_keyset(
+            query, LOG_KEYSET,
+            cursor=request.args.get('cursor'),
+            limit=limit,
+            descending=True
+        )
+    except (ValueError, InvalidCursorError) as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    return jsonify({
+        'status': 'success',
+        'data': logs_schema.dump(entries),
+        'limit': limit,
+        'next_cursor': next_cursor
+    })
+
+
+@audit_bp.route('/tickets/<int:ticket_id>', methods=['GET'])
+@jwt_required()
+@requires_permission('auditoria.ver')
+def get_ticket_log(ticket_id):
+    """Historial de un ticket, del más reciente al más antiguo.
+
+    Admite ``desde`` y ``hasta`` (dd-mm-yyyy) y paginación por cursor con
+    ``limit`` y ``cursor``. Requiere ``auditoria.ver``.
+    """
+    try:
+        return _log_page(LogTransaccional.Tiquet, ticket_id)
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+
+@audit_bp.route('/users/<int:user_id>', methods=['GET'])
+@jwt_required()
+@requires_permission('auditoria.ver')
+def get_user_log(user_id):
+    """Acciones de un usuario, de la más reciente a la más antigua.
+
+    Mismos parámetros que el historial de un ticket. Requiere ``auditoria.ver``.
+    """
+    try:
+        return _log_page(LogTransaccional.Usuario, user_id)
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
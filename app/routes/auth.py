@@ -1,9 +1,17 @@
+from datetime import datetime
+
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import current_user, decode_token, get_jwt, jwt_required
 from marshmallow import Schema, fields, ValidationError
+from sqlalchemy.exc import IntegrityError
 
 from app import db
 from app.models.soporteplus_models import Usuario  # Usar el modelo Usuario real
+from app.services.audit import audit
+from app.services.permissions import permissions
+from app.services.token_revocation import token_revocation
+from app.utils.error_handlers import unique_error
+from app.utils.rate_limit import rate_limiter
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -23,6 +31,7 @@ class LoginSchema(Schema):
 
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limiter.limit('register')
 def register():
     """Register a new user."""
     schema = RegisterSchema()
@@ -32,22 +41,22 @@ def register():
     except ValidationError as err:
         return jsonify({'errors': err.messages}), 400
     
-    # Check if user already exists by email (more reliable than name)
-    if Usuario.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
-    
-    # Check if name already exists (optional check)
-    if Usuario.query.filter_by(Nombre=data['nombre']).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    
-    # Create new user
+    # Create new user; the unique indexes reject duplicate emails and names
     user = Usuario(
         Nombre=data['nombre'],
         email=data['email'],
         ID_Rol=data['ID_Rol']
     )
     user.set_password(data['password'])
-    user.save()
+    try:
+        user.save()
+    except IntegrityError as e:
+        db.session.rollback()
+        message = unique_error(e)
+        if message is None:
+            raise
+        return jsonify({'error': message}), 400
+    audit.log('usuario.registrar', usuario=user.ID_usuario)
     
     # Generate tokens
     tokens = user.get_tokens()
@@ -66,6 +75,7 @@ def register():
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limiter.limit('login')
 def login():
     """Login user."""
     schema = LoginSchema()
@@ -84,6 +94,11 @@ def login():
     if not user.is_active:
         return jsonify({'error': 'Account is deactivated'}), 401
     
+    # Upgrade hashes made with an older method or cost while we have the password
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+        db.session.commit()
+    
     # Generate tokens
     tokens = user.get_tokens()
     
@@ -100,19 +115,53 @@ def login():
     })
 
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Issue a new access token with the user's current role and permissions."""
+    access_token = permissions.access_token(current_user.ID_usuario, current_user.ID_Rol)
+    return jsonify({'access_token': access_token})
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """Revoke the presented token and, if sent in the body, the refresh token."""
+    claims = get_jwt()
+    to_revoke = [claims]
+    
+    refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+    if refresh_token:
+        try:
+            refresh_claims = decode_token(refresh_token)
+        except Exception:
+            return jsonify({'error': 'Invalid refresh token'}), 400
+        if refresh_claims['type'] != 'refresh' or refresh_claims['sub'] != claims['sub']:
+            return jsonify({'error': 'Invalid refresh token'}), 400
+        to_revoke.append(refresh_claims)
+    
+    for token in to_revoke:
+        token_revocation.revoke(
+            token['jti'], datetime.utcfromtimestamp(token['exp']), current_user.ID_usuario
+        )
+    audit.log('usuario.logout', usuario=current_user.ID_usuario)
+    
+    return jsonify({
+        'message': 'Logout successful',
+        'revoked': [token['type'] for token in to_revoke]
+    })
+
+
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
     """Get current user information."""
-    user_id = int(get_jwt_identity())  # Convertir de string a int
-    user = Usuario.query.get_or_404(user_id)
-    
     return jsonify({
         'user': {
-            'id': user.ID_usuario,
-            'nombre': user.Nombre,
-            'email': user.email,
-            'ID_Rol': user.ID_Rol,
-            'is_admin': user.is_admin
+            'id': current_user.ID_usuario,
+            'nombre': current_user.Nombre,
+            'email': current_user.email,
+            'ID_Rol': current_user.ID_Rol,
+            'is_admin': current_user.is_admin
         }
     })
\ No newline at end of file
@@ -1,4 +1,13 @@
 from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+
+from app.services.audit import audit
+from app.services.permissions import requires_permission
+from app.services.principals import principals
+from app.services.token_revocation import token_revocation
+from app.utils.password_hashing import password_hasher
+from app.utils.rate_limit import rate_limiter
+from app.utils.response_cache import response_cache
 
 main_bp = Blueprint('main', __name__)
 
@@ -19,4 +28,22 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'Service is running normally'
-    })
\ No newline at end of file
+    })
+
+
+@main_bp.route('/metrics')
+@jwt_required()
+@requires_permission('metricas.ver')
+def metrics():
+    """Per-worker cache, audit writer, hashing, revocation and rate limit metrics.
+
+    Requires ``metricas.ver`` (admins always pass).
+    """
+    return jsonify({
+        'response_cache': response_cache.stats(),
+        'audit': audit.stats(),
+        'password_hashing': password_hasher.stats(),
+        'principals': principals.stats(),
+        'token_revocation': token_revocation.stats(),
+        'rate_limit': rate_limiter.stats()
+    })
@@ -1,13 +1,18 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy.orm import joinedload
-from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import current_user, jwt_required, get_jwt_identity
+from sqlalchemy.orm import load_only
+from datetime import datetime, timedelta
 from app import db
-from app.models.soporteplus_models import (
-    Tiquet, CatTiquet, EstadoTiquet, CatalogoCriticidad,
-    Ubicaciones, Usuario, Comentarios
-)
-from marshmallow import Schema, fields, pre_load, ValidationError
+from app.models.soporteplus_models import Tiquet, CatTiquet, Usuario, Comentarios
+from app.services import BaseService, InvalidCursorError
+from app.services import ticket_search, ticket_stats
+from app.services.audit import audit
+from app.services.catalog_cache import catalog_cache
+from app.utils.fast_serializer import compile_serializer
+from app.utils.http_cache import conditional_json
+from app.utils.params import parse_fecha, parse_limit
+from app.utils.response_cache import response_cache
+from marshmallow import Schema, fields, pre_load, validate, ValidationError
 
 bp = Blueprint('tickets', __name__)
 
@@ -34,7 +39,7 @@ class TiquetSchema(Schema):
     usuario_asignado = fields.Nested('UsuarioSchema', dump_only=True)
     
     @pre_load
-    def convert_date_format(self, data, **kwargs):
+    def convert_date_format(self, data, partial=False, **kwargs):
         """Convierte fecha de dd-mm-yyyy a yyyy-mm-dd para la base de datos"""
         if 'fecha_apertura_input' in data and data['fecha_apertura_input']:
             try:
@@ -46,8 +51,9 @@ class TiquetSchema(Schema):
                 del data['fecha_apertura_input']
             except ValueError:
                 raise ValidationError('Fecha debe estar en formato dd-mm-yyyy', 'fecha_apertura_input')
-        elif 'Fecha_apertura' not in data or data.get('Fecha_apertura') is None:
-            # Si no se proporciona fecha, usar fecha actual
+        elif not partial and data.get('Fecha_apertura') is None:
+            # Si no se proporciona fecha al crear, usar fecha actual
+            # (en actualizaciones parciales se conserva la del ticket)
             data['Fecha_apertura'] = datetime.utcnow().date()
         return data
 
@@ -86,6 +92,25 @@ class UsuarioSchema(Schema):
     ID_Rol = fields.Int(allow_none=True)
 
 
+
+class ComentarioSchema(Schema):
+    """Schema para comentarios de tickets"""
+    ID_comentario = fields.Int(dump_only=True)
+    mensaje = fields.Str(required=True, validate=validate.Length(min=1, max=255))
+    Tipo = fields.Str(allow_none=True, validate=validate.OneOf(['Usuario', 'tecnico']))
+    Satisfaccion = fields.Int(allow_none=True)
+    usuario = fields.Int(dump_only=True)
+    Id_Tiquet = fields.Int(dump_only=True)
+    Fecha = fields.Raw(dump_only=True)  # Se establece al crear el comentario
+
+
+class BulkPatchSchema(Schema):
+    """Campos que se pueden cambiar en una actualización masiva"""
+    User_asig = fields.Int(allow_none=True)
+    Estado = fields.Int(allow_none=True)
+    Criticidad = fields.Int(allow_none=True)
+    Categoria = fields.Int(allow_none=True)
+
 # Instanciar schemas
 tiquet_schema = TiquetSchema()
 tiquets_schema = TiquetSchema(many=True)
@@ -97,26 +122,391 @@ criticidad_schema = CatalogoCriticidadSchema()
 criticidades_schema = CatalogoCriticidadSchema(many=True)
 ubicacion_schema = UbicacionesSchema()
 ubicaciones_schema = UbicacionesSchema(many=True)
+bulk_patch_schema = BulkPatchSchema()
+comentario_schema = ComentarioSchema()
+
+
+# Orden estable para la paginación por cursor (el último campo es único)
+TICKET_KEYSET = (Tiquet.Fecha_apertura, Tiquet.Id_Tiquet)
+
+# Filtros por id admitidos en el query string (``?estado=1,2``)
+TICKET_FILTERS = {
+    'estado': Tiquet.Estado,
+    'criticidad': Tiquet.Criticidad,
+    'user_asig': Tiquet.User_asig,
+    'categoria': Tiquet.Categoria,
+    'ubicacion': Tiquet.Ubicacion,
+}
+
+# Campos escalares que se pueden pedir con ``?fields=``
+TICKET_FIELDS = (
+    'Id_Tiquet', 'Categoria', 'Tel_ext', 'Ubicacion', 'Criticidad',
+    'Descripcion', 'User_asig', 'Estado', 'Fecha_apertura', 'Fecha_cierre'
+)
+
+# Relaciones que se pueden pedir con ``?include=``
+TICKET_INCLUDES = {
+    'categoria_rel': Tiquet.categoria_rel,
+    'ubicacion_rel': Tiquet.ubicacion_rel,
+    'criticidad_rel': Tiquet.criticidad_rel,
+    'usuario_asignado': Tiquet.usuario_asignado,
+    'estado_rel': Tiquet.estado_rel,
+}
+
+# Todo lo que se puede pedir con ``?include=``: relaciones y el conteo de comentarios
+INCLUDE_NAMES = tuple(TICKET_INCLUDES) + ('comment_count',)
+
+# Relaciones que se resuelven en memoria desde la caché de catálogos en
+# lugar de con un JOIN: relación -> (catálogo, columna FK)
+CATALOG_INCLUDES = {
+    'categoria_rel': ('categorias', 'Categoria'),
+    'ubicacion_rel': ('ubicaciones', 'Ubicacion'),
+    'criticidad_rel': ('criticidades', 'Criticidad'),
+    'estado_rel': ('estados', 'Estado'),
+}
+
+# El usuario asignado no es un catálogo (la tabla crece con los usuarios):
+# se resuelve con una consulta por lotes con los ids de la página, o con
+# un JOIN en el stream
+USUARIO_COLUMNS = (Usuario.ID_usuario, Usuario.Nombre, Usuario.ID_Rol)
+
+# Orden de los comentarios de un ticket (el último campo es único)
+COMENTARIO_KEYSET = (Comentarios.Fecha, Comentarios.ID_comentario)
+
+# Campos por los que se puede ordenar (``?sort=-Fecha_apertura``)
+TICKET_SORTS = {
+    'Fecha_apertura': Tiquet.Fecha_apertura,
+    'Fecha_cierre': Tiquet.Fecha_cierre,
+    'Criticidad': Tiquet.Criticidad,
+    'Estado': Tiquet.Estado,
+    'Id_Tiquet': Tiquet.Id_Tiquet,
+}
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Filas por INSERT de varias filas en la creación masiva (MySQL)
+BULK_INSERT_CHUNK = 500
+
+# group_by de /dashboard/timeseries -> catálogo con los nombres
+TIMESERIES_GROUPS = {
+    'estado': 'estados',
+    'criticidad': 'criticidades',
+    'categoria': 'categorias',
+}
+
+
+def _tickets_query(fields=TICKET_FIELDS, include=tuple(TICKET_INCLUDES), keyset=()):
+    """Query base de tickets que carga solo los campos pedidos.
+
+    No se hace JOIN con ninguna relación: basta con sus FK, que se cargan
+    siempre que se pide la relación, igual que las columnas de ``keyset``
+    para poder armar el cursor.
+    """
+    options = []
+    if tuple(fields) != TICKET_FIELDS:
+        names = list(fields)
+        extra = [c.key for c in keyset]
+        extra += [CATALOG_INCLUDES[name][1] for name in include if name in CATALOG_INCLUDES]
+        if 'usuario_asignado' in include:
+            extra.append('User_asig')
+        names += [name for name in dict.fromkeys(extra) if name not in names]
+        options.append(load_only(*[getattr(Tiquet, name) for name in names]))
+    return Tiquet.query.options(*options)
+
+
+def _parse_names(value, allowed, name):
+    """Separar ``a,b,c`` validando contra la lista permitida"""
+    names = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item or item in names:
+            continue
+        if item not in allowed:
+            raise ValueError(f'{name} debe contener solo: {", ".join(allowed)}')
+        names.append(item)
+    return tuple(names)
+
+
+def _parse_fieldset(params):
+    """Devolver (campos, relaciones) según ``?fields=`` e ``?include=``.
+
+    Sin ninguno de los dos se devuelve todo, como antes. Con ``fields`` y
+    sin ``include`` no se carga ninguna relación.
+    """
+    fields = params.get('fields')
+    include = params.get('include')
+    if fields is None and include is None:
+        return TICKET_FIELDS, INCLUDE_NAMES
+    
+    fields = _parse_names(fields, TICKET_FIELDS, 'fields') if fields else TICKET_FIELDS
+    include = _parse_names(include, INCLUDE_NAMES, 'include') if include else ()
+    return fields, include
+
+
+def _ticket_dumper(fields=TICKET_FIELDS, include=tuple(TICKET_INCLUDES), reload_missing=True):
+    """Función que serializa un ticket con los campos y relaciones pedidos.
+
+    Usa el serializador precompilado de TiquetSchema (misma salida que
+    ``dump``). Las relaciones de catálogo se toman de la caché con la FK del
+    ticket, con la misma forma que produciría el schema anidado. Los
+    catálogos se leen al crear la función; un id que no está se busca con
+    ``catalog_cache.get`` (que recarga el catálogo) salvo con
+    ``reload_missing=False``, para los streams, donde una consulta a mitad
+    del cursor cortaría el resultado. ``usuario_asignado`` lo añaden
+    ``_dump_tickets`` y ``_stream_tickets``.
+    """
+    catalogs = [
+        (name, catalog_cache.by_id(CATALOG_INCLUDES[name][0])) + CATALOG_INCLUDES[name]
+        for name in include if name in CATALOG_INCLUDES
+    ]
+    serialize = compile_serializer(TiquetSchema, tuple(fields))
+    
+    def dump(ticket):
+        data = serialize(ticket)
+        for name, items, catalog, column in catalogs:
+            value = getattr(ticket, column)
+            item = items.get(value)
+            if item is None and value is not None and reload_missing:
+                item = catalog_cache.get(catalog, value)
+            data[name] = item
+        return data
+    return dump
+
+
+def _comment_counts(ticket_ids):
+    """Comentarios por ticket con una sola consulta agrupada.
+    
+    ``ticket_ids`` es la lista de ids de una página o un select de ids
+    (los tickets filtrados de un listado completo).
+    """
+    if isinstance(ticket_ids, (list, tuple)) and not ticket_ids:
+        return {}
+    query = (
+        db.select(Comentarios.Id_Tiquet, db.func.count())
+        .where(Comentarios.Id_Tiquet.in_(ticket_ids))
+        .group_by(Comentarios.Id_Tiquet)
+    )
+    return dict(db.session.execute(query).all())
+
+
+def _usuarios(user_ids):
+    """Datos públicos de los usuarios con esos ids, con una sola consulta"""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return {}
+    rows = db.session.execute(
+        db.select(*USUARIO_COLUMNS).where(Usuario.ID_usuario.in_(user_ids))
+    ).all()
+    return {row.ID_usuario: dict(row._mapping) for row in rows}
+
+
+def _dump_tickets(tickets, dump, include, counts=None):
+    """Serializar tickets añadiendo ``usuario_asignado`` y ``comment_count`` si se pidieron"""
+    usuarios = None
+    if 'usuario_asignado' in include:
+        usuarios = _usuarios([ticket.User_asig for ticket in tickets])
+    if 'comment_count' in include and counts is None:
+        counts = _comment_counts([ticket.Id_Tiquet for ticket in tickets])
+    data = []
+    for ticket in tickets:
+        item = dump(ticket)
+        if usuarios is not None:
+            item['usuario_asignado'] = usuarios.get(ticket.User_asig)
+        if 'comment_count' in include:
+            item['comment_count'] = counts.get(ticket.Id_Tiquet, 0)
+        data.append(item)
+    return data
+
+
+def _audit(accion, tiquet=None):
+    """Encolar una entrada de auditoría a nombre del usuario autenticado"""
+    audit.log(accion, tiquet=tiquet, usuario=int(get_jwt_identity()))
+
+
+def _parse_ids(value, name):
+    """Convertir ``1,2,3`` (o una lista JSON) en una lista de enteros"""
+    if isinstance(value, (list, tuple)):
+        items = value
+    elif isinstance(value, int):
+        items = [value]
+    else:
+        items = str(value).split(',')
+    try:
+        return [int(item) for item in items if str(item).strip()]
+    except ValueError:
+        raise ValueError(f'{name} debe ser una lista de ids enteros')
+
+
+def _filter_tickets(query, params):
+    """Aplicar los filtros de TICKET_FILTERS y el rango de Fecha_apertura"""
+    for name, column in TICKET_FILTERS.items():
+        if params.get(name) in (None, ''):
+            continue
+        ids = _parse_ids(params.get(name), name)
+        query = query.filter(column == ids[0] if len(ids) == 1 else column.in_(ids))
+    
+    if params.get('fecha_desde'):
+        query = query.filter(Tiquet.Fecha_apertura >= parse_fecha(params['fecha_desde'], 'fecha_desde'))
+    if params.get('fecha_hasta'):
+        query = query.filter(Tiquet.Fecha_apertura <= parse_fecha(params['fecha_hasta'], 'fecha_hasta'))
+    return query
+
+
+def _parse_sort(params):
+    """Devolver (columnas del keyset, descendente) según ``?sort=``"""
+    sort = params.get('sort')
+    if not sort:
+        return TICKET_KEYSET, False
+    
+    descending = sort.startswith('-')
+    name = sort.lstrip('-')
+    if name not in TICKET_SORTS:
+        raise ValueError(f'sort debe ser uno de: {", ".join(TICKET_SORTS)}')
+    column = TICKET_SORTS[name]
+    if column is Tiquet.Id_Tiquet:
+        return (Tiquet.Id_Tiquet,), descending
+    return (column, Tiquet.Id_Tiquet), descending
+
+
+def _parse_bulk_ids(value):
+    """Lista de ids del cuerpo de un endpoint masivo, sin duplicados"""
+    if value in (None, '', []):
+        raise ValueError('Se requiere una lista de ids')
+    ids = list(dict.fromkeys(_parse_ids(value, 'ids')))
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(ids) > max_items:
+        raise ValueError(f'No se pueden procesar más de {max_items} tickets por petición')
+    return ids
+
+
+def _wants_stream():
+    """El cliente pide NDJSON con ``?stream=1`` o ``Accept: application/x-ndjson``"""
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def _stream_tickets(query, dump, include):
+    """Generar los tickets como NDJSON por bloques sin materializar el resultado.
+    
+    ``yield_per`` usa cursores del lado del servidor y cada ticket se saca
+    de la sesión al serializarlo para que la memoria no crezca. ``query``
+    debe venir ya ordenada. Mientras el cursor está abierto no se puede
+    lanzar otra consulta en la misma conexión (en MySQL descarta el resto
+    del resultado), así que ``usuario_asignado`` y ``comment_count`` vienen
+    en el mismo SELECT.
+    """
+    chunk_size = current_app.config['STREAM_CHUNK_SIZE']
+    json = current_app.json
+    statement = query.statement
+    assigned = 'usuario_asignado' in include
+    if assigned:
+        statement = statement.outerjoin(
+            Usuario, Usuario.ID_usuario == Tiquet.User_asig
+        ).add_columns(*(column.label(f'asignado_{column.key}') for column in USUARIO_COLUMNS))
+    counted = 'comment_count' in include
+    if counted:
+        counts = (
+            db.select(Comentarios.Id_Tiquet, db.func.count().label('total'))
+            .group_by(Comentarios.Id_Tiquet)
+            .subquery()
+        )
+        statement = statement.outerjoin(
+            counts, counts.c.Id_Tiquet == Tiquet.Id_Tiquet
+        ).add_columns(db.func.coalesce(counts.c.total, 0).label('comment_count'))
+    rows = db.session.execute(statement.execution_options(yield_per=chunk_size))
+    
+    lines = []
+    for row in rows:
+        ticket = row[0]
+        item = dump(ticket)
+        if assigned:
+            item['usuario_asignado'] = None if row.asignado_ID_usuario is None else {
+                column.key: row._mapping[f'asignado_{column.key}'] for column in USUARIO_COLUMNS
+            }
+        if counted:
+            item['comment_count'] = row.comment_count
+        lines.append(json.dumps(item, separators=(',', ':')))
+        db.session.expunge(ticket)
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
 
 
 @bp.route('/tickets', methods=['GET'])
 @jwt_required()
 def get_tickets():
-    """Obtener todos los tickets con sus relaciones cargadas"""
+    """Obtener tickets con sus relaciones cargadas.
+
+    Admite filtros (``estado``, ``criticidad``, ``user_asig``, ``categoria``,
+    ``ubicacion``, ``fecha_desde``, ``fecha_hasta``), ``sort``, ``fields`` e
+    ``include`` (solo se resuelven las relaciones pedidas). Sin ``limit``
+    ni ``cursor`` devuelve todos los tickets; con ellos pagina por keyset
+    sobre (campo de orden, Id_Tiquet): cada página cuesta lo mismo que la
+    primera y la respuesta incluye ``next_cursor``. Con ``?stream=1`` o
+    ``Accept: application/x-ndjson`` envía todos los tickets, uno por línea;
+    en ese modo ``limit`` y ``cursor`` se rechazan con 400.
+    """
     try:
-        # Cargar tickets con todas sus relaciones usando joinedload
-        tickets = Tiquet.query.options(
-            joinedload(Tiquet.categoria_rel),
-            joinedload(Tiquet.ubicacion_rel),
-            joinedload(Tiquet.criticidad_rel),
-            joinedload(Tiquet.usuario_asignado),
-            joinedload(Tiquet.estado_rel)
-        ).all()
+        try:
+            keyset, descending = _parse_sort(request.args)
+            fields, include = _parse_fieldset(request.args)
+            query = _filter_tickets(_tickets_query(fields, include, keyset), request.args)
+            paginate = 'cursor' in request.args or 'limit' in request.args
+            stream = _wants_stream()
+            if stream and paginate:
+                raise ValueError('limit y cursor no se admiten con stream')
+            limit = parse_limit() if paginate else None
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        dump = _ticket_dumper(fields, include, reload_missing=not stream)
+        order = BaseService.keyset_order(keyset, descending, db.session.get_bind().dialect)
+        if stream:
+            return Response(
+                stream_with_context(_stream_tickets(query.order_by(*order), dump, include)),
+                mimetype=NDJSON_MIMETYPE
+            )
+        
+        if not paginate:
+            if 'sort' in request.args:
+                query = query.order_by(*order)
+            tickets = query.all()
+            return jsonify({
+                'status': 'success',
+                'data': _dump_tickets(
+                    tickets, dump, include,
+                    # Conteos solo de los tickets filtrados, con el filtro en SQL
+                    _comment_counts(_filter_tickets(db.select(Tiquet.Id_Tiquet), request.args))
+                    if 'comment_count' in include else None
+                ),
+                'total': len(tickets)
+            })
+        
+        try:
+            tickets, next_cursor = BaseService.paginate_keyset(
+                query, keyset,
+                cursor=request.args.get('cursor'),
+                limit=limit,
+                descending=descending
+            )
+        except InvalidCursorError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
         
         return jsonify({
             'status': 'success',
-            'data': tiquets_schema.dump(tickets),
-            'total': len(tickets)
+            'data': _dump_tickets(tickets, dump, include),
+            'limit': limit,
+            'next_cursor': next_cursor
         })
     except Exception as e:
         return jsonify({
@@ -125,19 +515,72 @@ def get_tickets():
         }), 500
 
 
+@bp.route('/tickets/search', methods=['GET'])
+@jwt_required()
+def search_tickets():
+    """Buscar tickets por palabras de la descripción.
+
+    ``?q=`` con una o más palabras (deben aparecer todas), ordenados por
+    relevancia y paginados con ``page`` y ``per_page``. Admite ``fields`` e
+    ``include`` como ``GET /tickets``.
+    """
+    try:
+        q = request.args.get('q', '').strip()
+        if not ticket_search.parse_terms(q):
+            raise ValueError('q debe contener al menos una palabra')
+        try:
+            page = int(request.args.get('page', 1))
+            per_page = int(request.args.get('per_page', current_app.config['POSTS_PER_PAGE']))
+        except ValueError:
+            raise ValueError('page y per_page deben ser números enteros')
+        if page < 1 or per_page < 1:
+            raise ValueError('page y per_page deben ser mayores que 0')
+        per_page = min(per_page, current_app.config['MAX_PER_PAGE'])
+        fields, include = _parse_fieldset(request.args)
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    try:
+        ids, total = ticket_search.search(q, page, per_page)
+        tickets = _tickets_query(fields, include).filter(Tiquet.Id_Tiquet.in_(ids)).all() if ids else []
+        # Devolver en el orden de relevancia del índice
+        position = {ticket_id: index for index, ticket_id in enumerate(ids)}
+        tickets.sort(key=lambda ticket: position[ticket.Id_Tiquet])
+        dump = _ticket_dumper(fields, include)
+        
+        return jsonify({
+            'status': 'success',
+            'data': _dump_tickets(tickets, dump, include),
+            'total': total,
+            'page': page,
+            'per_page': per_page
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al buscar tickets: {str(e)}'
+        }), 500
+
+
 @bp.route('/tickets/<int:ticket_id>', methods=['GET'])
 @jwt_required()
 def get_ticket(ticket_id):
-    """Obtener un ticket específico con sus relaciones cargadas"""
+    """Obtener un ticket específico; admite ``fields`` e ``include``"""
     try:
-        # Cargar ticket específico con todas sus relaciones
-        ticket = Tiquet.query.options(
-            joinedload(Tiquet.categoria_rel),
-            joinedload(Tiquet.ubicacion_rel),
-            joinedload(Tiquet.criticidad_rel),
-            joinedload(Tiquet.usuario_asignado),
-            joinedload(Tiquet.estado_rel)
-        ).filter_by(Id_Tiquet=ticket_id).first()
+        try:
+            fields, include = _parse_fieldset(request.args)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        # Cargar ticket específico con las relaciones pedidas
+        ticket = _tickets_query(fields, include).filter_by(Id_Tiquet=ticket_id).first()
         
         if not ticket:
             return jsonify({
@@ -147,7 +590,7 @@ def get_ticket(ticket_id):
             
         return jsonify({
             'status': 'success',
-            'data': tiquet_schema.dump(ticket)
+            'data': _dump_tickets([ticket], _ticket_dumper(fields, include), include)[0]
         })
     except Exception as e:
         return jsonify({
@@ -156,6 +599,110 @@ def get_ticket(ticket_id):
         }), 500
 
 
+@bp.route('/tickets/<int:ticket_id>/comentarios', methods=['GET'])
+@jwt_required()
+def get_comentarios(ticket_id):
+    """Comentarios de un ticket, del más antiguo al más reciente.
+
+    Pagina por cursor sobre (Fecha, ID_comentario) con ``limit`` y
+    ``cursor``; la respuesta incluye ``next_cursor``.
+    """
+    try:
+        limit = parse_limit()
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    try:
+        if not db.session.execute(db.select(Tiquet.Id_Tiquet).filter_by(Id_Tiquet=ticket_id)).first():
+            return jsonify({
+                'status': 'error',
+                'message': 'Ticket not found'
+            }), 404
+        
+        try:
+            comentarios, next_cursor = BaseService.paginate_keyset(
+                Comentarios.query.filter_by(Id_Tiquet=ticket_id), COMENTARIO_KEYSET,
+                cursor=request.args.get('cursor'),
+                limit=limit
+            )
+        except InvalidCursorError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        usuarios = _usuarios([comentario.usuario for comentario in comentarios])
+        data = []
+        for comentario in comentarios:
+            item = comentario_schema.dump(comentario)
+            item['usuario_rel'] = usuarios.get(comentario.usuario)
+            data.append(item)
+        
+        return jsonify({
+            'status': 'success',
+            'data': data,
+            'limit': limit,
+            'next_cursor': next_cursor
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+
+@bp.route('/tickets/<int:ticket_id>/comentarios', methods=['POST'])
+@jwt_required()
+def create_comentario(ticket_id):
+    """Agregar un comentario a un ticket como el usuario autenticado"""
+    try:
+        validated_data = comentario_schema.load(request.get_json(silent=True) or {})
+    except ValidationError as err:
+        return jsonify({
+            'status': 'error',
+            'message': 'Datos inválidos',
+            'errors': err.messages
+        }), 400
+    
+    try:
+        if not db.session.execute(db.select(Tiquet.Id_Tiquet).filter_by(Id_Tiquet=ticket_id)).first():
+            return jsonify({
+                'status': 'error',
+                'message': 'Ticket not found'
+            }), 404
+        
+        comentario = Comentarios(
+            **validated_data,
+            usuario=int(get_jwt_identity()),
+            Id_Tiquet=ticket_id,
+            Fecha=datetime.utcnow().date()
+        )
+        db.session.add(comentario)
+        db.session.flush()
+        data = comentario_schema.dump(comentario)
+        # El autor es el usuario autenticado: sus datos ya están en el principal
+        data['usuario_rel'] = {column.key: getattr(current_user, column.key) for column in USUARIO_COLUMNS}
+        db.session.commit()
+        _audit('comentario.crear', ticket_id)
+        
+        return jsonify({
+            'status': 'success',
+            'message': 'Comentario agregado exitosamente',
+            'data': data
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al agregar comentario: {str(e)}'
+        }), 500
+
+
 @bp.route('/tickets', methods=['POST'])
 @jwt_required()
 def create_ticket():
@@ -181,21 +728,19 @@ def create_ticket():
         # Crear ticket con datos validados
         ticket = Tiquet(**validated_data)
         db.session.add(ticket)
+        db.session.flush()
+        ticket_stats.record_change(None, ticket_stats.snapshot(ticket))
+        # La respuesta sale de la fila insertada (catálogos desde la caché y
+        # el asignado por id), antes del commit que expira el objeto
+        data = _dump_tickets([ticket], _ticket_dumper(), TICKET_INCLUDES)[0]
         db.session.commit()
-        
-        # Cargar ticket con relaciones para la respuesta
-        ticket_with_relations = Tiquet.query.options(
-            joinedload(Tiquet.categoria_rel),
-            joinedload(Tiquet.ubicacion_rel),
-            joinedload(Tiquet.criticidad_rel),
-            joinedload(Tiquet.usuario_asignado),
-            joinedload(Tiquet.estado_rel)
-        ).filter_by(Id_Tiquet=ticket.Id_Tiquet).first()
+        response_cache.invalidate()
+        _audit('tiquet.crear', data['Id_Tiquet'])
         
         return jsonify({
             'status': 'success',
             'message': 'Ticket creado exitosamente',
-            'data': tiquet_schema.dump(ticket_with_relations)
+            'data': data
         }), 201
         
     except Exception as e:
@@ -206,12 +751,197 @@ def create_ticket():
         }), 500
 
 
+def _insert_tickets(rows):
+    """Insertar tickets por lotes y devolver sus ids en el mismo orden.
+
+    Con motores que devuelven filas en un executemany (SQLite, PostgreSQL,
+    MariaDB) es un INSERT ... RETURNING por lote. En MySQL es un INSERT de
+    varias filas por bloque de BULK_INSERT_CHUNK: InnoDB da ids consecutivos
+    a un INSERT con el número de filas conocido, así que salen del id de la
+    primera fila (``lastrowid``, es decir LAST_INSERT_ID()) y del paso de
+    ``auto_increment_increment``.
+    """
+    table = Tiquet.__table__
+    dialect = db.session.get_bind().dialect
+    if dialect.insert_executemany_returning:
+        # INSERT de Core: el del ORM omite las columnas con None y parte los
+        # lotes. No se usa sort_by_parameter_order porque en SQLite degrada a
+        # una fila por sentencia; los ids autoincrementales ya siguen el orden
+        # de los VALUES, así que basta con ordenarlos.
+        result = db.session.execute(table.insert().returning(table.c.Id_Tiquet), rows)
+        return sorted(result.scalars())
+    
+    if dialect.name == 'mysql':
+        connection = db.session.connection()
+        step = connection.exec_driver_sql('SELECT @@auto_increment_increment').scalar()
+        ids = []
+        for start in range(0, len(rows), BULK_INSERT_CHUNK):
+            chunk = rows[start:start + BULK_INSERT_CHUNK]
+            first = connection.execute(table.insert().values(chunk)).lastrowid
+            ids.extend(first + i * step for i in range(len(chunk)))
+        return ids
+    
+    tickets = [Tiquet(**row) for row in rows]
+    db.session.add_all(tickets)
+    db.session.flush()
+    return [ticket.Id_Tiquet for ticket in tickets]
+
+
+@bp.route('/tickets/bulk', methods=['POST'])
+@jwt_required()
+def create_tickets():
+    """Crear varios tickets en una sola transacción.
+
+    Recibe una lista de tickets (o ``{"tickets": [...]}``) con el mismo
+    formato que ``POST /tickets`` y devuelve los ids creados en orden.
+    """
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('tickets')
+    if not data or not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        return jsonify({
+            'status': 'error',
+            'message': 'Se requiere una lista de tickets'
+        }), 400
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(data) > max_items:
+        return jsonify({
+            'status': 'error',
+            'message': f'No se pueden crear más de {max_items} tickets por petición'
+        }), 400
+    
+    try:
+        validated = tiquets_schema.load(data)
+    except ValidationError as err:
+        return jsonify({
+            'status': 'error',
+            'message': 'Datos inválidos',
+            'errors': err.messages
+        }), 400
+    
+    try:
+        # Mismas claves en todas las filas para que el INSERT vaya en un solo lote
+        columns = [name for name in TICKET_FIELDS if name not in ('Id_Tiquet', 'Fecha_cierre')]
+        rows = [{name: item.get(name) for name in columns} for item in validated]
+        ids = _insert_tickets(rows)
+        ticket_stats.record_changes([
+            (None, {column: row.get(column) for column in ticket_stats.SNAPSHOT_COLUMNS}, 1)
+            for row in rows
+        ])
+        db.session.commit()
+        response_cache.invalidate()
+        for ticket_id in ids:
+            _audit('tiquet.crear', ticket_id)
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'{len(ids)} tickets creados exitosamente',
+            'data': {
+                'ids': ids,
+                'total': len(ids)
+            }
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': f'Error interno del servidor: {str(e)}'
+        }), 500
+
+
+@bp.route('/tickets/bulk', methods=['PUT'])
+@jwt_required()
+def update_tickets():
+    """Actualizar varios tickets con un solo UPDATE.
+
+    Recibe ``{"ids": [...]}`` y/o ``{"filter": {...}}`` (mismos filtros que
+    ``GET /tickets``) más ``{"patch": {...}}`` con User_asig, Estado,
+    Criticidad o Categoria. Devuelve el número de tickets afectados.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict) or not isinstance(data.get('patch') or {}, dict):
+        return jsonify({
+            'status': 'error',
+            'message': 'Se requiere un objeto con patch y ids o filter'
+        }), 400
+    try:
+        patch = bulk_patch_schema.load(data.get('patch') or {})
+    except ValidationError as err:
+        return jsonify({
+            'status': 'error',
+            'message': 'Datos inválidos',
+            'errors': err.messages
+        }), 400
+    
+    try:
+        if not patch:
+            raise ValueError('patch debe indicar al menos un campo')
+        criteria = db.select(Tiquet.Id_Tiquet)
+        if data.get('ids') not in (None, '', []):
+            criteria = criteria.filter(Tiquet.Id_Tiquet.in_(_parse_bulk_ids(data['ids'])))
+        filtro = data.get('filter') or {}
+        if not isinstance(filtro, dict):
+            raise ValueError('filter debe ser un objeto')
+        criteria = _filter_tickets(criteria, filtro)
+        if criteria.whereclause is None:
+            raise ValueError('Se requiere ids o al menos un filtro')
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    try:
+        # Fotos agrupadas de los tickets afectados para los contadores
+        columns = [getattr(Tiquet, column) for column in ticket_stats.SNAPSHOT_COLUMNS]
+        grouped = db.select(*columns, db.func.count()).where(criteria.whereclause).group_by(*columns)
+        # PostgreSQL no admite FOR UPDATE con GROUP BY; MySQL bloquea las filas leídas
+        if db.session.get_bind().dialect.name != 'postgresql':
+            grouped = grouped.with_for_update()
+        changes = []
+        for row in db.session.execute(grouped):
+            before = dict(zip(ticket_stats.SNAPSHOT_COLUMNS, row[:-1]))
+            changes.append((before, dict(before, **patch), row[-1]))
+        # Ids afectados, para el historial de cada ticket
+        ticket_ids = db.session.execute(criteria).scalars().all()
+        
+        result = db.session.execute(
+            db.update(Tiquet)
+            .where(criteria.whereclause)
+            .values(**patch)
+            .execution_options(synchronize_session=False)
+        )
+        ticket_stats.record_changes(changes)
+        db.session.commit()
+        if result.rowcount:
+            response_cache.invalidate()
+            for ticket_id in ticket_ids:
+                _audit('tiquet.actualizar_masivo', ticket_id)
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'{result.rowcount} tickets actualizados',
+            'data': {
+                'affected': result.rowcount
+            }
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al actualizar tickets: {str(e)}'
+        }), 500
+
+
 @bp.route('/tickets/<int:ticket_id>', methods=['PUT'])
 @jwt_required()
 def update_ticket(ticket_id):
     """Actualizar un ticket"""
     try:
-        ticket = Tiquet.query.get_or_404(ticket_id)
+        # Bloquear la fila para que los contadores partan del estado real
+        ticket = Tiquet.query.with_for_update().get_or_404(ticket_id)
         data = request.get_json()
         
         # Validar datos
@@ -224,16 +954,22 @@ def update_ticket(ticket_id):
             }), 400
         
         # Actualizar campos
+        before = ticket_stats.snapshot(ticket)
         for key, value in data.items():
             if hasattr(ticket, key):
                 setattr(ticket, key, value)
+        ticket_stats.record_change(before, ticket_stats.snapshot(ticket))
+        db.session.flush()
+        data = _dump_tickets([ticket], _ticket_dumper(), TICKET_INCLUDES)[0]
         
         db.session.commit()
+        response_cache.invalidate()
+        _audit('tiquet.actualizar', ticket_id)
         
         return jsonify({
             'status': 'success',
             'message': 'Ticket actualizado exitosamente',
-            'data': tiquet_schema.dump(ticket)
+            'data': data
         })
         
     except Exception as e:
@@ -249,13 +985,17 @@ def update_ticket(ticket_id):
 def delete_ticket(ticket_id):
     """Eliminar un ticket"""
     try:
-        ticket = Tiquet.query.get_or_404(ticket_id)
+        ticket = Tiquet.query.with_for_update().get_or_404(ticket_id)
         
         # Opcional: Eliminar registros relacionados primero si es necesario
         # (SQLAlchemy debería manejar esto automáticamente si está configurado en cascade)
         
+        ticket_stats.record_change(ticket_stats.snapshot(ticket), None)
         db.session.delete(ticket)
         db.session.commit()
+        response_cache.invalidate()
+        # Log_transaccional no tiene FK: la entrada conserva el id del ticket eliminado
+        _audit(f'tiquet.eliminar {ticket_id}', ticket_id)
         
         return jsonify({
             'status': 'success',
@@ -275,18 +1015,11 @@ def delete_ticket(ticket_id):
 def close_ticket(ticket_id):
     """Cerrar un ticket - establece fecha de cierre y cambia estado a cerrado"""
     try:
-        # Buscar el ticket
-        ticket = Tiquet.query.get_or_404(ticket_id)
+        # Buscar el ticket (bloqueado hasta el commit)
+        ticket = Tiquet.query.with_for_update().get_or_404(ticket_id)
         
-        # Buscar el estado "cerrado" (asumiendo que existe un estado con nombre "Cerrado")
-        estado_cerrado = EstadoTiquet.query.filter_by(Nombre='Cerrado').first()
-        if not estado_cerrado:
-            # Si no encuentra "Cerrado", buscar por variaciones comunes
-            estado_cerrado = EstadoTiquet.query.filter(
-                EstadoTiquet.Nombre.ilike('%cerrado%') | 
-                EstadoTiquet.Nombre.ilike('%closed%') |
-                EstadoTiquet.Nombre.ilike('%finalizado%')
-            ).first()
+        # Buscar el estado "cerrado" (o sus variaciones comunes) en la caché de catálogos
+        estado_cerrado = catalog_cache.estado_cerrado()
         
         if not estado_cerrado:
             return jsonify({
@@ -295,7 +1028,7 @@ def close_ticket(ticket_id):
             }), 400
         
         # Verificar si el ticket ya está cerrado
-        if ticket.Estado == estado_cerrado.ID_estado and ticket.Fecha_cierre:
+        if ticket.Estado == estado_cerrado['ID_estado'] and ticket.Fecha_cierre:
             return jsonify({
                 'status': 'warning',
                 'message': 'El ticket ya está cerrado',
@@ -307,30 +1040,111 @@ def close_ticket(ticket_id):
             })
         
         # Cerrar el ticket
-        ticket.Estado = estado_cerrado.ID_estado
+        before = ticket_stats.snapshot(ticket)
+        ticket.Estado = estado_cerrado['ID_estado']
         ticket.Fecha_cierre = datetime.utcnow().date()
+        ticket_stats.record_change(before, ticket_stats.snapshot(ticket))
+        data = {
+            'Id_Tiquet': ticket.Id_Tiquet,
+            'Estado': ticket.Estado,
+            'Estado_nombre': estado_cerrado['Nombre'],
+            'Fecha_apertura': ticket.Fecha_apertura.strftime('%d-%m-%Y') if ticket.Fecha_apertura else None,
+            'Fecha_cierre': ticket.Fecha_cierre.strftime('%d-%m-%Y') if ticket.Fecha_cierre else None,
+            'Descripcion': ticket.Descripcion
+        }
         
         db.session.commit()
-        
-        # Cargar relaciones para la respuesta
-        ticket_with_relations = Tiquet.query.options(
-            joinedload(Tiquet.categoria_rel),
-            joinedload(Tiquet.ubicacion_rel), 
-            joinedload(Tiquet.criticidad_rel),
-            joinedload(Tiquet.estado_rel),
-            joinedload(Tiquet.usuario_asignado)
-        ).get(ticket_id)
+        response_cache.invalidate()
+        _audit('tiquet.cerrar', ticket_id)
         
         return jsonify({
             'status': 'success',
             'message': f'Ticket {ticket_id} cerrado exitosamente',
+            'data': data
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': f'Error al cerrar ticket: {str(e)}'
+        }), 500
+
+
+@bp.route('/tickets/close', methods=['PUT'])
+@jwt_required()
+def close_tickets():
+    """Cerrar varios tickets con un solo UPDATE.
+
+    Recibe ``{"ids": [1, 2, 3]}`` y devuelve el resultado por id:
+    ``closed``, ``already_closed`` o ``not_found``.
+    """
+    try:
+        body = request.get_json(silent=True)
+        ids = _parse_bulk_ids(body.get('ids') if isinstance(body, dict) else None)
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    try:
+        estado_cerrado = catalog_cache.estado_cerrado()
+        if not estado_cerrado:
+            return jsonify({
+                'status': 'error',
+                'message': 'No se encontró un estado de "Cerrado" en el sistema'
+            }), 400
+        
+        # Leer (y bloquear) solo las columnas necesarias para clasificar y contar
+        rows = db.session.execute(
+            db.select(Tiquet.Id_Tiquet, *(getattr(Tiquet, c) for c in ticket_stats.SNAPSHOT_COLUMNS))
+            .where(Tiquet.Id_Tiquet.in_(ids))
+            .with_for_update()
+        ).all()
+        found = {row.Id_Tiquet: ticket_stats.snapshot(row) for row in rows}
+        
+        fecha_cierre = datetime.utcnow().date()
+        resultados = {}
+        changes = []
+        for ticket_id, before in found.items():
+            if before['Estado'] == estado_cerrado['ID_estado'] and before['Fecha_cierre']:
+                resultados[ticket_id] = 'already_closed'
+            else:
+                resultados[ticket_id] = 'closed'
+                changes.append((before, dict(before, Estado=estado_cerrado['ID_estado'], Fecha_cierre=fecha_cierre), 1))
+        
+        to_close = [ticket_id for ticket_id, resultado in resultados.items() if resultado == 'closed']
+        if to_close:
+            db.session.execute(
+                db.update(Tiquet)
+                .where(Tiquet.Id_Tiquet.in_(to_close))
+                .values(Estado=estado_cerrado['ID_estado'], Fecha_cierre=fecha_cierre)
+                .execution_options(synchronize_session=False)
+            )
+            ticket_stats.record_changes(changes)
+        db.session.commit()
+        if to_close:
+            response_cache.invalidate()
+        for ticket_id in to_close:
+            _audit('tiquet.cerrar', ticket_id)
+        
+        resumen = {'closed': 0, 'already_closed': 0, 'not_found': 0}
+        detalle = []
+        for ticket_id in ids:
+            resultado = resultados.get(ticket_id, 'not_found')
+            resumen[resultado] += 1
+            detalle.append({'Id_Tiquet': ticket_id, 'resultado': resultado})
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'{resumen["closed"]} tickets cerrados',
             'data': {
-                'Id_Tiquet': ticket_with_relations.Id_Tiquet,
-                'Estado': ticket_with_relations.Estado,
-                'Estado_nombre': ticket_with_relations.estado_rel.Nombre if ticket_with_relations.estado_rel else None,
-                'Fecha_apertura': ticket_with_relations.Fecha_apertura.strftime('%d-%m-%Y') if ticket_with_relations.Fecha_apertura else None,
-                'Fecha_cierre': ticket_with_relations.Fecha_cierre.strftime('%d-%m-%Y') if ticket_with_relations.Fecha_cierre else None,
-                'Descripcion': ticket_with_relations.Descripcion
+                'Estado': estado_cerrado['ID_estado'],
+                'Estado_nombre': estado_cerrado['Nombre'],
+                'Fecha_cierre': fecha_cierre.strftime('%d-%m-%Y'),
+                'resumen': resumen,
+                'resultados': detalle
             }
         })
         
@@ -338,20 +1152,27 @@ def close_ticket(ticket_id):
         db.session.rollback()
         return jsonify({
             'status': 'error',
-            'message': f'Error al cerrar ticket: {str(e)}'
+            'message': f'Error al cerrar tickets: {str(e)}'
         }), 500
 
 
 # Rutas para catálogos
+def _catalog_response(name):
+    """Responder un catálogo desde la caché con ETag y Cache-Control"""
+    return conditional_json(
+        f'{name}-{catalog_cache.version(name)}',
+        lambda: {
+            'status': 'success',
+            'data': catalog_cache.all(name)
+        }
+    )
+
+
 @bp.route('/categorias', methods=['GET'])
 @jwt_required()
 def get_categorias():
-    """Obtener todas las categorías"""
-    categorias = CatTiquet.query.all()
-    return jsonify({
-        'status': 'success',
-        'data': cat_tiquets_schema.dump(categorias)
-    })
+    """Obtener todas las categorías (ETag del contenido, 304 sin tocar la BD)"""
+    return _catalog_response('categorias')
 
 
 @bp.route('/categorias', methods=['POST'])
@@ -370,6 +1191,8 @@ def create_categoria():
         
         db.session.add(nueva_categoria)
         db.session.commit()
+        catalog_cache.invalidate('categorias')
+        response_cache.invalidate()
         
         return jsonify({
             'status': 'success',
@@ -414,6 +1237,8 @@ def update_categoria(categoria_id):
             categoria.Nombre = categoria_data['Nombre']
         
         db.session.commit()
+        catalog_cache.invalidate('categorias')
+        response_cache.invalidate()
         
         return jsonify({
             'status': 'success',
@@ -458,6 +1283,8 @@ def delete_categoria(categoria_id):
         
         db.session.delete(categoria)
         db.session.commit()
+        catalog_cache.invalidate('categorias')
+        response_cache.invalidate()
         
         return jsonify({
             'status': 'success',
@@ -476,57 +1303,47 @@ def delete_categoria(categoria_id):
 @jwt_required()
 def get_estados():
     """Obtener todos los estados"""
-    estados = EstadoTiquet.query.all()
-    return jsonify({
-        'status': 'success',
-        'data': estados_schema.dump(estados)
-    })
+    return _catalog_response('estados')
 
 
 @bp.route('/criticidades', methods=['GET'])
 @jwt_required()
 def get_criticidades():
     """Obtener todas las criticidades"""
-    criticidades = CatalogoCriticidad.query.all()
-    return jsonify({
-        'status': 'success',
-        'data': criticidades_schema.dump(criticidades)
-    })
+    return _catalog_response('criticidades')
 
 
 @bp.route('/ubicaciones', methods=['GET'])
 @jwt_required()
 def get_ubicaciones():
     """Obtener todas las ubicaciones"""
-    ubicaciones = Ubicaciones.query.all()
-    return jsonify({
-        'status': 'success',
-        'data': ubicaciones_schema.dump(ubicaciones)
-    })
+    return _catalog_response('ubicaciones')
 
 
 @bp.route('/dashboard/stats', methods=['GET'])
 @jwt_required()
+@response_cache.cached()
 def get_dashboard_stats():
-    """Obtener estadísticas para el dashboard"""
+    """Obtener estadísticas para el dashboard.
+
+    Se leen de Tiquet_contador y la caché de catálogos: el costo depende del
+    número de estados y criticidades, no del número de tickets.
+    """
     try:
-        total_tickets = Tiquet.query.count()
-        tickets_abiertos = Tiquet.query.join(EstadoTiquet).filter(
-            EstadoTiquet.Nombre != 'Cerrado'
-        ).count()
-        tickets_cerrados = total_tickets - tickets_abiertos
-        
-        # Tickets por estado
-        tickets_por_estado = db.session.query(
-            EstadoTiquet.Nombre,
-            db.func.count(Tiquet.Id_Tiquet)
-        ).outerjoin(Tiquet).group_by(EstadoTiquet.ID_estado).all()
+        counters = ticket_stats.get_counters()
+        por_estado = counters['estado']
+        por_criticidad = counters['criticidad']
+        estado_cerrado = catalog_cache.estado_cerrado()
+        cerrado_id = estado_cerrado['ID_estado'] if estado_cerrado else None
+        estados = catalog_cache.all('estados')
         
-        # Tickets por criticidad
-        tickets_por_criticidad = db.session.query(
-            CatalogoCriticidad.Nombre,
-            db.func.count(Tiquet.Id_Tiquet)
-        ).outerjoin(Tiquet).group_by(CatalogoCriticidad.ID_criti).all()
+        total_tickets = sum(por_estado.values())
+        # Abiertos: tickets con un estado existente distinto de "Cerrado"
+        tickets_abiertos = sum(
+            por_estado.get(estado['ID_estado'], 0)
+            for estado in estados if estado['ID_estado'] != cerrado_id
+        )
+        tickets_cerrados = total_tickets - tickets_abiertos
         
         return jsonify({
             'status': 'success',
@@ -535,12 +1352,75 @@ def get_dashboard_stats():
                 'tickets_abiertos': tickets_abiertos,
                 'tickets_cerrados': tickets_cerrados,
                 'tickets_por_estado': [
-                    {'estado': estado, 'cantidad': cantidad}
-                    for estado, cantidad in tickets_por_estado
+                    {'estado': estado['Nombre'], 'cantidad': por_estado.get(estado['ID_estado'], 0)}
+                    for estado in estados
                 ],
                 'tickets_por_criticidad': [
-                    {'criticidad': criticidad, 'cantidad': cantidad}
-                    for criticidad, cantidad in tickets_por_criticidad
+                    {'criticidad': criticidad['Nombre'], 'cantidad': por_criticidad.get(criticidad['ID_criti'], 0)}
+                    for criticidad in catalog_cache.all('criticidades')
+                ]
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+
+@bp.route('/dashboard/timeseries', methods=['GET'])
+@jwt_required()
+@response_cache.cached()
+def get_dashboard_timeseries():
+    """Serie diaria de tickets abiertos, cerrados y backlog.
+
+    Parámetros: ``from`` y ``to`` (dd-mm-yyyy o yyyy-mm-dd; por defecto los
+    últimos 30 días) y ``group_by`` (estado, criticidad o categoria). Se lee
+    solo de Tiquet_resumen_diario.
+    """
+    try:
+        hasta = parse_fecha(request.args['to'], 'to') if request.args.get('to') else datetime.utcnow().date()
+        desde = parse_fecha(request.args['from'], 'from') if request.args.get('from') else hasta - timedelta(days=29)
+        group_by = request.args.get('group_by') or None
+        if group_by is not None and group_by not in TIMESERIES_GROUPS:
+            raise ValueError(f'group_by debe ser uno de: {", ".join(TIMESERIES_GROUPS)}')
+        if desde > hasta:
+            raise ValueError('from no puede ser posterior a to')
+        max_days = current_app.config['TIMESERIES_MAX_DAYS']
+        if (hasta - desde).days + 1 > max_days:
+            raise ValueError(f'El rango no puede superar {max_days} días')
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    try:
+        series = ticket_stats.get_timeseries(desde, hasta, group_by)
+        
+        def nombre(grupo):
+            if group_by is None:
+                return 'Total'
+            item = catalog_cache.get(TIMESERIES_GROUPS[group_by], grupo)
+            return item['Nombre'] if item else 'Sin asignar'
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'from': desde.strftime('%d-%m-%Y'),
+                'to': hasta.strftime('%d-%m-%Y'),
+                'group_by': group_by,
+                'series': [
+                    {
+                        'id': grupo,
+                        'nombre': nombre(grupo),
+                        'puntos': [
+                            dict(punto, fecha=punto['fecha'].strftime('%d-%m-%Y'))
+                            for punto in puntos
+                        ]
+                    }
+                    for grupo, puntos in series.items()
                 ]
             }
         })
@@ -549,4 +1429,4 @@ def get_dashboard_stats():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
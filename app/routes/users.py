@@ -1,9 +1,17 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from marshmallow import Schema, fields, ValidationError
+from sqlalchemy.exc import IntegrityError
 
 from app import db
-from app.models.soporteplus_models import Usuario, Rol
+from app.models.soporteplus_models import Usuario
+from app.services.audit import audit
+from app.services.catalog_cache import catalog_cache
+from app.services.permissions import requires_permission
+from app.services.principals import principals
+from app.utils.error_handlers import unique_error
+from app.utils.http_cache import conditional_json
+from app.utils.password_hashing import HashingUnavailableError
 
 users_bp = Blueprint('users', __name__)
 
@@ -16,26 +24,11 @@ class UpdateUserSchema(Schema):
     ID_Rol = fields.Int(required=False, validate=lambda x: x in [1, 2, 3] if x is not None else True)  # 1=admin, 2=tecnico, 3=usuario
 
 
-class RolSchema(Schema):
-    """Schema para serializar roles"""
-    ID_Rol = fields.Int(dump_only=True)
-    Nombre = fields.Str(dump_only=True)
-
-
 @users_bp.route('/', methods=['GET'])
 @jwt_required()
+@requires_permission('usuarios.ver')
 def get_users():
-    """Get all users."""
-    current_user_id = get_jwt_identity()
-    current_user = Usuario.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
-    # Check if user is admin (ID_Rol = 1)
-    if not current_user.is_admin:
-        return jsonify({'error': 'Admin access required'}), 403
-    
+    """Get all users (admins or the usuarios.ver permission)."""
     users = Usuario.query.all()
     users_data = []
     
@@ -55,13 +48,9 @@ def get_users():
 @jwt_required()
 def get_user(user_id):
     """Get specific user."""
-    current_user_id = get_jwt_identity()
-    
     # Users can only see their own profile or admin can see all
-    if int(current_user_id) != user_id:
-        current_user = Usuario.query.get(current_user_id)
-        if not current_user or not current_user.is_admin:
-            return jsonify({'error': 'Access denied'}), 403
+    if current_user.ID_usuario != user_id and not current_user.is_admin:
+        return jsonify({'error': 'Access denied'}), 403
     
     user = Usuario.query.get_or_404(user_id)
     
@@ -81,14 +70,8 @@ def get_user(user_id):
 @jwt_required()
 def update_user(user_id):
     """Update user information."""
-    current_user_id = get_jwt_identity()
-    current_user = Usuario.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'Current user not found'}), 404
-    
     # Users can only edit their own profile or admin can edit all
-    if int(current_user_id) != user_id and not current_user.is_admin:
+    if current_user.ID_usuario != user_id and not current_user.is_admin:
         return jsonify({'error': 'Access denied. You can only edit your own profile'}), 403
     
     # Find the user to update
@@ -107,24 +90,12 @@ def update_user(user_id):
     if not data:
         return jsonify({'error': 'No data provided for update'}), 400
     
-    # Check if email is being changed and if it's unique
-    if 'email' in data and data['email'] != user_to_update.email:
-        existing_user = Usuario.query.filter_by(email=data['email']).first()
-        if existing_user:
-            return jsonify({'error': 'Email already exists'}), 400
-    
-    # Check if name is being changed and if it's unique
-    if 'nombre' in data and data['nombre'] != user_to_update.Nombre:
-        existing_user = Usuario.query.filter_by(Nombre=data['nombre'].strip()).first()
-        if existing_user:
-            return jsonify({'error': 'Username already exists'}), 400
-    
     # Only admins can change roles
     if 'ID_Rol' in data and not current_user.is_admin:
         return jsonify({'error': 'Only admins can change user roles'}), 403
     
     # Prevent admin from demoting themselves
-    if 'ID_Rol' in data and int(current_user_id) == user_id and current_user.is_admin and data['ID_Rol'] != 1:
+    if 'ID_Rol' in data and current_user.ID_usuario == user_id and current_user.is_admin and data['ID_Rol'] != 1:
         return jsonify({'error': 'Cannot remove admin privileges from your own account'}), 400
     
     try:
@@ -148,6 +119,8 @@ def update_user(user_id):
             updated_fields.append('rol')
         
         db.session.commit()
+        principals.invalidate(user_id)
+        audit.log(f'usuario.actualizar {user_id}', usuario=current_user.ID_usuario)
         
         return jsonify({
             'message': 'User updated successfully',
@@ -161,6 +134,19 @@ def update_user(user_id):
             }
         }), 200
         
+    except IntegrityError as e:
+        # Email or name already taken (unique indexes)
+        db.session.rollback()
+        message = unique_error(e)
+        if message is not None:
+            return jsonify({'error': message}), 400
+        return jsonify({
+            'error': 'Failed to update user',
+            'details': str(e)
+        }), 500
+    except HashingUnavailableError:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -171,20 +157,11 @@ def update_user(user_id):
 
 @users_bp.route('/<int:user_id>', methods=['DELETE'])
 @jwt_required()
+@requires_permission('usuarios.eliminar')
 def delete_user(user_id):
-    """Delete a user (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = Usuario.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
-    # Only admins can delete users
-    if not current_user.is_admin:
-        return jsonify({'error': 'Admin access required'}), 403
-    
+    """Delete a user (admins or the usuarios.eliminar permission)."""
     # Users cannot delete themselves
-    if int(current_user_id) == user_id:
+    if current_user.ID_usuario == user_id:
         return jsonify({'error': 'Cannot delete your own account'}), 400
     
     # Find the user to delete
@@ -212,6 +189,8 @@ def delete_user(user_id):
         # Delete the user (related logs and comments will be handled by cascade or remain as historical data)
         db.session.delete(user_to_delete)
         db.session.commit()
+        principals.invalidate(user_id)
+        audit.log(f'usuario.eliminar {user_id}', usuario=current_user.ID_usuario)
         
         return jsonify({
             'message': 'User deleted successfully',
@@ -229,19 +208,19 @@ def delete_user(user_id):
 @users_bp.route('/roles', methods=['GET'])
 @jwt_required()
 def get_roles():
-    """Obtener todos los roles del sistema."""
+    """Obtener todos los roles del sistema (ETag del contenido, 304 sin tocar la BD)."""
     try:
-        # Obtener todos los roles
-        roles = Rol.query.all()
-        
-        # Crear schema para serializar
-        rol_schema = RolSchema(many=True)
+        # Roles desde la caché de catálogos ({ID_Rol, Nombre})
+        roles = catalog_cache.all('roles')
         
-        return jsonify({
-            'status': 'success',
-            'data': rol_schema.dump(roles),
-            'count': len(roles)
-        }), 200
+        return conditional_json(
+            f"roles-{catalog_cache.version('roles')}",
+            lambda: {
+                'status': 'success',
+                'data': roles,
+                'count': len(roles)
+            }
+        )
         
     except Exception as e:
         return jsonify({
@@ -1,12 +1,22 @@
 # Placeholder for service classes
 # Example: UserService, AuthService, etc.
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, and_, false, or_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a keyset pagination cursor cannot be decoded."""
+
 
 class BaseService:
     """Base service class with common methods."""
-    
+
     def __init__(self):
         pass
-    
+
     @staticmethod
     def paginate_query(query, page=1, per_page=20):
         """Paginate a SQLAlchemy query."""
@@ -14,4 +24,105 @@ class BaseService:
             page=page,
             per_page=per_page,
             error_out=False
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def encode_cursor(values):
+        """Encode the sort key of the last row as an opaque cursor."""
+        payload = [
+            value.isoformat() if isinstance(value, (date, datetime)) else value
+            for value in values
+        ]
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor, columns):
+        """Decode a cursor produced by encode_cursor for the given columns."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (ValueError, TypeError) as e:
+            raise InvalidCursorError('Cursor inválido') from e
+
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise InvalidCursorError('Cursor inválido')
+
+        values = []
+        for column, value in zip(columns, payload):
+            try:
+                if value is None:
+                    values.append(None)
+                elif isinstance(column.type, DateTime):
+                    values.append(datetime.fromisoformat(value))
+                elif isinstance(column.type, Date):
+                    values.append(date.fromisoformat(value))
+                else:
+                    values.append(column.type.python_type(value))
+            except (ValueError, TypeError) as e:
+                raise InvalidCursorError('Cursor inválido') from e
+        return values
+
+    @staticmethod
+    def keyset_filter(columns, values, descending=False):
+        """Build the WHERE clause selecting rows strictly after ``values``.
+
+        NULLs are treated as the lowest value; the rows must be sorted with
+        ``keyset_order`` so that every engine agrees.
+        """
+        def after(column, value):
+            if descending:
+                if value is None:
+                    return false()
+                return or_(column < value, column.is_(None))
+            if value is None:
+                return column.isnot(None)
+            return column > value
+
+        def same(column, value):
+            return column.is_(None) if value is None else column == value
+
+        clauses = []
+        for i, (column, value) in enumerate(zip(columns, values)):
+            prefix = [same(c, v) for c, v in zip(columns[:i], values[:i])]
+            clauses.append(and_(*prefix, after(column, value)))
+        return or_(*clauses)
+
+    @staticmethod
+    def keyset_order(columns, descending=False, dialect=None):
+        """ORDER BY for ``columns`` with NULLs as the lowest value.
+
+        MySQL already sorts NULLs that way and has no NULLS FIRST/LAST, so
+        it gets plain ASC/DESC; elsewhere (PostgreSQL sorts NULLs last when
+        ascending) nullable columns spell it out.
+        """
+        order = []
+        for column in columns:
+            clause = column.desc() if descending else column.asc()
+            if column.nullable and (dialect is None or dialect.name != 'mysql'):
+                clause = clause.nulls_last() if descending else clause.nulls_first()
+            order.append(clause)
+        return order
+
+    @classmethod
+    def paginate_keyset(cls, query, columns, cursor=None, limit=20, descending=False):
+        """Paginate a query by seeking past the sort key encoded in ``cursor``.
+
+        ``columns`` is the sort key; its last column must be unique. Returns
+        ``(items, next_cursor)`` where ``next_cursor`` is None on the last page.
+        """
+        if cursor:
+            values = cls.decode_cursor(cursor, columns)
+            query = query.filter(cls.keyset_filter(columns, values, descending))
+
+        order = cls.keyset_order(columns, descending, query.session.get_bind().dialect)
+        items = query.order_by(*order).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = cls.encode_cursor(
+                [getattr(last, c.key) for c in columns]
+            )
+        return items, next_cursor
@@ -0,0 +1,223 @@
+"""Auditoría de cambios en ``Log_transaccional`` sin frenar las peticiones.
+
+Las rutas llaman a ``audit.log(...)`` después de su commit. Las entradas van
+a una cola acotada en memoria y un hilo de fondo por proceso las escribe en
+lotes (un INSERT de varias filas por lote), en su propia conexión.
+
+Durabilidad:
+
+- Al apagar el proceso (``atexit``) se escribe lo que quede en la cola.
+- Si la cola está llena, la entrada se escribe de forma síncrona en lugar
+  de descartarse.
+- Con ``AUDIT_ASYNC = False`` (pruebas) todo se escribe de forma síncrona.
+
+``stats()`` expone la profundidad de la cola y la latencia de escritura.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+
+from app import db
+from app.models.soporteplus_models import LogTransaccional
+
+
+class _State:
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue(maxsize=app.config['AUDIT_QUEUE_SIZE'])
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = None
+        self.pid = None
+        self.engine = None
+        self.enqueued = 0
+        self.written = 0
+        self.sync_writes = 0
+        self.failed = 0
+        self.batches = 0
+        self.flush_ms_total = 0.0
+        self.flush_ms_last = None
+        self.flush_ms_max = 0.0
+
+
+class AuditWriter:
+    """Cola de entradas de auditoría con escritor por lotes en segundo plano."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AUDIT_ENABLED', True)
+        app.config.setdefault('AUDIT_ASYNC', True)
+        app.config.setdefault('AUDIT_QUEUE_SIZE', 10000)
+        app.config.setdefault('AUDIT_BATCH_SIZE', 500)
+        app.config.setdefault('AUDIT_FLUSH_INTERVAL', 1.0)
+        app.config.setdefault('AUDIT_SHUTDOWN_TIMEOUT', 5.0)
+        state = _State(app)
+        app.extensions['audit'] = state
+        atexit.register(self._shutdown, state)
+
+    @property
+    def _state(self):
+        return current_app.extensions['audit']
+
+    def log(self, accion, tiquet=None, usuario=None):
+        """Registrar una acción; llamar después del commit de la petición"""
+        state = self._state
+        config = state.app.config
+        if not config['AUDIT_ENABLED']:
+            return
+        length = LogTransaccional.__table__.c.Accion.type.length
+        # La fecha es la de la acción, no la de la escritura del lote
+        row = {
+            'Usuario': usuario,
+            'Tiquet': tiquet,
+            'Accion': accion[:length],
+            'Fecha': datetime.utcnow()
+        }
+
+        if not config['AUDIT_ASYNC']:
+            self._write(state, [row], sync=True)
+            return
+        self._ensure_thread(state)
+        try:
+            state.queue.put_nowait(row)
+            with state.lock:
+                state.enqueued += 1
+        except queue.Full:
+            # Cola llena: se paga la escritura en la petición antes que perderla
+            self._write(state, [row], sync=True)
+
+    def flush(self, timeout=None):
+        """Esperar a que el hilo escriba todo lo encolado hasta ahora"""
+        state = self._state
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while state.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            if state.thread is None or not state.thread.is_alive():
+                self._drain(state)
+                break
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        """Métricas de la cola y del escritor en este proceso"""
+        state = self._state
+        with state.lock:
+            return {
+                'queue_depth': state.queue.qsize(),
+                'queue_capacity': state.queue.maxsize,
+                'enqueued': state.enqueued,
+                'written': state.written,
+                'sync_writes': state.sync_writes,
+                'failed': state.failed,
+                'batches': state.batches,
+                'flush_ms_last': state.flush_ms_last,
+                'flush_ms_avg': round(state.flush_ms_total / state.batches, 3) if state.batches else None,
+                'flush_ms_max': round(state.flush_ms_max, 3),
+            }
+
+    def _ensure_thread(self, state):
+        """Arrancar el escritor en este proceso (también tras un fork)"""
+        pid = os.getpid()
+        if state.pid == pid and state.thread is not None and state.thread.is_alive():
+            return
+        with state.lock:
+            if state.pid == pid and state.thread is not None and state.thread.is_alive():
+                return
+            state.engine = db.engine
+            state.pid = pid
+            state.stop.clear()
+            state.thread = threading.Thread(
+                target=self._run, args=(state,), name='audit-writer', daemon=True
+            )
+            state.thread.start()
+
+    def _run(self, state):
+        config = state.app.config
+        while not state.stop.is_set():
+            try:
+                first = state.queue.get(timeout=config['AUDIT_FLUSH_INTERVAL'])
+            except queue.Empty:
+                continue
+            rows = [first]
+            while len(rows) < config['AUDIT_BATCH_SIZE']:
+                try:
+                    rows.append(state.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(state, rows)
+            for _ in rows:
+                state.queue.task_done()
+
+    def _drain(self, state):
+        """Escribir en este hilo todo lo que quede en la cola"""
+        rows = []
+        while True:
+            try:
+                rows.append(state.queue.get_nowait())
+            except queue.Empty:
+                break
+        if rows:
+            self._write(state, rows)
+            for _ in rows:
+                state.queue.task_done()
+
+    def _write(self, state, rows, sync=False):
+        """Un INSERT de varias filas en una conexión propia.
+        
+        Si el lote falla se reintenta fila a fila, para que una entrada que
+        la BD rechaza no se lleve al resto del lote.
+        """
+        start = time.perf_counter()
+        insert = LogTransaccional.__table__.insert()
+        try:
+            engine = state.engine
+            if engine is None:
+                with state.app.app_context():
+                    engine = state.engine = db.engine
+            with engine.begin() as connection:
+                connection.execute(insert, rows)
+            written = len(rows)
+        except Exception:
+            state.app.logger.exception('No se pudieron escribir %d entradas de auditoría', len(rows))
+            written = 0
+            if len(rows) > 1 and state.engine is not None:
+                for row in rows:
+                    try:
+                        with state.engine.begin() as connection:
+                            connection.execute(insert, [row])
+                        written += 1
+                    except Exception:
+                        state.app.logger.exception('Entrada de auditoría descartada: %r', row)
+            if not written:
+                with state.lock:
+                    state.failed += len(rows)
+                return
+        elapsed = (time.perf_counter() - start) * 1000
+        with state.lock:
+            state.written += written
+            state.failed += len(rows) - written
+            state.batches += 1
+            state.flush_ms_last = round(elapsed, 3)
+            state.flush_ms_total += elapsed
+            state.flush_ms_max = max(state.flush_ms_max, elapsed)
+            if sync:
+                state.sync_writes += written
+
+    def _shutdown(self, state):
+        """Al salir: detener el hilo y escribir lo pendiente"""
+        state.stop.set()
+        if state.thread is not None and state.pid == os.getpid():
+            state.thread.join(state.app.config['AUDIT_SHUTDOWN_TIMEOUT'])
+        self._drain(state)
+
+
+audit = AuditWriter()
@@ -0,0 +1,61 @@
+"""Retención de ``Log_transaccional``: mueve las entradas antiguas fuera de la tabla.
+
+Las entradas anteriores al corte se procesan por lotes de ``batch_size``,
+con un commit por lote, para no bloquear la tabla ni inflar la transacción.
+Cada lote se copia a ``Log_transaccional_archivo`` o se añade a un archivo
+JSON Lines comprimido con gzip y después se borra de la tabla activa.
+Las entradas sin fecha (anteriores a la columna) se consideran antiguas.
+"""
+import gzip
+import json
+
+from app import db
+from app.models.soporteplus_models import LogTransaccional, LogTransaccionalArchivo
+
+COLUMNS = ('Id_log', 'Usuario', 'Tiquet', 'Accion', 'Fecha')
+
+
+def _old_entries(before):
+    return db.or_(LogTransaccional.Fecha < before, LogTransaccional.Fecha.is_(None))
+
+
+def compact(before, batch_size=1000, path=None):
+    """Mover las entradas anteriores a ``before`` y devolver cuántas se movieron.
+
+    Sin ``path`` se copian a Log_transaccional_archivo; con ``path`` se
+    añaden a ese archivo ``.jsonl.gz``. Hace commit después de cada lote.
+    """
+    table = LogTransaccional.__table__
+    columns = [table.c[name] for name in COLUMNS]
+    moved = 0
+    while True:
+        rows = db.session.execute(
+            db.select(*columns)
+            .where(_old_entries(before))
+            .order_by(table.c.Id_log)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        ids = [row.Id_log for row in rows]
+
+        if path is None:
+            db.session.execute(
+                db.insert(LogTransaccionalArchivo).from_select(
+                    list(COLUMNS), db.select(*columns).where(table.c.Id_log.in_(ids))
+                )
+            )
+        else:
+            # Cada lote es un miembro gzip nuevo: el archivo sigue siendo válido
+            with gzip.open(path, 'at', encoding='utf-8') as archive:
+                for row in rows:
+                    entry = dict(row._mapping)
+                    entry['Fecha'] = entry['Fecha'].isoformat() if entry['Fecha'] else None
+                    archive.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+        db.session.execute(db.delete(LogTransaccional).where(table.c.Id_log.in_(ids)))
+        db.session.commit()
+        moved += len(rows)
+        if len(rows) < batch_size:
+            break
+    return moved
@@ -0,0 +1,138 @@
+"""Caché en memoria de los catálogos pequeños del sistema.
+
+Categorías, ubicaciones, criticidades, estados, roles y permisos se leen en
+casi todas las peticiones y casi nunca cambian; son tablas pequeñas que no
+crecen con el uso. Cada worker las carga una vez y las sirve desde memoria;
+las rutas que modifican un catálogo lo invalidan y ``CATALOG_CACHE_TTL``
+acota cuánto tarda otro worker en ver el cambio. Un id que no está (p. ej.
+una categoría creada en otro worker) recarga el catálogo, como mucho una
+vez cada ``CATALOG_MISS_RELOAD`` segundos.
+"""
+import hashlib
+import json
+import threading
+import time
+
+from flask import current_app
+
+from app import db
+from app.models.soporteplus_models import (
+    CatTiquet, CatalogoCriticidad, EstadoTiquet, Permiso, Rol, RolPermiso, Ubicaciones
+)
+
+CATALOGS = {
+    'categorias': CatTiquet,
+    'ubicaciones': Ubicaciones,
+    'criticidades': CatalogoCriticidad,
+    'estados': EstadoTiquet,
+    'roles': Rol,
+    'permisos': Permiso,
+    'rol_permisos': RolPermiso,
+}
+
+# Nombres con los que se reconoce el estado "Cerrado", en orden de preferencia
+CLOSED_STATE_NAMES = ('cerrado', 'closed', 'finalizado')
+
+
+class CatalogCache:
+    """Catálogos cargados por worker, indexados por su clave primaria."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CATALOG_CACHE_TTL', 300)
+        app.config.setdefault('CATALOG_MISS_RELOAD', 5)
+        app.extensions['catalog_cache'] = {
+            'lock': threading.Lock(),
+            'entries': {}
+        }
+
+    @property
+    def _state(self):
+        return current_app.extensions['catalog_cache']
+
+    @staticmethod
+    def _load(name):
+        """Leer un catálogo completo como lista de diccionarios"""
+        model = CATALOGS[name]
+        primary_key = model.__mapper__.primary_key[0]
+        rows = db.session.execute(
+            db.select(*model.__table__.columns).order_by(primary_key)
+        ).all()
+        items = [dict(row._mapping) for row in rows]
+        content = json.dumps(items, sort_keys=True, default=str).encode('utf-8')
+        return {
+            'items': items,
+            'by_id': {item[primary_key.name]: item for item in items},
+            'version': hashlib.sha1(content).hexdigest(),
+            'loaded_at': time.monotonic()
+        }
+
+    def _entry(self, name):
+        ttl = current_app.config['CATALOG_CACHE_TTL']
+        entry = self._state['entries'].get(name)
+        if entry is None or time.monotonic() - entry['loaded_at'] > ttl:
+            entry = self._reload(name, ttl)
+        return entry
+
+    def _reload(self, name, max_age):
+        """Recargar el catálogo si su copia tiene más de ``max_age`` segundos"""
+        state = self._state
+        with state['lock']:
+            entry = state['entries'].get(name)
+            if entry is None or time.monotonic() - entry['loaded_at'] > max_age:
+                entry = self._load(name)
+                state['entries'][name] = entry
+        return entry
+
+    def all(self, name):
+        """Todas las filas del catálogo ordenadas por id (no modificar)"""
+        return self._entry(name)['items']
+
+    def by_id(self, name):
+        """Filas del catálogo por id (no modificar).
+        
+        Una recarga reemplaza el diccionario, no lo modifica: sirve como
+        instantánea para serializar sin volver a tocar la BD.
+        """
+        return self._entry(name)['by_id']
+
+    def get(self, name, item_id):
+        """Fila del catálogo con ese id, o None si no existe.
+        
+        Si el id no está se recarga el catálogo (como mucho una vez cada
+        ``CATALOG_MISS_RELOAD`` segundos) por si la fila es nueva.
+        """
+        if item_id is None:
+            return None
+        item = self._entry(name)['by_id'].get(item_id)
+        if item is None:
+            item = self._reload(name, current_app.config['CATALOG_MISS_RELOAD'])['by_id'].get(item_id)
+        return item
+
+    def version(self, name):
+        """Hash del contenido del catálogo; cambia cuando cambian sus filas"""
+        return self._entry(name)['version']
+
+    def invalidate(self, *names):
+        """Descartar los catálogos indicados (todos si no se indica ninguno)"""
+        entries = self._state['entries']
+        for name in names or list(entries):
+            entries.pop(name, None)
+
+    def estado_cerrado(self):
+        """Estado que representa un ticket cerrado, o None si no existe"""
+        estados = self.all('estados')
+        for estado in estados:
+            if (estado['Nombre'] or '').lower() == CLOSED_STATE_NAMES[0]:
+                return estado
+        for estado in estados:
+            nombre = (estado['Nombre'] or '').lower()
+            if any(name in nombre for name in CLOSED_STATE_NAMES):
+                return estado
+        return None
+
+
+catalog_cache = CatalogCache()
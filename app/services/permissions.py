@@ -0,0 +1,143 @@
+"""Permisos por rol compilados en bitsets y comprobados desde el token.
+
+``Rol_Permiso`` se compila (por worker, desde la caché de catálogos) en un
+entero por rol con el bit ``1 << ID_Permiso`` de cada permiso concedido.
+``Usuario.get_tokens`` y ``/api/auth/refresh`` emiten el access token con
+``Permissions.access_token``, que pone los claims ``rol``, ``perms`` (el
+bitset del rol) y ``perm_ver`` (hash de los permisos compilados) y la
+expiración de ACCESS_TOKEN_EXPIRES. ``@requires_permission`` compara ``perms`` con una
+máscara, sin consultar la BD.
+
+Si cambian las concesiones cambia ``perm_ver``; los tokens cuyo bitset ya no
+coincide con el de su rol (o cuyo rol cambió) reciben 401 y el cliente debe
+pedir uno nuevo con el refresh token. Los administradores (rol 1) tienen
+todos los permisos.
+"""
+import hashlib
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from functools import wraps
+
+from flask import abort, current_app, jsonify
+from flask_jwt_extended import create_access_token, current_user, get_jwt
+
+from app.services.catalog_cache import catalog_cache
+
+ADMIN_ROL = 1
+ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+
+
+class Permissions:
+    """Bitsets de permisos por rol, recompilados cuando cambian los catálogos."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['permissions'] = {
+            'lock': threading.Lock(),
+            'compiled': None
+        }
+
+    @property
+    def _state(self):
+        return current_app.extensions['permissions']
+
+    def _compiled(self):
+        key = (catalog_cache.version('permisos'), catalog_cache.version('rol_permisos'))
+        state = self._state
+        compiled = state['compiled']
+        if compiled is not None and compiled['key'] == key:
+            return compiled
+        with state['lock']:
+            compiled = state['compiled']
+            if compiled is None or compiled['key'] != key:
+                compiled = state['compiled'] = self._compile(key)
+        return compiled
+
+    @staticmethod
+    def _compile(key):
+        bits = {
+            permiso['Nombre']: 1 << permiso['ID_Permiso']
+            for permiso in catalog_cache.all('permisos') if permiso['Nombre']
+        }
+        roles = defaultdict(int)
+        for grant in catalog_cache.all('rol_permisos'):
+            if grant['ID_Rol'] is not None and grant['ID_Permiso'] is not None:
+                roles[grant['ID_Rol']] |= 1 << grant['ID_Permiso']
+        return {
+            'key': key,
+            'bits': bits,
+            'roles': dict(roles),
+            'version': hashlib.sha1(':'.join(key).encode('utf-8')).hexdigest()[:12]
+        }
+
+    def claims(self, rol_id):
+        """Claims de permisos para el access token de un usuario con ese rol"""
+        compiled = self._compiled()
+        return {
+            'rol': rol_id,
+            'perms': compiled['roles'].get(rol_id, 0),
+            'perm_ver': compiled['version']
+        }
+
+    def access_token(self, user_id, rol_id):
+        """Access token del usuario con los claims de su rol"""
+        return create_access_token(
+            identity=str(user_id),
+            additional_claims=self.claims(rol_id),
+            expires_delta=ACCESS_TOKEN_EXPIRES
+        )
+
+    def mask(self, *names):
+        """Máscara con los bits de los permisos, o None si alguno no existe"""
+        bits = self._compiled()['bits']
+        mask = 0
+        for name in names:
+            if name not in bits:
+                return None
+            mask |= bits[name]
+        return mask
+
+    def is_stale(self, claims, rol_id):
+        """True si el token se emitió con otro rol o con otro bitset para su rol"""
+        if claims.get('rol') != rol_id or 'perms' not in claims:
+            return True
+        compiled = self._compiled()
+        if claims.get('perm_ver') == compiled['version']:
+            return False
+        # Cambió otro rol: el token sigue siendo válido si su bitset no cambió
+        return claims['perms'] != compiled['roles'].get(rol_id, 0)
+
+    def invalidate(self):
+        """Recompilar en la próxima comprobación (tras cambiar Permiso o Rol_Permiso)"""
+        catalog_cache.invalidate('permisos', 'rol_permisos')
+
+
+permissions = Permissions()
+
+
+def requires_permission(*names):
+    """Exigir todos los permisos ``names`` al usuario del token.
+
+    Usar debajo de ``@jwt_required()``. Responde 401 si el token tiene
+    permisos desactualizados y 403 si no tiene los pedidos.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            claims = get_jwt()
+            if permissions.is_stale(claims, current_user.ID_Rol):
+                return jsonify({
+                    'error': 'Token outdated',
+                    'message': 'Permissions changed, refresh the access token'
+                }), 401
+            if claims['rol'] != ADMIN_ROL:
+                required = permissions.mask(*names)
+                if required is None or claims['perms'] & required != required:
+                    abort(403)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,122 @@
+"""Usuario autenticado (``current_user``) sin consultar la BD en cada petición.
+
+``init_app`` registra el ``user_lookup_loader`` de JWTManager. Flask-JWT-Extended
+lo llama una sola vez por petición al validar el token y guarda el resultado
+en ``g``, así que ``current_user`` ya es memoizado por petición. Entre
+peticiones, cada worker guarda los usuarios en una caché LRU con TTL:
+
+- ``PRINCIPAL_CACHE_SIZE`` usuarios como máximo (se descartan los menos usados).
+- ``PRINCIPAL_CACHE_TTL`` segundos acota cuánto tarda otro worker en ver un
+  cambio de rol o un usuario eliminado.
+- ``update_user`` y ``delete_user`` invalidan la entrada en su worker.
+
+El principal es una tupla inmutable con los datos públicos del usuario, no
+la instancia ORM: se puede compartir entre hilos y nunca incluye el password.
+Las rutas que modifican al usuario siguen cargándolo de la BD.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+
+from app import db, jwt
+from app.models.soporteplus_models import Usuario
+
+PRINCIPAL_COLUMNS = ('ID_usuario', 'Nombre', 'email', 'ID_Rol')
+
+
+class Principal(namedtuple('Principal', PRINCIPAL_COLUMNS)):
+    """Datos del usuario autenticado"""
+    __slots__ = ()
+
+    @property
+    def is_admin(self):
+        """Verificar si el usuario es administrador (rol 1)"""
+        return self.ID_Rol == 1
+
+
+class _State:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+class PrincipalCache:
+    """Caché LRU con TTL de principales por id de usuario."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PRINCIPAL_CACHE_SIZE', 1024)
+        app.config.setdefault('PRINCIPAL_CACHE_TTL', 60)
+        app.extensions['principals'] = _State()
+        jwt.user_lookup_loader(self._lookup)
+
+    @property
+    def _state(self):
+        return current_app.extensions['principals']
+
+    def _lookup(self, jwt_header, jwt_data):
+        identity = jwt_data[current_app.config['JWT_IDENTITY_CLAIM']]
+        try:
+            return self.get(int(identity))
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, user_id):
+        """Principal del usuario, o None si no existe"""
+        state = self._state
+        now = time.monotonic()
+        with state.lock:
+            entry = state.entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                state.entries.move_to_end(user_id)
+                state.hits += 1
+                return entry[0]
+            state.misses += 1
+
+        row = db.session.execute(
+            db.select(*(getattr(Usuario, column) for column in PRINCIPAL_COLUMNS))
+            .where(Usuario.ID_usuario == user_id)
+        ).first()
+        if row is None:
+            self.invalidate(user_id)
+            return None
+        principal = Principal(*row)
+
+        config = current_app.config
+        with state.lock:
+            state.entries[user_id] = (principal, now + config['PRINCIPAL_CACHE_TTL'])
+            state.entries.move_to_end(user_id)
+            while len(state.entries) > config['PRINCIPAL_CACHE_SIZE']:
+                state.entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id=None):
+        """Descartar un usuario (todos si no se indica)"""
+        state = self._state
+        with state.lock:
+            if user_id is None:
+                state.entries.clear()
+            else:
+                state.entries.pop(user_id, None)
+
+    def stats(self):
+        """Aciertos y tamaño de la caché en este worker"""
+        state = self._state
+        with state.lock:
+            lookups = state.hits + state.misses
+            return {
+                'hits': state.hits,
+                'misses': state.misses,
+                'entries': len(state.entries),
+                'hit_ratio': round(state.hits / lookups, 4) if lookups else None
+            }
+
+
+principals = PrincipalCache()
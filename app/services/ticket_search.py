@@ -0,0 +1,100 @@
+"""Búsqueda de texto completo sobre ``Tiquet.Descripcion``.
+
+En MySQL se usa un índice FULLTEXT, que el motor mantiene solo. En SQLite
+(desarrollo y pruebas) se usa una tabla virtual FTS5 de contenido externo
+sincronizada con triggers, así que cualquier escritura sobre Tiquet (ORM,
+INSERT masivo o UPDATE por lotes) queda indexada sin código adicional.
+Ambas estructuras se crean con ``create_all`` y con la migración.
+"""
+import re
+
+from sqlalchemy import DDL, event
+
+from app import db
+from app.models.soporteplus_models import Tiquet
+
+FTS_TABLE = 'Tiquet_fts'
+
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "Descripcion, content='Tiquet', content_rowid='Id_Tiquet', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER Tiquet_fts_ai AFTER INSERT ON Tiquet BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, Descripcion) VALUES (new.Id_Tiquet, new.Descripcion); END",
+    f"CREATE TRIGGER Tiquet_fts_ad AFTER DELETE ON Tiquet BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, Descripcion) VALUES ('delete', old.Id_Tiquet, old.Descripcion); END",
+    f"CREATE TRIGGER Tiquet_fts_au AFTER UPDATE OF Descripcion ON Tiquet BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, Descripcion) VALUES ('delete', old.Id_Tiquet, old.Descripcion); "
+    f"INSERT INTO {FTS_TABLE}(rowid, Descripcion) VALUES (new.Id_Tiquet, new.Descripcion); END",
+)
+
+MYSQL_DDL = (
+    "CREATE FULLTEXT INDEX ft_tiquet_descripcion ON Tiquet (Descripcion)",
+)
+
+for statement in SQLITE_DDL:
+    event.listen(Tiquet.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in MYSQL_DDL:
+    event.listen(Tiquet.__table__, 'after_create', DDL(statement).execute_if(dialect='mysql'))
+event.listen(
+    Tiquet.__table__, 'before_drop',
+    DDL(f'DROP TABLE IF EXISTS {FTS_TABLE}').execute_if(dialect='sqlite')
+)
+
+
+def parse_terms(q):
+    """Palabras de la consulta, sin la sintaxis propia de cada motor"""
+    return re.findall(r'\w+', q or '')
+
+
+def search(q, page=1, per_page=20):
+    """Ids de los tickets que contienen todas las palabras de ``q``.
+
+    Devuelve ``(ids, total)`` con los ids de la página ordenados por
+    relevancia. La última palabra se busca también como prefijo (``impre``
+    encuentra ``impresora``) para poder buscar mientras se escribe; las demás
+    deben coincidir completas, que es mucho más barato en el índice.
+    """
+    terms = parse_terms(q)
+    if not terms:
+        return [], 0
+    offset = (page - 1) * per_page
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        # Cada término entre comillas para que no se interprete como operador
+        match = ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms) + '*'
+        params = {'match': match, 'limit': per_page, 'offset': offset}
+        total = db.session.execute(
+            db.text(f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match'), params
+        ).scalar()
+        ids = db.session.execute(
+            db.text(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match '
+                f'ORDER BY bm25({FTS_TABLE}) LIMIT :limit OFFSET :offset'
+            ), params
+        ).scalars().all()
+        return ids, total
+
+    if dialect == 'mysql':
+        match = ' '.join(f'+{term}' for term in terms) + '*'
+        score = db.text('MATCH (Descripcion) AGAINST (:match IN BOOLEAN MODE)').bindparams(match=match)
+        total = db.session.execute(
+            db.select(db.func.count()).select_from(Tiquet).where(score)
+        ).scalar()
+        ids = db.session.execute(
+            db.select(Tiquet.Id_Tiquet).where(score)
+            .order_by(db.desc(score), Tiquet.Id_Tiquet.desc())
+            .limit(per_page).offset(offset)
+        ).scalars().all()
+        return ids, total
+
+    # Otros motores: LIKE sin ranking (los más recientes primero)
+    condition = db.and_(*(Tiquet.Descripcion.ilike(f'%{term}%') for term in terms))
+    total = db.session.execute(
+        db.select(db.func.count()).select_from(Tiquet).where(condition)
+    ).scalar()
+    ids = db.session.execute(
+        db.select(Tiquet.Id_Tiquet).where(condition)
+        .order_by(Tiquet.Id_Tiquet.desc()).limit(per_page).offset(offset)
+    ).scalars().all()
+    return ids, total
@@ -0,0 +1,251 @@
+"""Estadísticas de tickets mantenidas de forma incremental.
+
+Cada ruta que crea, modifica o elimina tickets llama a ``record_change`` con
+la foto del ticket antes y después del cambio, en la misma transacción. El
+dashboard lee los contadores resultantes en O(filas de catálogo) en lugar de
+agregar sobre toda la tabla ``Tiquet``.
+
+Los mismos cambios alimentan ``Tiquet_resumen_diario``: tickets abiertos por
+Fecha_apertura y cerrados por Fecha_cierre, por estado, criticidad y
+categoría, de donde salen las series temporales sin recorrer Tiquet.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.soporteplus_models import Tiquet, TiquetContador, TiquetResumenDiario
+
+# Dimensión del contador -> columna de Tiquet
+DIMENSIONS = {
+    'estado': 'Estado',
+    'criticidad': 'Criticidad',
+}
+
+# Valor con el que se cuentan los tickets sin estado o criticidad
+SIN_ASIGNAR = 0
+
+# Agrupaciones de la serie diaria -> columna de Tiquet_resumen_diario
+ROLLUP_DIMENSIONS = {
+    'estado': 'Estado',
+    'criticidad': 'Criticidad',
+    'categoria': 'Categoria',
+}
+
+ROLLUP_KEYS = ('Fecha', 'Estado', 'Criticidad', 'Categoria')
+
+SNAPSHOT_COLUMNS = ('Estado', 'Criticidad', 'Categoria', 'Fecha_apertura', 'Fecha_cierre')
+
+
+def snapshot(ticket):
+    """Foto de las columnas que afectan a las estadísticas de un ticket"""
+    return {column: getattr(ticket, column) for column in SNAPSHOT_COLUMNS}
+
+
+def record_change(old=None, new=None, count=1):
+    """Registrar que ``count`` tickets pasaron de ``old`` a ``new``.
+
+    ``old`` es None para altas y ``new`` es None para bajas.
+    """
+    record_changes([(old, new, count)])
+
+
+def record_changes(changes):
+    """Registrar varios cambios ``(old, new, count)`` con un upsert por tabla"""
+    deltas = Counter()
+    abiertos = Counter()
+    cerrados = Counter()
+    for old, new, count in changes:
+        for photo, sign in ((old, -count), (new, count)):
+            if photo is None:
+                continue
+            for dimension, column in DIMENSIONS.items():
+                deltas[(dimension, _valor(photo[column]))] += sign
+            grupo = tuple(_valor(photo.get(column)) for column in ROLLUP_KEYS[1:])
+            if photo.get('Fecha_apertura') is not None:
+                abiertos[(_fecha(photo['Fecha_apertura']),) + grupo] += sign
+            if photo.get('Fecha_cierre') is not None:
+                cerrados[(_fecha(photo['Fecha_cierre']),) + grupo] += sign
+
+    rows = [
+        {'Dimension': dimension, 'Valor': valor, 'Cantidad': delta}
+        for (dimension, valor), delta in deltas.items() if delta
+    ]
+    if rows:
+        _increment(TiquetContador.__table__, rows, ('Dimension', 'Valor'), ('Cantidad',))
+
+    rollups = [
+        dict(zip(ROLLUP_KEYS, key), Abiertos=abiertos[key], Cerrados=cerrados[key])
+        for key in set(abiertos) | set(cerrados) if abiertos[key] or cerrados[key]
+    ]
+    if rollups:
+        _increment(TiquetResumenDiario.__table__, rollups, ROLLUP_KEYS, ('Abiertos', 'Cerrados'))
+
+
+def _valor(value):
+    return SIN_ASIGNAR if value is None else value
+
+
+def _fecha(value):
+    """Normalizar a ``date`` (las rutas pueden asignar datetime)"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _increment(table, rows, keys, amounts):
+    """Sumar ``amounts`` a las filas de ``table`` (creándolas si no existen).
+
+    Usa el upsert nativo del motor para que las sumas concurrentes no se
+    pisen: ON DUPLICATE KEY UPDATE en MySQL, ON CONFLICT en SQLite/PostgreSQL.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table).values(rows)
+        statement = statement.on_duplicate_key_update({
+            name: table.c[name] + statement.inserted[name] for name in amounts
+        })
+    elif dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + statement.excluded[name] for name in amounts}
+        )
+    else:
+        for row in rows:
+            match = [table.c[key] == row[key] for key in keys]
+            result = db.session.execute(
+                table.update().where(*match).values({
+                    name: table.c[name] + row[name] for name in amounts
+                })
+            )
+            if result.rowcount == 0:
+                db.session.execute(table.insert().values(row))
+        return
+    db.session.execute(statement)
+
+
+def get_counters():
+    """Contadores actuales como ``{dimensión: {valor: cantidad}}``"""
+    counters = {dimension: {} for dimension in DIMENSIONS}
+    for row in db.session.execute(db.select(TiquetContador)).scalars():
+        counters.setdefault(row.Dimension, {})[row.Valor] = row.Cantidad
+    return counters
+
+
+def _count_tickets():
+    """Recalcular los contadores agregando sobre la tabla Tiquet"""
+    counters = {dimension: {} for dimension in DIMENSIONS}
+    for dimension, column in DIMENSIONS.items():
+        valor = db.func.coalesce(getattr(Tiquet, column), SIN_ASIGNAR)
+        rows = db.session.execute(
+            db.select(valor, db.func.count()).group_by(valor)
+        ).all()
+        counters[dimension] = {value: count for value, count in rows}
+    return counters
+
+
+def rebuild_counters():
+    """Reconstruir los contadores desde Tiquet y devolver las diferencias.
+
+    Devuelve una lista de ``(dimensión, valor, antes, después)`` con los
+    contadores que no coincidían. No hace commit.
+    """
+    before = get_counters()
+    after = _count_tickets()
+
+    differences = []
+    for dimension in DIMENSIONS:
+        for valor in sorted(set(before[dimension]) | set(after[dimension])):
+            old = before[dimension].get(valor, 0)
+            new = after[dimension].get(valor, 0)
+            if old != new:
+                differences.append((dimension, valor, old, new))
+
+    db.session.execute(db.delete(TiquetContador))
+    rows = [
+        {'Dimension': dimension, 'Valor': valor, 'Cantidad': count}
+        for dimension, values in after.items()
+        for valor, count in values.items()
+    ]
+    if rows:
+        db.session.execute(db.insert(TiquetContador), rows)
+    return differences
+
+
+def get_timeseries(desde, hasta, group_by=None):
+    """Serie diaria entre ``desde`` y ``hasta`` (incluidos) desde los resúmenes.
+
+    Devuelve ``{grupo: [{'fecha', 'abiertos', 'cerrados', 'backlog'}, ...]}``
+    con un punto por día (también los días sin movimientos). Sin
+    ``group_by`` hay un único grupo ``None``; con él se omiten los grupos
+    sin movimientos ni backlog. El backlog arrastra el saldo
+    abiertos - cerrados acumulado antes de ``desde``.
+    """
+    table = TiquetResumenDiario
+    grupo = [getattr(table, ROLLUP_DIMENSIONS[group_by])] if group_by else []
+    abiertos = db.func.sum(table.Abiertos)
+    cerrados = db.func.sum(table.Cerrados)
+
+    backlog = {}
+    for row in db.session.execute(
+        db.select(*grupo, abiertos, cerrados).where(table.Fecha < desde).group_by(*grupo)
+    ):
+        key = row[0] if group_by else None
+        backlog[key] = (row[-2] or 0) - (row[-1] or 0)
+
+    por_dia = {}
+    for row in db.session.execute(
+        db.select(table.Fecha, *grupo, abiertos, cerrados)
+        .where(table.Fecha.between(desde, hasta))
+        .group_by(table.Fecha, *grupo)
+    ):
+        key = row[1] if group_by else None
+        por_dia.setdefault(key, {})[_fecha(row[0])] = (row[-2] or 0, row[-1] or 0)
+
+    dias = [desde + timedelta(days=offset) for offset in range((hasta - desde).days + 1)]
+    grupos = set(backlog) | set(por_dia) if group_by else {None}
+    series = {}
+    for key in sorted(grupos, key=lambda value: (value is None, value)):
+        saldo = backlog.get(key, 0)
+        puntos = []
+        for dia in dias:
+            opened, closed = por_dia.get(key, {}).get(dia, (0, 0))
+            saldo += opened - closed
+            puntos.append({'fecha': dia, 'abiertos': opened, 'cerrados': closed, 'backlog': saldo})
+        # Grupos que solo conservan filas en cero tras reasignaciones
+        if group_by and not any(p['abiertos'] or p['cerrados'] or p['backlog'] for p in puntos):
+            continue
+        series[key] = puntos
+    return series
+
+
+def rebuild_rollups():
+    """Reconstruir Tiquet_resumen_diario desde Tiquet. Devuelve las filas. No hace commit."""
+    grupo = [
+        db.func.coalesce(getattr(Tiquet, column), SIN_ASIGNAR).label(column)
+        for column in ROLLUP_KEYS[1:]
+    ]
+    movimientos = db.union_all(
+        db.select(
+            Tiquet.Fecha_apertura.label('Fecha'), *grupo,
+            db.literal(1).label('Abiertos'), db.literal(0).label('Cerrados')
+        ).where(Tiquet.Fecha_apertura.isnot(None)),
+        db.select(
+            Tiquet.Fecha_cierre.label('Fecha'), *grupo,
+            db.literal(0).label('Abiertos'), db.literal(1).label('Cerrados')
+        ).where(Tiquet.Fecha_cierre.isnot(None))
+    ).subquery()
+    keys = [movimientos.c[key] for key in ROLLUP_KEYS]
+
+    db.session.execute(db.delete(TiquetResumenDiario))
+    result = db.session.execute(
+        db.insert(TiquetResumenDiario).from_select(
+            list(ROLLUP_KEYS) + ['Abiertos', 'Cerrados'],
+            db.select(*keys, db.func.sum(movimientos.c.Abiertos), db.func.sum(movimientos.c.Cerrados))
+            .group_by(*keys)
+        )
+    )
+    return result.rowcount
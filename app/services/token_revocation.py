@@ -0,0 +1,230 @@
+"""Revocación de JWT (logout) sin consultar la BD en cada petición.
+
+Los JTI revocados se guardan en ``Token_revocado`` hasta que el token expira;
+si la BD no está disponible se añaden a un archivo local
+(``TOKEN_REVOCATION_FALLBACK``) que también se consulta.
+
+Delante del almacén, cada worker mantiene un filtro de Bloom con los JTI no
+expirados, reconstruido cada ``TOKEN_REVOCATION_REFRESH`` segundos por la
+primera petición que lo encuentra viejo. ``token_in_blocklist_loader``
+responde "no revocado" sin E/S cuando el filtro dice que el JTI no está (el
+caso normal); solo los positivos del filtro se confirman en el almacén, y
+los falsos positivos se cuentan en ``stats()``.
+
+Un token revocado en otro worker se rechaza aquí a partir de la siguiente
+reconstrucción; en el worker que lo revoca, al momento.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db, jwt
+from app.models.soporteplus_models import TokenRevocado
+from app.utils.bloom import BloomFilter
+
+
+class _State:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.bloom = None
+        self.fallback = {}
+        # JTI revocados mientras se construye un filtro -> expira si van al archivo
+        self.pending = None
+        self.built_at = None
+        self.rebuilds = 0
+        self.checks = 0
+        self.bloom_negatives = 0
+        self.confirmed = 0
+        self.false_positives = 0
+        self.fallback_writes = 0
+
+
+class TokenRevocation:
+    """Almacén de JTI revocados con un filtro de Bloom por worker."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TOKEN_REVOCATION_REFRESH', 30)
+        app.config.setdefault('TOKEN_BLOOM_ERROR_RATE', 0.001)
+        app.config.setdefault('TOKEN_BLOOM_MIN_CAPACITY', 10000)
+        if not app.config.get('TOKEN_REVOCATION_FALLBACK'):
+            app.config['TOKEN_REVOCATION_FALLBACK'] = os.path.join(app.instance_path, 'revoked_tokens.tsv')
+        app.extensions['token_revocation'] = _State()
+        jwt.token_in_blocklist_loader(self._in_blocklist)
+
+    @property
+    def _state(self):
+        return current_app.extensions['token_revocation']
+
+    def _in_blocklist(self, jwt_header, jwt_payload):
+        return self.is_revoked(jwt_payload['jti'])
+
+    def revoke(self, jti, expires, user_id=None):
+        """Revocar un JTI hasta ``expires`` (datetime UTC)"""
+        state = self._state
+        in_fallback = False
+        try:
+            db.session.merge(TokenRevocado(Jti=jti, ID_usuario=user_id, Expira=expires))
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            current_app.logger.exception('Token_revocado no disponible, se usa el archivo local')
+            self._append_fallback(jti, expires)
+            in_fallback = True
+        with state.lock:
+            if in_fallback:
+                state.fallback[jti] = expires
+                state.fallback_writes += 1
+            # Sin filtro todavía, la primera construcción lo lee del almacén
+            if state.bloom is not None:
+                state.bloom.add(jti)
+            if state.pending is not None:
+                state.pending[jti] = expires if in_fallback else None
+
+    def is_revoked(self, jti):
+        """True si el JTI está revocado"""
+        state = self._state
+        bloom = self._bloom(state)
+        with state.lock:
+            state.checks += 1
+            if jti not in bloom:
+                state.bloom_negatives += 1
+                return False
+
+        revoked = self._stored(state, jti)
+        with state.lock:
+            if revoked:
+                state.confirmed += 1
+            else:
+                state.false_positives += 1
+        return revoked
+
+    def _stored(self, state, jti):
+        """Confirmar un positivo del filtro en la BD o en el archivo local"""
+        if jti in state.fallback:
+            return True
+        try:
+            return db.session.get(TokenRevocado, jti) is not None
+        except SQLAlchemyError:
+            db.session.rollback()
+            # Sin BD no se puede descartar: el filtro dijo que puede estar revocado
+            return True
+
+    def _bloom(self, state):
+        refresh = current_app.config['TOKEN_REVOCATION_REFRESH']
+        bloom = state.bloom
+        if bloom is not None and time.monotonic() - state.built_at < refresh:
+            return bloom
+        if not state.build_lock.acquire(blocking=bloom is None):
+            # Otro hilo está reconstruyendo; mientras tanto vale el filtro anterior
+            return bloom
+        try:
+            if state.bloom is None or time.monotonic() - state.built_at >= refresh:
+                self._rebuild(state)
+            return state.bloom
+        finally:
+            state.build_lock.release()
+
+    def _rebuild(self, state):
+        """Cargar los JTI no expirados del almacén en un filtro nuevo.
+        
+        La consulta y la construcción se hacen sin ``state.lock``, que solo
+        se toma para el cambio de filtro; los JTI revocados entre tanto
+        (``state.pending``) se añaden al filtro nuevo antes de publicarlo.
+        """
+        with state.lock:
+            state.pending = {}
+        now = datetime.utcnow()
+        try:
+            jtis = db.session.execute(
+                db.select(TokenRevocado.Jti).where(TokenRevocado.Expira > now)
+            ).scalars().all()
+        except SQLAlchemyError:
+            db.session.rollback()
+            current_app.logger.exception('No se pudo leer Token_revocado')
+            if state.bloom is not None:
+                # Se reintenta en el siguiente intervalo con el filtro anterior
+                with state.lock:
+                    state.pending = None
+                    state.built_at = time.monotonic()
+                return
+            jtis = []
+        fallback = {jti: expires for jti, expires in self._read_fallback().items() if expires > now}
+
+        config = current_app.config
+        # Holgura para los tokens revocados en este worker hasta la próxima reconstrucción
+        capacity = max(2 * (len(jtis) + len(fallback)), config['TOKEN_BLOOM_MIN_CAPACITY'])
+        bloom = BloomFilter(capacity, config['TOKEN_BLOOM_ERROR_RATE'])
+        for jti in jtis:
+            bloom.add(jti)
+        for jti in fallback:
+            bloom.add(jti)
+        with state.lock:
+            for jti, expires in state.pending.items():
+                bloom.add(jti)
+                if expires is not None:
+                    fallback[jti] = expires
+            state.pending = None
+            state.bloom = bloom
+            state.fallback = fallback
+            state.built_at = time.monotonic()
+            state.rebuilds += 1
+
+    def _append_fallback(self, jti, expires):
+        path = current_app.config['TOKEN_REVOCATION_FALLBACK']
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as fallback:
+            fallback.write(f'{jti}\t{expires.isoformat()}\n')
+
+    def _read_fallback(self):
+        path = current_app.config['TOKEN_REVOCATION_FALLBACK']
+        entries = {}
+        try:
+            with open(path, encoding='utf-8') as fallback:
+                for line in fallback:
+                    jti, _, expires = line.rstrip('\n').partition('\t')
+                    if jti and expires:
+                        entries[jti] = datetime.fromisoformat(expires)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def purge(self):
+        """Borrar los JTI ya expirados. Devuelve cuántos. Hace commit."""
+        result = db.session.execute(
+            db.delete(TokenRevocado).where(TokenRevocado.Expira <= datetime.utcnow())
+        )
+        db.session.commit()
+        return result.rowcount
+
+    def stats(self):
+        """Métricas del filtro en este worker, con la tasa de falsos positivos"""
+        state = self._state
+        with state.lock:
+            bloom = state.bloom
+            not_revoked = state.bloom_negatives + state.false_positives
+            return {
+                'checks': state.checks,
+                'bloom_negatives': state.bloom_negatives,
+                'confirmed': state.confirmed,
+                'false_positives': state.false_positives,
+                'false_positive_rate': round(state.false_positives / not_revoked, 6) if not_revoked else None,
+                'expected_false_positive_rate': round(bloom.expected_error_rate(), 6) if bloom else None,
+                'filter_keys': bloom.count if bloom else 0,
+                'filter_capacity': bloom.capacity if bloom else 0,
+                'filter_bytes': len(bloom.bits) if bloom else 0,
+                'fallback_entries': len(state.fallback),
+                'fallback_writes': state.fallback_writes,
+                'rebuilds': state.rebuilds,
+            }
+
+
+token_revocation = TokenRevocation()
@@ -1,3 +1,8 @@
 from .error_handlers import register_error_handlers
+from .compression import register_compression
+from .http_cache import conditional_json
+from .response_cache import response_cache
+from .password_hashing import password_hasher
+from .rate_limit import rate_limiter
 
-__all__ = ['register_error_handlers']
\ No newline at end of file
+__all__ = ['register_error_handlers', 'register_compression', 'conditional_json', 'response_cache', 'password_hasher', 'rate_limiter']
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""A small Bloom filter for string keys.
+
+Membership answers are "definitely not present" or "maybe present"; the
+false-positive rate is bounded by the ``error_rate`` the filter was sized
+for, as long as no more than ``capacity`` keys are added.
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Fixed-size bit array with ``k`` hash positions per key."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def expected_error_rate(self):
+        """Theoretical false-positive rate for the keys added so far."""
+        if not self.count:
+            return 0.0
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
@@ -0,0 +1,91 @@
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+def _choose_encoding():
+    """Pick the best encoding the client accepts, or None."""
+    accepted = request.accept_encodings
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressor(encoding):
+    """Return (compress_chunk, finish) callables for a streaming compressor."""
+    config = current_app.config
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=config['COMPRESS_BROTLI_QUALITY'])
+        return (
+            lambda chunk: compressor.process(chunk) + compressor.flush(),
+            compressor.finish
+        )
+    # wbits=31 produces a gzip container
+    compressor = zlib.compressobj(config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+    return (
+        lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush
+    )
+
+
+def _compress_stream(chunks, compress_chunk, finish):
+    """Compress a streamed body chunk by chunk, flushing after each one."""
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compress_chunk(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def compress_response(response):
+    """Compress eligible responses according to Accept-Encoding."""
+    config = current_app.config
+    if (
+        request.method == 'HEAD'
+        or not 200 <= response.status_code < 300
+        or response.status_code == 204
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in config['COMPRESS_MIMETYPES']
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if not response.is_streamed and response.calculate_content_length() < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    compress_chunk, finish = _compressor(encoding)
+    if response.is_streamed:
+        response.response = _compress_stream(
+            response.response, compress_chunk, finish
+        )
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(compress_chunk(response.get_data()) + finish())
+
+    response.headers['Content-Encoding'] = encoding
+    # The compressed body is a different representation of the same entity
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def register_compression(app):
+    """Register the after_request hook that compresses JSON responses."""
+    app.after_request(compress_response)
@@ -2,6 +2,24 @@ from flask import jsonify
 from werkzeug.exceptions import HTTPException
 from marshmallow import ValidationError
 
+from .password_hashing import HashingUnavailableError
+
+# Unique index -> error returned when an insert or update violates it
+UNIQUE_ERRORS = (
+    ('email', 'Email already exists'),
+    ('nombre', 'Username already exists'),
+)
+
+
+def unique_error(error):
+    """Message for a duplicate email or name, or None for other integrity errors."""
+    # MySQL names the index (ux_usuario_email), SQLite the column (Usuario.email)
+    detail = str(error.orig).lower()
+    for column, message in UNIQUE_ERRORS:
+        if f'ux_usuario_{column}' in detail or f'usuario.{column}' in detail:
+            return message
+    return None
+
 
 def register_error_handlers(app):
     """Register error handlers for the Flask app."""
@@ -11,6 +29,16 @@ def register_error_handlers(app):
         """Handle Marshmallow validation errors."""
         return jsonify({'errors': e.messages}), 400
     
+    @app.errorhandler(HashingUnavailableError)
+    def handle_hashing_unavailable(e):
+        """Handle a saturated password hashing pool."""
+        response = jsonify({
+            'error': 'Service unavailable',
+            'message': str(e)
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    
     @app.errorhandler(404)
     def handle_not_found(e):
         """Handle 404 errors."""
@@ -0,0 +1,84 @@
+"""Precompiled serializers equivalent to ``Schema.dump``.
+
+Marshmallow resolves every field, accessor and nested schema on each dump.
+``compile_serializer`` does that work once per schema and field set and
+generates a plain Python function that builds the same dict straight from an
+ORM object or a ``Row`` (anything with attribute access).
+"""
+from functools import lru_cache
+
+from marshmallow import fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+
+def _has_dump_hooks(schema):
+    """True if the schema defines pre_dump/post_dump processors."""
+    # Schema._hooks is keyed by (tag, pass_many)
+    return any(
+        schema._hooks[(tag, many)]
+        for tag in (PRE_DUMP, POST_DUMP)
+        for many in (False, True)
+    )
+
+
+def _is_plain(field):
+    """True if the field can be read with getattr and no dump default."""
+    return field.dump_default is missing and field._CHECK_ATTRIBUTE
+
+
+def _compile(schema):
+    """Generate the serializer function for a schema instance."""
+    if _has_dump_hooks(schema):
+        return schema.dump
+
+    namespace = {'_missing': missing, '_str': str, '_int': int}
+    lines = ['def serialize(obj):', '    out = {}']
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        source = field.attribute or name
+        plain = _is_plain(field) and '.' not in source
+
+        if plain and type(field) in (fields.Integer, fields.Int) and not field.as_string:
+            convert = '_int(v)'
+        elif plain and type(field) in (fields.String, fields.Str):
+            convert = '_str(v)'
+        elif plain and type(field) is fields.Raw:
+            convert = 'v'
+        elif plain and type(field) is fields.Nested:
+            nested = field.schema
+            namespace[f'_nested{index}'] = _compile(nested)
+            if nested.many or field.many:
+                convert = f'[_nested{index}(item) for item in v]'
+            else:
+                convert = f'_nested{index}(v)'
+        else:
+            # Any other field goes through marshmallow itself
+            namespace[f'_field{index}'] = field
+            namespace[f'_accessor{index}'] = schema.get_attribute
+            lines.append(
+                f'    v = _field{index}.serialize({name!r}, obj, accessor=_accessor{index})'
+            )
+            lines.append(f'    if v is not _missing: out[{key!r}] = v')
+            continue
+
+        lines.append(f'    v = getattr(obj, {source!r}, _missing)')
+        if convert == 'v':
+            lines.append(f'    if v is not _missing: out[{key!r}] = v')
+        else:
+            lines.append(
+                f'    if v is not _missing: out[{key!r}] = None if v is None else {convert}'
+            )
+    lines.append('    return out')
+
+    exec(compile('\n'.join(lines), f'<serializer {type(schema).__name__}>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+@lru_cache(maxsize=128)
+def compile_serializer(schema_class, only=None):
+    """Return a function ``obj -> dict`` equal to ``schema_class(only=only).dump``.
+
+    ``only`` must be hashable (a tuple of field names) so the compiled
+    function can be reused for every request asking for the same fields.
+    """
+    return _compile(schema_class(only=only))
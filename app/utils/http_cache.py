@@ -0,0 +1,19 @@
+from flask import current_app, jsonify, request
+
+
+def conditional_json(etag, build):
+    """Answer a GET with a strong ETag, or 304 if the client already has it.
+
+    ``build`` is only called when the body has to be sent.
+    """
+    # If-None-Match uses weak comparison, so a compressed (weak) copy matches too
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = (
+        f"private, max-age={current_app.config['CATALOG_CACHE_MAX_AGE']}, must-revalidate"
+    )
+    return response
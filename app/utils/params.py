@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from flask import current_app, request
+
+
+def parse_fecha(value, name):
+    """Parse a dd-mm-yyyy (or yyyy-mm-dd) date from the query string."""
+    if not isinstance(value, str):
+        raise ValueError(f'{name} debe estar en formato dd-mm-yyyy')
+    for fmt in ('%d-%m-%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'{name} debe estar en formato dd-mm-yyyy')
+
+
+def parse_limit():
+    """Read ``limit`` from the query string, capped at MAX_PER_PAGE."""
+    raw = request.args.get('limit', current_app.config['POSTS_PER_PAGE'])
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError('limit debe ser un número entero')
+    if limit < 1:
+        raise ValueError('limit debe ser mayor que 0')
+    return min(limit, current_app.config['MAX_PER_PAGE'])
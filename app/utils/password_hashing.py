@@ -0,0 +1,186 @@
+"""Password hashing off the request thread, with bounded concurrency.
+
+PBKDF2/scrypt are deliberately slow and hold the GIL for most of their run,
+so a burst of logins on the request threads stalls every other request in
+the worker. Here the work goes to a per-worker process pool:
+
+- At most ``PASSWORD_HASH_MAX_CONCURRENCY`` hashes are in flight per worker;
+  further callers wait up to ``PASSWORD_HASH_TIMEOUT`` seconds for a slot and
+  then get ``HashingUnavailableError`` (served as 503 with Retry-After).
+- The pool's processes are started by a ``forkserver``, not forked from the
+  worker: the worker runs other threads (audit writer, requests) and a fork
+  could copy one of their held locks into the child and deadlock it.
+- ``PASSWORD_HASH_WORKERS = 0`` hashes inline on the calling thread (tests),
+  still behind the same concurrency limit.
+- ``needs_rehash`` tells whether a stored hash uses a different method or
+  cost than ``PASSWORD_HASH_METHOD``, so logins can upgrade it transparently.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+)
+
+# Parameters werkzeug fills in when the method omits them
+METHOD_DEFAULTS = {
+    'pbkdf2': ('sha256', str(DEFAULT_PBKDF2_ITERATIONS)),
+    'scrypt': ('32768', '8', '1'),
+}
+
+
+class HashingUnavailableError(Exception):
+    """Raised when no hashing slot frees up within PASSWORD_HASH_TIMEOUT."""
+
+
+def normalize_method(method):
+    """Spell out a werkzeug method with all its parameters (``pbkdf2`` -> ``pbkdf2:sha256:600000``)."""
+    name, *params = method.split(':')
+    defaults = METHOD_DEFAULTS.get(name, ())
+    return ':'.join([name, *params, *defaults[len(params):]])
+
+
+class _State:
+    def __init__(self, app):
+        self.app = app
+        self.slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_MAX_CONCURRENCY'])
+        self.method = normalize_method(app.config['PASSWORD_HASH_METHOD'])
+        self.lock = threading.Lock()
+        self.pool = None
+        self.pid = None
+        self.in_flight = 0
+        self.hashed = 0
+        self.verified = 0
+        self.rejected = 0
+        self.wait_ms_max = 0.0
+
+
+class PasswordHasher:
+    """Hash and verify passwords in a process pool."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        workers = min(4, os.cpu_count() or 1)
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+        app.config.setdefault('PASSWORD_HASH_WORKERS', workers)
+        app.config.setdefault('PASSWORD_HASH_MAX_CONCURRENCY', 2 * max(workers, 1))
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 5.0)
+        app.extensions['password_hasher'] = _State(app)
+
+    @property
+    def _state(self):
+        return current_app.extensions['password_hasher']
+
+    def hash(self, password):
+        """Hash ``password`` with the configured method."""
+        state = self._state
+        result = self._run(state, generate_password_hash, password, state.method)
+        with state.lock:
+            state.hashed += 1
+        return result
+
+    def verify(self, pwhash, password):
+        """Check ``password`` against a stored hash."""
+        state = self._state
+        result = self._run(state, check_password_hash, pwhash, password)
+        with state.lock:
+            state.verified += 1
+        return result
+
+    def needs_rehash(self, pwhash):
+        """True if ``pwhash`` was made with another method or cost."""
+        method = pwhash.split('$', 1)[0]
+        return normalize_method(method) != self._state.method
+
+    def stats(self):
+        """Slot usage and counters for this worker."""
+        state = self._state
+        with state.lock:
+            return {
+                'workers': state.app.config['PASSWORD_HASH_WORKERS'],
+                'max_concurrency': state.app.config['PASSWORD_HASH_MAX_CONCURRENCY'],
+                'in_flight': state.in_flight,
+                'hashed': state.hashed,
+                'verified': state.verified,
+                'rejected': state.rejected,
+                'wait_ms_max': round(state.wait_ms_max, 3),
+            }
+
+    def _run(self, state, fn, *args):
+        timeout = state.app.config['PASSWORD_HASH_TIMEOUT']
+        start = time.monotonic()
+        if not state.slots.acquire(timeout=timeout):
+            with state.lock:
+                state.rejected += 1
+            raise HashingUnavailableError('Too many concurrent logins, try again shortly')
+        waited = (time.monotonic() - start) * 1000
+        with state.lock:
+            state.in_flight += 1
+            state.wait_ms_max = max(state.wait_ms_max, waited)
+
+        try:
+            pool = self._pool(state)
+        except Exception:
+            self._release(state)
+            raise
+        if pool is None:
+            try:
+                return fn(*args)
+            finally:
+                self._release(state)
+
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(state)
+            self._reset(state, pool)
+            raise
+        # The slot is freed when the job ends, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._release(state))
+        try:
+            return future.result(timeout=max(timeout - (time.monotonic() - start), 0.1))
+        except FutureTimeoutError:
+            with state.lock:
+                state.rejected += 1
+            raise HashingUnavailableError('Password hashing timed out, try again shortly')
+        except BrokenProcessPool:
+            self._reset(state, pool)
+            raise
+
+    def _release(self, state):
+        with state.lock:
+            state.in_flight -= 1
+        state.slots.release()
+
+    def _pool(self, state):
+        """The process pool of this worker, created after any fork."""
+        workers = state.app.config['PASSWORD_HASH_WORKERS']
+        if not workers:
+            return None
+        pid = os.getpid()
+        with state.lock:
+            if state.pool is None or state.pid != pid:
+                state.pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context('forkserver')
+                )
+                state.pid = pid
+            return state.pool
+
+    def _reset(self, state, pool):
+        """Drop a broken pool so the next call starts a fresh one."""
+        with state.lock:
+            if state.pool is pool:
+                state.pool = None
+        pool.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,274 @@
+"""Token-bucket rate limiting shared by all workers on the host.
+
+Each rule is ``capacity/seconds``: a bucket holds up to ``capacity`` tokens
+and refills at ``capacity / seconds`` tokens per second; every request
+takes one token from each of its buckets (one per IP, one per email) in a
+single transaction, or none if any bucket is empty.
+
+State lives in a small SQLite file (``RATE_LIMIT_PATH``) so that gunicorn
+workers share it without an external service; it is opened on the first
+limited request, so CLI commands never create it. ``RATE_LIMIT_BACKEND =
+'memory'`` keeps it per process (tests, single-worker runs). After a
+rejection the worker remembers when the bucket refills, so further requests
+for that key during a burst are rejected from a dict lookup without touching
+SQLite, and never reach the password hash.
+
+The IP is ``request.remote_addr``; behind a reverse proxy, wrap the app in
+werkzeug's ``ProxyFix`` so it is the client's address.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+# Rules per limited endpoint: key kind -> config entry with "capacity/seconds"
+RULES = {
+    'login': {'ip': 'RATE_LIMIT_LOGIN_IP', 'email': 'RATE_LIMIT_LOGIN_EMAIL'},
+    'register': {'ip': 'RATE_LIMIT_REGISTER_IP'},
+}
+
+# Delete buckets idle for longer than this many seconds every so many takes
+PURGE_EVERY = 1000
+PURGE_IDLE = 24 * 3600
+
+
+def parse_rule(rule):
+    """``'5/60'`` -> ``(5.0, 60.0)``"""
+    capacity, _, seconds = str(rule).partition('/')
+    capacity, seconds = float(capacity), float(seconds or 1)
+    if capacity < 1 or seconds <= 0:
+        raise ValueError(f'Invalid rate limit rule: {rule!r}')
+    return capacity, seconds
+
+
+def _refill(tokens, updated, capacity, seconds, now):
+    return min(capacity, tokens + max(now - updated, 0) * capacity / seconds)
+
+
+def _waits(levels, rules):
+    """Seconds until each bucket has a whole token (0 if it has one now)"""
+    return [
+        0 if tokens >= 1 else (1 - tokens) * seconds / capacity
+        for tokens, (_, capacity, seconds) in zip(levels, rules)
+    ]
+
+
+class MemoryBackend:
+    """Buckets in this process only."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def take(self, rules, now):
+        """Take a token from every ``(key, capacity, seconds)`` bucket, or from none.
+
+        Returns the seconds each bucket needs to refill one token; all zeros
+        means the tokens were taken.
+        """
+        with self.lock:
+            levels = []
+            for key, capacity, seconds in rules:
+                tokens, updated = self.buckets.get(key, (capacity, now))
+                levels.append(_refill(tokens, updated, capacity, seconds, now))
+            waits = _waits(levels, rules)
+            if not any(waits):
+                for tokens, (key, _, _) in zip(levels, rules):
+                    self.buckets[key] = (tokens - 1, now)
+            return waits
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file shared by every worker on the host."""
+
+    def __init__(self, path, timeout=1.0):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        self.takes = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        connection = self._connect()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS buckets '
+            '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+        )
+        connection.close()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _connection(self):
+        # One connection per thread, opened again after a fork
+        pid = os.getpid()
+        if getattr(self.local, 'pid', None) != pid:
+            self.local.connection = self._connect()
+            self.local.pid = pid
+        return self.local.connection
+
+    def take(self, rules, now):
+        """Same contract as ``MemoryBackend.take``, atomic across processes."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            levels = []
+            for key, capacity, seconds in rules:
+                row = connection.execute(
+                    'SELECT tokens, updated FROM buckets WHERE key = ?', (key,)
+                ).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                levels.append(_refill(tokens, updated, capacity, seconds, now))
+            waits = _waits(levels, rules)
+            if not any(waits):
+                connection.executemany(
+                    'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                    [(key, tokens - 1, now) for tokens, (key, _, _) in zip(levels, rules)]
+                )
+            self.takes += 1
+            if self.takes % PURGE_EVERY == 0:
+                connection.execute('DELETE FROM buckets WHERE updated < ?', (now - PURGE_IDLE,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return waits
+
+
+class _State:
+    def __init__(self, backend_class, *backend_args):
+        self.backend_class = backend_class
+        self.backend_args = backend_args
+        self.backend = None
+        self.lock = threading.Lock()
+        self.blocked = {}
+        self.allowed = 0
+        self.rejected = 0
+        self.rejected_local = 0
+        self.errors = 0
+
+
+class RateLimiter:
+    """Decorator and stats for token-bucket limited endpoints."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATE_LIMIT_ENABLED', True)
+        app.config.setdefault('RATE_LIMIT_BACKEND', 'sqlite')
+        app.config.setdefault('RATE_LIMIT_LOGIN_IP', '20/60')
+        app.config.setdefault('RATE_LIMIT_LOGIN_EMAIL', '5/60')
+        app.config.setdefault('RATE_LIMIT_REGISTER_IP', '10/3600')
+        if not app.config.get('RATE_LIMIT_PATH'):
+            app.config['RATE_LIMIT_PATH'] = os.path.join(app.instance_path, 'ratelimit.sqlite3')
+        for rules in RULES.values():
+            for name in rules.values():
+                parse_rule(app.config[name])
+
+        if app.config['RATE_LIMIT_BACKEND'] == 'memory':
+            app.extensions['rate_limiter'] = _State(MemoryBackend)
+        else:
+            app.extensions['rate_limiter'] = _State(SQLiteBackend, app.config['RATE_LIMIT_PATH'])
+
+    @property
+    def _state(self):
+        return current_app.extensions['rate_limiter']
+
+    def limit(self, endpoint):
+        """Limit a view with the rules of ``RULES[endpoint]``; 429 with Retry-After when exceeded."""
+        kinds = RULES[endpoint]
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if current_app.config['RATE_LIMIT_ENABLED']:
+                    wait = self._check(endpoint, kinds)
+                    if wait:
+                        response = jsonify({
+                            'error': 'Too many requests',
+                            'message': f'Try again in {math.ceil(wait)} seconds'
+                        })
+                        response.headers['Retry-After'] = str(math.ceil(wait))
+                        return response, 429
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _keys(self, endpoint, kinds):
+        values = {'ip': request.remote_addr or 'unknown'}
+        if 'email' in kinds:
+            body = request.get_json(silent=True)
+            email = body.get('email') if isinstance(body, dict) else None
+            if isinstance(email, str) and email.strip():
+                values['email'] = email.strip().lower()
+        return [
+            (f'{endpoint}:{kind}:{values[kind]}', *parse_rule(current_app.config[name]))
+            for kind, name in kinds.items() if kind in values
+        ]
+
+    def _backend(self, state):
+        # Created on first use: CLI runs of create_app() never touch the file
+        if state.backend is None:
+            with state.lock:
+                if state.backend is None:
+                    state.backend = state.backend_class(*state.backend_args)
+        return state.backend
+
+    def _check(self, endpoint, kinds):
+        """Seconds until the request would be allowed (0 = allowed now)"""
+        state = self._state
+        rules = self._keys(endpoint, kinds)
+        now = time.time()
+
+        # Fast path: a bucket known to be empty rejects without shared state
+        with state.lock:
+            until = max((state.blocked.get(key, 0) for key, _, _ in rules), default=0)
+            if until > now:
+                state.rejected += 1
+                state.rejected_local += 1
+                return until - now
+
+        try:
+            waits = self._backend(state).take(rules, now)
+        except sqlite3.Error:
+            # Never lock users out because the limiter's file is unavailable
+            current_app.logger.exception('Rate limiter backend unavailable')
+            with state.lock:
+                state.errors += 1
+            return 0
+
+        with state.lock:
+            if not any(waits):
+                state.allowed += 1
+                return 0
+            state.rejected += 1
+            if len(state.blocked) > 10000:
+                state.blocked = {key: until for key, until in state.blocked.items() if until > now}
+            # Only the empty buckets: the others still have tokens for other requests
+            for (key, _, _), wait in zip(rules, waits):
+                if wait:
+                    state.blocked[key] = now + wait
+        return max(waits)
+
+    def stats(self):
+        """Counters for this worker."""
+        state = self._state
+        with state.lock:
+            return {
+                'backend': state.backend_class.__name__,
+                'allowed': state.allowed,
+                'rejected': state.rejected,
+                'rejected_local': state.rejected_local,
+                'errors': state.errors,
+                'blocked_keys': sum(1 for until in state.blocked.values() if until > time.time()),
+            }
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,138 @@
+"""Per-worker TTL cache with single-flight coalescing for expensive GET views.
+
+When many identical requests arrive at once, only the first one runs the
+view; the others wait for its result instead of hitting the database in
+parallel. Successful responses are then served from memory for
+``RESPONSE_CACHE_TTL`` seconds or until ``invalidate`` is called.
+"""
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+
+class _Flight:
+    """A computation in progress that other requests can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.snapshot = None
+
+
+class _State:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.flights = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+
+class ResponseCache:
+    """Decorator factory and invalidation API for cached views."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_TTL', 5)
+        app.config.setdefault('RESPONSE_CACHE_WAIT_TIMEOUT', 30)
+        app.extensions['response_cache'] = _State()
+
+    @property
+    def _state(self):
+        return current_app.extensions['response_cache']
+
+    def cached(self, ttl=None, per_user=False):
+        """Cache a view's 200 responses by endpoint and query string.
+
+        Use below ``@jwt_required()``. With ``per_user`` the JWT identity is
+        part of the key.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = (request.endpoint, request.full_path)
+                if per_user:
+                    key += (get_jwt_identity(),)
+                return self._get_or_compute(key, ttl, view, args, kwargs)
+            return wrapper
+        return decorator
+
+    def _get_or_compute(self, key, ttl, view, args, kwargs):
+        state = self._state
+        with state.lock:
+            entry = state.entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                state.hits += 1
+                return self._rebuild(entry[0])
+            flight = state.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = state.flights[key] = _Flight()
+                generation = state.generation
+                state.misses += 1
+            else:
+                state.coalesced += 1
+
+        if not leader:
+            flight.done.wait(current_app.config['RESPONSE_CACHE_WAIT_TIMEOUT'])
+            if flight.snapshot is not None:
+                return self._rebuild(flight.snapshot)
+            # The leader failed or produced an uncacheable response
+            return view(*args, **kwargs)
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                flight.snapshot = (
+                    response.get_data(), response.status_code, list(response.headers.items())
+                )
+        finally:
+            with state.lock:
+                state.flights.pop(key, None)
+                # Results computed before an invalidation are not stored
+                if flight.snapshot is not None and generation == state.generation:
+                    ttl = current_app.config['RESPONSE_CACHE_TTL'] if ttl is None else ttl
+                    state.entries[key] = (flight.snapshot, time.monotonic() + ttl)
+            flight.done.set()
+        return response
+
+    @staticmethod
+    def _rebuild(snapshot):
+        """Build a fresh response so later hooks never mutate the cached copy."""
+        body, status, headers = snapshot
+        return current_app.response_class(body, status=status, headers=headers)
+
+    def invalidate(self, endpoint=None):
+        """Drop cached responses (only those of ``endpoint`` if given)."""
+        state = self._state
+        with state.lock:
+            state.generation += 1
+            if endpoint is None:
+                state.entries.clear()
+            else:
+                for key in [k for k in state.entries if k[0] == endpoint]:
+                    del state.entries[key]
+
+    def stats(self):
+        """Hit/miss counters for this worker."""
+        state = self._state
+        with state.lock:
+            lookups = state.hits + state.misses + state.coalesced
+            return {
+                'hits': state.hits,
+                'misses': state.misses,
+                'coalesced': state.coalesced,
+                'entries': len(state.entries),
+                'in_flight': len(state.flights),
+                'hit_ratio': round((state.hits + state.coalesced) / lookups, 4) if lookups else None
+            }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,110 @@
+"""Benchmark: logins/sec under contention, hashing inline vs in the process pool.
+
+Runs a storm of concurrent logins through the test client while a probe
+thread keeps requesting ``/health``. Reports login throughput and the probe
+latency, which shows how much the hashing starves other requests in the
+same worker. Uses a temporary SQLite file and the production hash method.
+
+Usage (from the project root):
+
+    python -m benchmarks.bench_login
+    python -m benchmarks.bench_login 16 10   # login threads, seconds per mode
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app import create_app, db
+from app.models import Usuario
+from config.config import TestingConfig, config_by_name
+
+EMAIL = 'bench@test.com'
+PASSWORD = 'secret123'
+
+
+def make_app(database, workers, concurrency):
+    config_by_name['bench'] = type('BenchConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}',
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256',
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_MAX_CONCURRENCY': concurrency,
+        'PASSWORD_HASH_TIMEOUT': 30.0,
+        'AUDIT_ENABLED': False,
+    })
+    return create_app('bench')
+
+
+def run(app, threads, seconds):
+    client = app.test_client()
+    stop = threading.Event()
+    logins = []
+    errors = []
+    probes = []
+
+    def login():
+        count = 0
+        while not stop.is_set():
+            response = client.post('/api/auth/login', json={'email': EMAIL, 'password': PASSWORD})
+            if response.status_code == 200:
+                count += 1
+            else:
+                errors.append(response.status_code)
+        logins.append(count)
+
+    def probe():
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get('/health')
+            probes.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=login) for _ in range(threads)]
+    workers.append(threading.Thread(target=probe))
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+
+    probes.sort()
+    return {
+        'logins_per_sec': sum(logins) / seconds,
+        'errors': len(errors),
+        'probe_p50_ms': statistics.median(probes) if probes else None,
+        'probe_p99_ms': probes[int(len(probes) * 0.99)] if probes else None,
+    }
+
+
+def main(threads, seconds):
+    cpus = os.cpu_count() or 1
+    modes = [
+        ('inline (request thread)', 0, threads),
+        (f'process pool ({cpus} procs)', cpus, 2 * cpus),
+    ]
+    print(f"{'mode':<28} {'logins/sec':>11} {'errors':>7} {'probe p50':>10} {'probe p99':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, workers, concurrency in modes:
+            database = os.path.join(tmp, f'bench_{workers}.db')
+            app = make_app(database, workers, concurrency)
+            with app.app_context():
+                db.create_all()
+                user = Usuario(Nombre='Bench', email=EMAIL, ID_Rol=2)
+                user.set_password(PASSWORD)
+                user.save()
+                result = run(app, threads, seconds)
+                state = app.extensions['password_hasher']
+                if state.pool is not None:
+                    state.pool.shutdown()
+            print(
+                f"{label:<28} {result['logins_per_sec']:>11,.1f} {result['errors']:>7} "
+                f"{result['probe_p50_ms']:>8.1f}ms {result['probe_p99_ms']:>8.1f}ms"
+            )
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [16, 5][len(args):]))
@@ -0,0 +1,87 @@
+"""Benchmark: marshmallow TiquetSchema vs the precompiled serializer.
+
+Builds transient Tiquet objects with their five relations attached (no
+database involved) and reports rows/sec for each path.
+
+Usage (from the project root, with the usual .env loaded):
+
+    python -m benchmarks.bench_serializer
+    python -m benchmarks.bench_serializer 10000 100000 500000
+"""
+import sys
+import time
+from collections import namedtuple
+from datetime import date
+
+from app.models import (
+    CatTiquet, CatalogoCriticidad, EstadoTiquet, Tiquet, Ubicaciones, Usuario
+)
+from app.routes.tickets import TICKET_FIELDS, TiquetSchema
+from app.utils.fast_serializer import compile_serializer
+
+
+def build_tickets(n):
+    """Transient tickets sharing a handful of catalog rows, like real data."""
+    categorias = [CatTiquet(Categoria=i, Nombre=f'Cat {i}', Unidad_corresponde='IT') for i in range(1, 6)]
+    ubicaciones = [Ubicaciones(Id_ubicacion=i, Nombre=f'Sede {i}') for i in range(1, 4)]
+    criticidades = [CatalogoCriticidad(ID_criti=i, Nombre=f'Nivel {i}') for i in range(1, 5)]
+    estados = [EstadoTiquet(ID_estado=i, Nombre=f'Estado {i}', Descripcion=None) for i in range(1, 4)]
+    usuarios = [Usuario(ID_usuario=i, Nombre=f'Tecnico {i}', ID_Rol=2) for i in range(1, 21)]
+
+    tickets = []
+    for i in range(n):
+        ticket = Tiquet(
+            Id_Tiquet=i + 1,
+            Tel_ext='1234',
+            Descripcion=f'Descripción del ticket {i}',
+            Fecha_apertura=date(2025, 1 + i % 12, 1 + i % 28),
+            Fecha_cierre=None
+        )
+        ticket.categoria_rel = categorias[i % len(categorias)]
+        ticket.ubicacion_rel = ubicaciones[i % len(ubicaciones)]
+        ticket.criticidad_rel = criticidades[i % len(criticidades)]
+        ticket.estado_rel = estados[i % len(estados)]
+        ticket.usuario_asignado = usuarios[i % len(usuarios)]
+        ticket.Categoria = ticket.categoria_rel.Categoria
+        ticket.Ubicacion = ticket.ubicacion_rel.Id_ubicacion
+        ticket.Criticidad = ticket.criticidad_rel.ID_criti
+        ticket.Estado = ticket.estado_rel.ID_estado
+        ticket.User_asig = ticket.usuario_asignado.ID_usuario
+        tickets.append(ticket)
+    return tickets
+
+
+def timed(fn, rows):
+    start = time.perf_counter()
+    result = fn(rows)
+    elapsed = time.perf_counter() - start
+    return result, len(rows) / elapsed
+
+
+def main(sizes):
+    schema = TiquetSchema(many=True)
+    serialize = compile_serializer(TiquetSchema)
+    scalar_schema = TiquetSchema(many=True, only=TICKET_FIELDS)
+    serialize_scalar = compile_serializer(TiquetSchema, TICKET_FIELDS)
+    Row = namedtuple('Row', TICKET_FIELDS)
+
+    print(f"{'rows':>9} {'path':<28} {'rows/sec':>12} {'speedup':>8}")
+    for n in sizes:
+        tickets = build_tickets(n)
+        rows = [Row(*(getattr(t, f) for f in TICKET_FIELDS)) for t in tickets]
+
+        expected, base = timed(schema.dump, tickets)
+        actual, fast = timed(lambda items: [serialize(t) for t in items], tickets)
+        assert actual == expected, 'compiled output differs from marshmallow'
+        print(f'{n:>9} {"marshmallow (ORM, nested)":<28} {base:>12,.0f} {"1.0x":>8}')
+        print(f'{n:>9} {"compiled (ORM, nested)":<28} {fast:>12,.0f} {fast / base:>7.1f}x')
+
+        expected, base = timed(scalar_schema.dump, rows)
+        actual, fast = timed(lambda items: [serialize_scalar(r) for r in items], rows)
+        assert actual == expected, 'compiled output differs from marshmallow'
+        print(f'{n:>9} {"marshmallow (row tuples)":<28} {base:>12,.0f} {"1.0x":>8}')
+        print(f'{n:>9} {"compiled (row tuples)":<28} {fast:>12,.0f} {fast / base:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
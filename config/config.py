@@ -26,6 +26,71 @@ class Config:
     
     # Pagination
     POSTS_PER_PAGE = config('POSTS_PER_PAGE', default=20, cast=int)
+    MAX_PER_PAGE = config('MAX_PER_PAGE', default=100, cast=int)
+    # Máximo de tickets por petición en los endpoints masivos
+    BULK_MAX_ITEMS = config('BULK_MAX_ITEMS', default=1000, cast=int)
+    
+    # Catálogos en memoria (segundos antes de recargar en cada worker)
+    CATALOG_CACHE_TTL = config('CATALOG_CACHE_TTL', default=300, cast=int)
+    # Un id que no está en el catálogo lo recarga, como mucho cada tantos segundos
+    CATALOG_MISS_RELOAD = config('CATALOG_MISS_RELOAD', default=5, cast=int)
+    # Cache-Control max-age de los endpoints de catálogos (revalidan con ETag)
+    CATALOG_CACHE_MAX_AGE = config('CATALOG_CACHE_MAX_AGE', default=60, cast=int)
+    
+    # Usuario autenticado (current_user) en memoria por worker
+    PRINCIPAL_CACHE_SIZE = config('PRINCIPAL_CACHE_SIZE', default=1024, cast=int)
+    PRINCIPAL_CACHE_TTL = config('PRINCIPAL_CACHE_TTL', default=60, cast=int)
+    
+    # Revocación de JWT: filtro de Bloom por worker reconstruido cada N segundos
+    TOKEN_REVOCATION_REFRESH = config('TOKEN_REVOCATION_REFRESH', default=30, cast=int)
+    TOKEN_BLOOM_ERROR_RATE = config('TOKEN_BLOOM_ERROR_RATE', default=0.001, cast=float)
+    TOKEN_BLOOM_MIN_CAPACITY = config('TOKEN_BLOOM_MIN_CAPACITY', default=10000, cast=int)
+    # Archivo donde se guardan las revocaciones si la BD no está disponible
+    # (vacío = instance/revoked_tokens.tsv)
+    TOKEN_REVOCATION_FALLBACK = config('TOKEN_REVOCATION_FALLBACK', default='')
+    
+    # Caché de respuestas costosas (dashboard), por worker
+    RESPONSE_CACHE_TTL = config('RESPONSE_CACHE_TTL', default=5, cast=int)
+    RESPONSE_CACHE_WAIT_TIMEOUT = config('RESPONSE_CACHE_WAIT_TIMEOUT', default=30, cast=int)
+    
+    # Rango máximo (días) de /dashboard/timeseries
+    TIMESERIES_MAX_DAYS = config('TIMESERIES_MAX_DAYS', default=731, cast=int)
+    
+    # Auditoría (Log_transaccional) escrita por lotes en segundo plano
+    AUDIT_ENABLED = config('AUDIT_ENABLED', default=True, cast=bool)
+    AUDIT_ASYNC = config('AUDIT_ASYNC', default=True, cast=bool)
+    AUDIT_QUEUE_SIZE = config('AUDIT_QUEUE_SIZE', default=10000, cast=int)
+    AUDIT_BATCH_SIZE = config('AUDIT_BATCH_SIZE', default=500, cast=int)
+    AUDIT_FLUSH_INTERVAL = config('AUDIT_FLUSH_INTERVAL', default=1.0, cast=float)
+    AUDIT_SHUTDOWN_TIMEOUT = config('AUDIT_SHUTDOWN_TIMEOUT', default=5.0, cast=float)
+    # Retención: `flask compact-audit` mueve las entradas más antiguas por lotes
+    AUDIT_RETENTION_DAYS = config('AUDIT_RETENTION_DAYS', default=90, cast=int)
+    AUDIT_COMPACT_BATCH_SIZE = config('AUDIT_COMPACT_BATCH_SIZE', default=1000, cast=int)
+    
+    # Hash de contraseñas en un pool de procesos por worker (0 = en el hilo de la petición)
+    PASSWORD_HASH_METHOD = config('PASSWORD_HASH_METHOD', default='pbkdf2:sha256')
+    PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=min(4, os.cpu_count() or 1), cast=int)
+    PASSWORD_HASH_MAX_CONCURRENCY = config('PASSWORD_HASH_MAX_CONCURRENCY', default=8, cast=int)
+    # Segundos que una petición espera un hueco antes de responder 503
+    PASSWORD_HASH_TIMEOUT = config('PASSWORD_HASH_TIMEOUT', default=5.0, cast=float)
+    
+    # Límite de peticiones (token bucket "capacidad/segundos") compartido entre workers
+    RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+    RATE_LIMIT_BACKEND = config('RATE_LIMIT_BACKEND', default='sqlite')
+    # Archivo SQLite compartido (vacío = instance/ratelimit.sqlite3)
+    RATE_LIMIT_PATH = config('RATE_LIMIT_PATH', default='')
+    RATE_LIMIT_LOGIN_IP = config('RATE_LIMIT_LOGIN_IP', default='20/60')
+    RATE_LIMIT_LOGIN_EMAIL = config('RATE_LIMIT_LOGIN_EMAIL', default='5/60')
+    RATE_LIMIT_REGISTER_IP = config('RATE_LIMIT_REGISTER_IP', default='10/3600')
+    
+    # Streaming (NDJSON)
+    STREAM_CHUNK_SIZE = config('STREAM_CHUNK_SIZE', default=500, cast=int)
+    
+    # Response compression (brotli is used only if the package is installed)
+    COMPRESS_MIN_SIZE = config('COMPRESS_MIN_SIZE', default=1024, cast=int)
+    COMPRESS_LEVEL = config('COMPRESS_LEVEL', default=6, cast=int)
+    COMPRESS_BROTLI_QUALITY = config('COMPRESS_BROTLI_QUALITY', default=4, cast=int)
+    COMPRESS_MIMETYPES = ('application/json', 'application/x-ndjson')
     
     # Email (if needed)
     MAIL_SERVER = config('MAIL_SERVER', default='localhost')
@@ -72,6 +137,13 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    # Sin hilo de fondo: las entradas se escriben al momento
+    AUDIT_ASYNC = False
+    # Hash en el hilo de la petición y con un coste bajo
+    PASSWORD_HASH_WORKERS = 0
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    # Límites por proceso, sin archivo compartido
+    RATE_LIMIT_BACKEND = 'memory'
 
 
 # Configuration dictionary
@@ -0,0 +1,30 @@
+"""Indices unicos de Usuario (email y Nombre)
+
+Revision ID: 03dfe6bb4e4d
+Revises: cf6266671ca2
+Create Date: 2026-10-18 16:12:44.905317
+
+Falla si ya hay emails o nombres repetidos; hay que resolverlos antes de
+aplicarla.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '03dfe6bb4e4d'
+down_revision = 'cf6266671ca2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Usuario', schema=None) as batch_op:
+        batch_op.create_index('ux_usuario_email', ['email'], unique=True)
+        batch_op.create_index('ux_usuario_nombre', ['Nombre'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('Usuario', schema=None) as batch_op:
+        batch_op.drop_index('ux_usuario_nombre')
+        batch_op.drop_index('ux_usuario_email')
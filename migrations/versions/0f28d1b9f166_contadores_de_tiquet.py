@@ -0,0 +1,38 @@
+"""Tabla Tiquet_contador para las estadísticas del dashboard
+
+Revision ID: 0f28d1b9f166
+Revises: 3bc4c4e6bb75
+Create Date: 2026-10-18 11:04:17.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f28d1b9f166'
+down_revision = '3bc4c4e6bb75'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Tiquet_contador',
+    sa.Column('Dimension', sa.String(length=20), nullable=False),
+    sa.Column('Valor', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Cantidad', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('Dimension', 'Valor')
+    )
+    # Carga inicial desde los tickets existentes (Valor 0 = sin asignar)
+    op.execute(
+        "INSERT INTO Tiquet_contador (Dimension, Valor, Cantidad) "
+        "SELECT 'estado', COALESCE(Estado, 0), COUNT(*) FROM Tiquet GROUP BY COALESCE(Estado, 0)"
+    )
+    op.execute(
+        "INSERT INTO Tiquet_contador (Dimension, Valor, Cantidad) "
+        "SELECT 'criticidad', COALESCE(Criticidad, 0), COUNT(*) FROM Tiquet GROUP BY COALESCE(Criticidad, 0)"
+    )
+
+
+def downgrade():
+    op.drop_table('Tiquet_contador')
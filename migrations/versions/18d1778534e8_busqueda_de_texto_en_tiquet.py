@@ -0,0 +1,54 @@
+"""Índice de texto completo sobre Tiquet.Descripcion
+
+Revision ID: 18d1778534e8
+Revises: bc9f83be7031
+Create Date: 2026-10-18 13:47:05.631920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '18d1778534e8'
+down_revision = 'bc9f83be7031'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.create_index('ft_tiquet_descripcion', 'Tiquet', ['Descripcion'], mysql_prefix='FULLTEXT')
+    elif dialect == 'sqlite':
+        # Tabla FTS5 de contenido externo, sincronizada con triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE Tiquet_fts USING fts5("
+            "Descripcion, content='Tiquet', content_rowid='Id_Tiquet', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER Tiquet_fts_ai AFTER INSERT ON Tiquet BEGIN "
+            "INSERT INTO Tiquet_fts(rowid, Descripcion) VALUES (new.Id_Tiquet, new.Descripcion); END"
+        )
+        op.execute(
+            "CREATE TRIGGER Tiquet_fts_ad AFTER DELETE ON Tiquet BEGIN "
+            "INSERT INTO Tiquet_fts(Tiquet_fts, rowid, Descripcion) VALUES ('delete', old.Id_Tiquet, old.Descripcion); END"
+        )
+        op.execute(
+            "CREATE TRIGGER Tiquet_fts_au AFTER UPDATE OF Descripcion ON Tiquet BEGIN "
+            "INSERT INTO Tiquet_fts(Tiquet_fts, rowid, Descripcion) VALUES ('delete', old.Id_Tiquet, old.Descripcion); "
+            "INSERT INTO Tiquet_fts(rowid, Descripcion) VALUES (new.Id_Tiquet, new.Descripcion); END"
+        )
+        # Indexar los tickets existentes
+        op.execute("INSERT INTO Tiquet_fts(Tiquet_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.drop_index('ft_tiquet_descripcion', table_name='Tiquet')
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS Tiquet_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS Tiquet_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS Tiquet_fts_ai")
+        op.execute("DROP TABLE IF EXISTS Tiquet_fts")
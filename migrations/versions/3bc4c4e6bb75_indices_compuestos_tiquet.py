@@ -0,0 +1,34 @@
+"""Indices compuestos para filtros y orden de Tiquet
+
+Revision ID: 3bc4c4e6bb75
+Revises: 800ca0dc7a0c
+Create Date: 2026-10-18 09:12:41.530218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3bc4c4e6bb75'
+down_revision = '800ca0dc7a0c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Tiquet', schema=None) as batch_op:
+        batch_op.create_index('ix_tiquet_fecha_apertura_id', ['Fecha_apertura', 'Id_Tiquet'], unique=False)
+        batch_op.create_index('ix_tiquet_estado_criticidad_fecha', ['Estado', 'Criticidad', 'Fecha_apertura'], unique=False)
+        batch_op.create_index('ix_tiquet_user_asig_estado', ['User_asig', 'Estado'], unique=False)
+        batch_op.create_index('ix_tiquet_categoria_fecha', ['Categoria', 'Fecha_apertura'], unique=False)
+        batch_op.create_index('ix_tiquet_ubicacion_fecha', ['Ubicacion', 'Fecha_apertura'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Tiquet', schema=None) as batch_op:
+        batch_op.drop_index('ix_tiquet_ubicacion_fecha')
+        batch_op.drop_index('ix_tiquet_categoria_fecha')
+        batch_op.drop_index('ix_tiquet_user_asig_estado')
+        batch_op.drop_index('ix_tiquet_estado_criticidad_fecha')
+        batch_op.drop_index('ix_tiquet_fecha_apertura_id')
@@ -0,0 +1,43 @@
+"""Log_transaccional sin llaves foraneas
+
+Revision ID: 8dda97bfd4ec
+Revises: 03dfe6bb4e4d
+Create Date: 2026-10-18 16:41:07.318254
+
+Como en Log_transaccional_archivo, las entradas guardan los ids de tickets y
+usuarios aunque estos se eliminen. Las llaves originales se crearon sin
+nombre, así que se buscan por columna; en SQLite se nombran con la
+convención de batch_alter_table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8dda97bfd4ec'
+down_revision = '03dfe6bb4e4d'
+branch_labels = None
+depends_on = None
+
+NAMING_CONVENTION = {
+    'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s',
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    names = [
+        fk['name'] or f"fk_Log_transaccional_{fk['constrained_columns'][0]}_{fk['referred_table']}"
+        for fk in inspector.get_foreign_keys('Log_transaccional')
+        if fk['constrained_columns'] in (['Usuario'], ['Tiquet'])
+    ]
+    with op.batch_alter_table('Log_transaccional', schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        for name in names:
+            batch_op.drop_constraint(name, type_='foreignkey')
+
+
+def downgrade():
+    # Falla si quedan entradas de tickets o usuarios ya eliminados
+    with op.batch_alter_table('Log_transaccional', schema=None) as batch_op:
+        batch_op.create_foreign_key('fk_log_transaccional_tiquet', 'Tiquet', ['Tiquet'], ['Id_Tiquet'])
+        batch_op.create_foreign_key('fk_log_transaccional_usuario', 'Usuario', ['Usuario'], ['ID_usuario'])
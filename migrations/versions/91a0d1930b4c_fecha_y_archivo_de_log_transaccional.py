@@ -0,0 +1,46 @@
+"""Fecha, indices y archivo de Log_transaccional
+
+Revision ID: 91a0d1930b4c
+Revises: cb41e665d5fd
+Create Date: 2026-10-18 15:04:51.730214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '91a0d1930b4c'
+down_revision = 'cb41e665d5fd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Log_transaccional', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('Fecha', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_log_tiquet_fecha', ['Tiquet', 'Fecha', 'Id_log'], unique=False)
+        batch_op.create_index('ix_log_usuario_fecha', ['Usuario', 'Fecha', 'Id_log'], unique=False)
+
+    op.create_table('Log_transaccional_archivo',
+    sa.Column('Id_log', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Usuario', sa.Integer(), nullable=True),
+    sa.Column('Tiquet', sa.Integer(), nullable=True),
+    sa.Column('Accion', sa.String(length=255), nullable=True),
+    sa.Column('Fecha', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('Id_log')
+    )
+    with op.batch_alter_table('Log_transaccional_archivo', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_Log_transaccional_archivo_Fecha'), ['Fecha'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Log_transaccional_archivo', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_Log_transaccional_archivo_Fecha'))
+
+    op.drop_table('Log_transaccional_archivo')
+
+    with op.batch_alter_table('Log_transaccional', schema=None) as batch_op:
+        batch_op.drop_index('ix_log_usuario_fecha')
+        batch_op.drop_index('ix_log_tiquet_fecha')
+        batch_op.drop_column('Fecha')
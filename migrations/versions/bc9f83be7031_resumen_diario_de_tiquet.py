@@ -0,0 +1,44 @@
+"""Tabla Tiquet_resumen_diario para las series temporales del dashboard
+
+Revision ID: bc9f83be7031
+Revises: 0f28d1b9f166
+Create Date: 2026-10-18 12:31:48.215307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bc9f83be7031'
+down_revision = '0f28d1b9f166'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Tiquet_resumen_diario',
+    sa.Column('Fecha', sa.Date(), nullable=False),
+    sa.Column('Estado', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Criticidad', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Categoria', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Abiertos', sa.Integer(), nullable=False),
+    sa.Column('Cerrados', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('Fecha', 'Estado', 'Criticidad', 'Categoria')
+    )
+    # Carga inicial: aperturas y cierres de los tickets existentes (0 = sin asignar)
+    op.execute(
+        "INSERT INTO Tiquet_resumen_diario (Fecha, Estado, Criticidad, Categoria, Abiertos, Cerrados) "
+        "SELECT Fecha, Estado, Criticidad, Categoria, SUM(Abiertos), SUM(Cerrados) FROM ("
+        " SELECT Fecha_apertura AS Fecha, COALESCE(Estado, 0) AS Estado,"
+        " COALESCE(Criticidad, 0) AS Criticidad, COALESCE(Categoria, 0) AS Categoria,"
+        " 1 AS Abiertos, 0 AS Cerrados FROM Tiquet WHERE Fecha_apertura IS NOT NULL"
+        " UNION ALL"
+        " SELECT Fecha_cierre, COALESCE(Estado, 0), COALESCE(Criticidad, 0), COALESCE(Categoria, 0),"
+        " 0, 1 FROM Tiquet WHERE Fecha_cierre IS NOT NULL"
+        ") movimientos GROUP BY Fecha, Estado, Criticidad, Categoria"
+    )
+
+
+def downgrade():
+    op.drop_table('Tiquet_resumen_diario')
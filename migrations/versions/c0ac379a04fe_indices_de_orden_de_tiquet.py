@@ -0,0 +1,32 @@
+"""Indices de Tiquet para cada orden del listado
+
+Revision ID: c0ac379a04fe
+Revises: 8dda97bfd4ec
+Create Date: 2026-10-18 16:58:23.604127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c0ac379a04fe'
+down_revision = '8dda97bfd4ec'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Tiquet', schema=None) as batch_op:
+        batch_op.create_index('ix_tiquet_estado_fecha_apertura', ['Estado', 'Fecha_apertura', 'Id_Tiquet'], unique=False)
+        batch_op.create_index('ix_tiquet_fecha_cierre_id', ['Fecha_cierre', 'Id_Tiquet'], unique=False)
+        batch_op.create_index('ix_tiquet_criticidad_id', ['Criticidad', 'Id_Tiquet'], unique=False)
+        batch_op.create_index('ix_tiquet_estado_id', ['Estado', 'Id_Tiquet'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Tiquet', schema=None) as batch_op:
+        batch_op.drop_index('ix_tiquet_estado_id')
+        batch_op.drop_index('ix_tiquet_criticidad_id')
+        batch_op.drop_index('ix_tiquet_fecha_cierre_id')
+        batch_op.drop_index('ix_tiquet_estado_fecha_apertura')
@@ -0,0 +1,26 @@
+"""Indice de Comentarios por ticket y fecha
+
+Revision ID: cb41e665d5fd
+Revises: 18d1778534e8
+Create Date: 2026-10-18 14:22:36.184507
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cb41e665d5fd'
+down_revision = '18d1778534e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Comentarios', schema=None) as batch_op:
+        batch_op.create_index('ix_comentarios_tiquet_fecha', ['Id_Tiquet', 'Fecha', 'ID_comentario'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Comentarios', schema=None) as batch_op:
+        batch_op.drop_index('ix_comentarios_tiquet_fecha')
@@ -0,0 +1,35 @@
+"""Tokens revocados
+
+Revision ID: cf6266671ca2
+Revises: 91a0d1930b4c
+Create Date: 2026-10-18 15:41:07.218845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cf6266671ca2'
+down_revision = '91a0d1930b4c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Token_revocado',
+    sa.Column('Jti', sa.String(length=36), nullable=False),
+    sa.Column('ID_usuario', sa.Integer(), nullable=True),
+    sa.Column('Expira', sa.DateTime(), nullable=False),
+    sa.Column('Fecha', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('Jti')
+    )
+    with op.batch_alter_table('Token_revocado', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_Token_revocado_Expira'), ['Expira'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Token_revocado', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_Token_revocado_Expira'))
+
+    op.drop_table('Token_revocado')
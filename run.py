@@ -1,4 +1,5 @@
 import os
+import click
 from flask_migrate import upgrade
 from app import create_app, db
 from app.models import Usuario
@@ -26,6 +27,44 @@ def create_admin():
     print("Email: aadmin@test.com | Password: secret123")
 
 
+@app.cli.command()
+def reconcile_counters():
+    """Rebuild the dashboard counters and daily rollups from the Tiquet table."""
+    from app.services.ticket_stats import rebuild_counters, rebuild_rollups
+    
+    differences = rebuild_counters()
+    rollups = rebuild_rollups()
+    db.session.commit()
+    for dimension, valor, before, after in differences:
+        print(f"{dimension}={valor}: {before} -> {after}")
+    print(f"Counters reconciled ({len(differences)} corrected)")
+    print(f"Daily rollups rebuilt ({rollups} rows)")
+
+
+@app.cli.command()
+@click.option('--days', type=int, default=None, help='Keep entries newer than this many days.')
+@click.option('--batch-size', type=int, default=None, help='Entries moved per transaction.')
+@click.option('--path', default=None, help='Append to this .jsonl.gz file instead of the archive table.')
+def compact_audit(days, batch_size, path):
+    """Move old audit entries out of Log_transaccional."""
+    from datetime import datetime, timedelta
+    from app.services.audit_retention import compact
+    
+    days = app.config['AUDIT_RETENTION_DAYS'] if days is None else days
+    batch_size = batch_size or app.config['AUDIT_COMPACT_BATCH_SIZE']
+    before = datetime.utcnow() - timedelta(days=days)
+    moved = compact(before, batch_size=batch_size, path=path)
+    print(f"Moved {moved} audit entries older than {before:%Y-%m-%d} to {path or 'Log_transaccional_archivo'}")
+
+
+@app.cli.command()
+def purge_revoked_tokens():
+    """Delete revoked tokens that have already expired."""
+    from app.services.token_revocation import token_revocation
+    
+    print(f"Purged {token_revocation.purge()} expired revoked tokens")
+
+
 @app.shell_context_processor
 def make_shell_context():
     """Make database models available in Flask shell."""
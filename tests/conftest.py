@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import (
+    CatTiquet, CatalogoCriticidad, EstadoTiquet, Ubicaciones, Usuario
+)
+
+
+@pytest.fixture
+def app():
+    """Create application for testing."""
+    app = create_app('testing')
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+
+@pytest.fixture
+def catalogs(app):
+    """Seed the ticket catalogs."""
+    db.session.add_all([
+        CatTiquet(Categoria=1, Nombre='Hardware', Unidad_corresponde='IT'),
+        CatTiquet(Categoria=2, Nombre='Software', Unidad_corresponde='IT'),
+        Ubicaciones(Id_ubicacion=1, Nombre='Oficina central'),
+        CatalogoCriticidad(ID_criti=1, Nombre='Baja'),
+        CatalogoCriticidad(ID_criti=2, Nombre='Alta'),
+        EstadoTiquet(ID_estado=1, Nombre='Abierto'),
+        EstadoTiquet(ID_estado=2, Nombre='Cerrado'),
+    ])
+    db.session.commit()
+
+
+@pytest.fixture
+def user(app):
+    """Create an admin user without paying for password hashing."""
+    user = Usuario(Nombre='Admin', email='admin@test.com', ID_Rol=1, password='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    """Authorization header for the test user."""
+    token = user.get_tokens()['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def statements(app):
+    """Collect the SQL statements executed while the fixture is active."""
+    collected = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        collected.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield collected
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,157 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import LogTransaccional, LogTransaccionalArchivo, Tiquet, Usuario
+from app.services.audit import audit
+from app.services.audit_retention import compact
+
+
+def test_ticket_writes_are_audited(client, catalogs, user, auth_headers):
+    """Ticket mutations leave entries in Log_transaccional."""
+    user_id = user.ID_usuario
+    ticket_id = client.post(
+        '/api/tickets/tickets', json={'Estado': 1}, headers=auth_headers
+    ).get_json()['data']['Id_Tiquet']
+    client.put(f'/api/tickets/tickets/{ticket_id}/close', headers=auth_headers)
+    client.delete(f'/api/tickets/tickets/{ticket_id}', headers=auth_headers)
+    
+    entries = [(e.Accion, e.Tiquet, e.Usuario) for e in LogTransaccional.query.order_by(LogTransaccional.Id_log)]
+    # The history keeps the id of the removed ticket
+    assert entries == [
+        ('tiquet.crear', ticket_id, user_id),
+        ('tiquet.cerrar', ticket_id, user_id),
+        (f'tiquet.eliminar {ticket_id}', ticket_id, user_id),
+    ]
+    assert Tiquet.query.count() == 0
+    assert LogTransaccional.query.first().tiquet_rel is None
+
+
+def test_background_writer_batches_entries(app, user):
+    """Queued entries are written by the background thread in batches."""
+    app.config.update(AUDIT_ASYNC=True, AUDIT_BATCH_SIZE=10, AUDIT_FLUSH_INTERVAL=0.05)
+    state = app.extensions['audit']
+    try:
+        for i in range(25):
+            audit.log(f'prueba {i}', usuario=user.ID_usuario)
+        assert audit.flush(timeout=5)
+    finally:
+        audit._shutdown(state)
+    
+    stats = audit.stats()
+    assert stats['written'] == 25
+    assert stats['sync_writes'] == 0
+    assert stats['batches'] < 25
+    assert stats['queue_depth'] == 0
+    assert LogTransaccional.query.count() == 25
+
+
+def test_full_queue_falls_back_to_synchronous_write(app, monkeypatch):
+    """When the queue is full the entry is written inline, not dropped."""
+    app.config.update(AUDIT_ASYNC=True)
+    state = app.extensions['audit']
+    monkeypatch.setattr(state.queue, 'maxsize', 1)
+    monkeypatch.setattr(audit, '_ensure_thread', lambda state: None)
+    
+    audit.log('encolada')
+    audit.log('síncrona')
+    assert LogTransaccional.query.count() == 1
+    assert audit.flush(timeout=5)
+    
+    stats = audit.stats()
+    assert stats['sync_writes'] == 1
+    assert stats['written'] == 2
+    assert {e.Accion for e in LogTransaccional.query} == {'encolada', 'síncrona'}
+
+
+def test_failed_batch_is_retried_row_by_row(app, user):
+    """One rejected entry does not drop the rest of its batch."""
+    state = app.extensions['audit']
+    db.session.add(LogTransaccional(Id_log=1, Accion='existente'))
+    db.session.commit()
+    
+    audit._write(state, [
+        {'Id_log': id_log, 'Usuario': user.ID_usuario, 'Tiquet': None,
+         'Accion': f'lote {id_log}', 'Fecha': datetime.utcnow()}
+        for id_log in (2, 1, 3)
+    ])
+    
+    entries = LogTransaccional.query.order_by(LogTransaccional.Id_log)
+    assert [e.Accion for e in entries] == ['existente', 'lote 2', 'lote 3']
+    stats = audit.stats()
+    assert stats['written'] == 2
+    assert stats['failed'] == 1
+
+
+def test_audit_history_is_paginated_newest_first(client, user, auth_headers):
+    """The ticket and user history endpoints page through entries by date."""
+    base = datetime(2025, 1, 1)
+    db.session.add_all([
+        LogTransaccional(Usuario=user.ID_usuario, Accion=f'accion {i}', Fecha=base + timedelta(days=i))
+        for i in range(5)
+    ])
+    db.session.commit()
+    
+    pages = []
+    cursor = None
+    while True:
+        params = {'limit': 2, 'desde': '02-01-2025'}
+        if cursor:
+            params['cursor'] = cursor
+        body = client.get(
+            f'/api/audit/users/{user.ID_usuario}', query_string=params, headers=auth_headers
+        ).get_json()
+        pages.append([entry['Accion'] for entry in body['data']])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    assert pages == [['accion 4', 'accion 3'], ['accion 2', 'accion 1']]
+    
+    response = client.get('/api/audit/tickets/1', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['data'] == []
+
+
+def test_audit_history_requires_admin(client, app):
+    """Non-admin users cannot read the audit log."""
+    agent = Usuario(Nombre='Agente', email='agente@test.com', ID_Rol=2, password='x')
+    db.session.add(agent)
+    db.session.commit()
+    token = agent.get_tokens()['access_token']
+    
+    response = client.get(
+        f'/api/audit/users/{agent.ID_usuario}', headers={'Authorization': f'Bearer {token}'}
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize('to_file', [False, True])
+def test_compact_moves_old_entries(app, user, tmp_path, to_file):
+    """Compaction moves old entries in batches and keeps recent ones."""
+    now = datetime.utcnow()
+    db.session.add_all(
+        [LogTransaccional(Accion=f'vieja {i}', Fecha=now - timedelta(days=200)) for i in range(5)]
+        + [LogTransaccional(Accion='sin fecha'), LogTransaccional(Accion='reciente', Fecha=now)]
+    )
+    db.session.flush()
+    # Entries written before the column existed have no date
+    db.session.execute(
+        db.update(LogTransaccional).where(LogTransaccional.Accion == 'sin fecha').values(Fecha=None)
+    )
+    db.session.commit()
+    path = str(tmp_path / 'audit.jsonl.gz') if to_file else None
+    
+    moved = compact(now - timedelta(days=90), batch_size=2, path=path)
+    
+    assert moved == 6
+    assert [e.Accion for e in LogTransaccional.query] == ['reciente']
+    if to_file:
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            archived = [json.loads(line)['Accion'] for line in archive]
+        assert LogTransaccionalArchivo.query.count() == 0
+    else:
+        archived = [e.Accion for e in LogTransaccionalArchivo.query.order_by(LogTransaccionalArchivo.Id_log)]
+    assert archived == [f'vieja {i}' for i in range(5)] + ['sin fecha']
@@ -0,0 +1,310 @@
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import decode_token
+from sqlalchemy.exc import OperationalError
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app import db
+from app.models import LogTransaccional, Permiso, RolPermiso, TokenRevocado, Usuario
+from app.services.permissions import permissions
+from app.services.principals import principals
+from app.services.token_revocation import token_revocation
+from app.utils.bloom import BloomFilter
+from app.utils.password_hashing import normalize_method, password_hasher
+
+
+def test_register_and_login(client):
+    """A registered user can log in with the same password."""
+    response = client.post('/api/auth/register', json={
+        'nombre': 'Tecnico', 'email': 'tecnico@test.com', 'password': 'secret123'
+    })
+    assert response.status_code == 201
+
+    response = client.post('/api/auth/login', json={'email': 'tecnico@test.com', 'password': 'secret123'})
+    assert response.status_code == 200
+    assert 'access_token' in response.get_json()['tokens']
+
+    response = client.post('/api/auth/login', json={'email': 'tecnico@test.com', 'password': 'otra'})
+    assert response.status_code == 401
+
+
+def test_login_rehashes_to_configured_method(client, app):
+    """A hash made with another method is upgraded on the next login."""
+    old_hash = generate_password_hash('secret123', method='pbkdf2:sha256:500')
+    db.session.add(Usuario(Nombre='Legacy', email='legacy@test.com', ID_Rol=2, password=old_hash))
+    db.session.commit()
+
+    response = client.post('/api/auth/login', json={'email': 'legacy@test.com', 'password': 'secret123'})
+    assert response.status_code == 200
+
+    user = Usuario.query.filter_by(email='legacy@test.com').one()
+    assert user.password != old_hash
+    assert user.password.startswith(normalize_method(app.config['PASSWORD_HASH_METHOD']) + '$')
+    assert check_password_hash(user.password, 'secret123')
+    assert not user.password_needs_rehash()
+
+
+def test_saturated_hashing_returns_503(client, app):
+    """Logins that cannot get a hashing slot in time are rejected with 503."""
+    app.config['PASSWORD_HASH_TIMEOUT'] = 0.01
+    state = app.extensions['password_hasher']
+    db.session.add(Usuario(
+        Nombre='Busy', email='busy@test.com', ID_Rol=2,
+        password=generate_password_hash('secret123', method='pbkdf2:sha256:1000')
+    ))
+    db.session.commit()
+
+    taken = 0
+    while state.slots.acquire(blocking=False):
+        taken += 1
+    try:
+        response = client.post('/api/auth/login', json={'email': 'busy@test.com', 'password': 'secret123'})
+    finally:
+        for _ in range(taken):
+            state.slots.release()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert password_hasher.stats()['rejected'] == 1
+
+
+def test_hashing_in_process_pool(app):
+    """With workers configured, hashes are computed in the process pool."""
+    app.config['PASSWORD_HASH_WORKERS'] = 1
+    state = app.extensions['password_hasher']
+    try:
+        pwhash = password_hasher.hash('secret123')
+        assert password_hasher.verify(pwhash, 'secret123')
+        assert not password_hasher.verify(pwhash, 'otra')
+        assert state.pool is not None
+        assert state.pool._mp_context.get_start_method() == 'forkserver'
+    finally:
+        if state.pool is not None:
+            state.pool.shutdown()
+    assert password_hasher.stats()['in_flight'] == 0
+
+
+def test_normalize_method():
+    """Methods are compared with werkzeug's defaults spelled out."""
+    assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+    assert normalize_method('pbkdf2:sha512:1000') == 'pbkdf2:sha512:1000'
+    assert normalize_method('pbkdf2').startswith('pbkdf2:sha256:')
+
+
+def test_current_user_is_cached_between_requests(client, user, auth_headers, statements):
+    """Authorization checks reuse the cached principal instead of querying Usuario."""
+    client.get('/api/auth/me', headers=auth_headers)
+
+    statements.clear()
+    response = client.get('/api/auth/me', headers=auth_headers)
+    assert response.get_json()['user']['is_admin'] is True
+    assert not [s for s in statements if 'FROM "Usuario"' in s]
+
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_update_user_invalidates_principal(client, user, auth_headers):
+    """Role changes reach the next request of that user and force a token refresh."""
+    agent = Usuario(Nombre='Agente', email='agente@test.com', ID_Rol=1, password='x')
+    db.session.add(agent)
+    db.session.commit()
+    tokens = agent.get_tokens()
+    agent_headers = _bearer(tokens['access_token'])
+    assert client.get('/api/users/', headers=agent_headers).status_code == 200
+
+    response = client.put(f'/api/users/{agent.ID_usuario}', json={'ID_Rol': 2}, headers=auth_headers)
+    assert response.status_code == 200
+    assert client.get('/api/users/', headers=agent_headers).status_code == 401
+
+    access_token = client.post(
+        '/api/auth/refresh', headers=_bearer(tokens['refresh_token'])
+    ).get_json()['access_token']
+    agent_headers = _bearer(access_token)
+    assert client.get('/api/users/', headers=agent_headers).status_code == 403
+
+    client.delete(f'/api/users/{agent.ID_usuario}', headers=auth_headers)
+    assert client.get('/api/auth/me', headers=agent_headers).status_code == 401
+
+
+def test_principal_cache_evicts_least_recently_used(app, user):
+    """The cache keeps at most PRINCIPAL_CACHE_SIZE users."""
+    app.config['PRINCIPAL_CACHE_SIZE'] = 2
+    others = [Usuario(Nombre=f'U{i}', email=f'u{i}@test.com', ID_Rol=2, password='x') for i in range(2)]
+    db.session.add_all(others)
+    db.session.commit()
+
+    principals.get(user.ID_usuario)
+    principals.get(others[0].ID_usuario)
+    principals.get(user.ID_usuario)
+    principals.get(others[1].ID_usuario)
+
+    assert list(app.extensions['principals'].entries) == [user.ID_usuario, others[1].ID_usuario]
+    assert principals.get(12345) is None
+
+
+def test_permissions_are_checked_from_token_claims(client, app, statements):
+    """Granted permissions travel in the token and are checked without queries."""
+    db.session.add_all([
+        Permiso(ID_Permiso=3, Nombre='usuarios.ver'),
+        Permiso(ID_Permiso=5, Nombre='auditoria.ver'),
+        RolPermiso(ID_Rol=2, ID_Permiso=3),
+    ])
+    agent = Usuario(Nombre='Agente', email='agente@test.com', ID_Rol=2, password='x')
+    db.session.add(agent)
+    db.session.commit()
+    tokens = agent.get_tokens()
+    headers = _bearer(tokens['access_token'])
+    assert permissions.claims(2)['perms'] == 1 << 3
+
+    client.get('/api/auth/me', headers=headers)
+    statements.clear()
+    assert client.get(f'/api/audit/users/{agent.ID_usuario}', headers=headers).status_code == 403
+    assert statements == []
+    assert client.get('/api/users/', headers=headers).status_code == 200
+
+    # A new grant for the role outdates its tokens until they are refreshed
+    db.session.add(RolPermiso(ID_Rol=2, ID_Permiso=5))
+    db.session.commit()
+    permissions.invalidate()
+    assert client.get(f'/api/audit/users/{agent.ID_usuario}', headers=headers).status_code == 401
+
+    access_token = client.post(
+        '/api/auth/refresh', headers=_bearer(tokens['refresh_token'])
+    ).get_json()['access_token']
+    response = client.get(f'/api/audit/users/{agent.ID_usuario}', headers=_bearer(access_token))
+    assert response.status_code == 200
+    # Internal metrics need their own permission
+    assert client.get('/metrics', headers=_bearer(access_token)).status_code == 403
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, user):
+    """Revoked tokens are rejected; other tokens pass the filter without queries."""
+    tokens = user.get_tokens()
+    other = _bearer(user.get_tokens()['access_token'])
+    response = client.post(
+        '/api/auth/logout', json={'refresh_token': tokens['refresh_token']},
+        headers=_bearer(tokens['access_token'])
+    )
+    assert response.get_json()['revoked'] == ['access', 'refresh']
+
+    assert client.get('/api/auth/me', headers=_bearer(tokens['access_token'])).status_code == 401
+    assert client.post('/api/auth/refresh', headers=_bearer(tokens['refresh_token'])).status_code == 401
+    assert client.get('/api/auth/me', headers=other).status_code == 200
+
+    stats = token_revocation.stats()
+    assert stats['confirmed'] == 2
+    assert stats['filter_keys'] == 2
+
+
+def test_revocation_survives_filter_rebuild_and_database_outage(app, user, tmp_path, monkeypatch):
+    """Revocations fall back to a local file and are reloaded on rebuild."""
+    app.config['TOKEN_REVOCATION_FALLBACK'] = str(tmp_path / 'revoked.tsv')
+    expires = datetime.utcnow() + timedelta(hours=1)
+    token_revocation.revoke('en-bd', expires)
+
+    def unavailable(*args, **kwargs):
+        raise OperationalError('INSERT', {}, Exception('database is down'))
+
+    monkeypatch.setattr(db.session, 'merge', unavailable)
+    token_revocation.revoke('en-archivo', expires)
+    monkeypatch.undo()
+
+    app.config['TOKEN_REVOCATION_REFRESH'] = 0
+    assert token_revocation.is_revoked('en-bd')
+    assert token_revocation.is_revoked('en-archivo')
+    assert not token_revocation.is_revoked('otro')
+    assert token_revocation.stats()['fallback_entries'] == 1
+    assert TokenRevocado.query.count() == 1
+
+
+def test_revocations_during_rebuild_reach_the_new_filter(app, user, tmp_path, monkeypatch):
+    """The rebuild reads the store without the lock and keeps concurrent revocations."""
+    app.config['TOKEN_REVOCATION_FALLBACK'] = str(tmp_path / 'revoked.tsv')
+    app.config['TOKEN_REVOCATION_REFRESH'] = 0
+    state = app.extensions['token_revocation']
+    expires = datetime.utcnow() + timedelta(hours=1)
+    read_fallback = token_revocation._read_fallback
+
+    def unavailable(*args, **kwargs):
+        raise OperationalError('INSERT', {}, Exception('database is down'))
+
+    def revoke_while_building():
+        entries = read_fallback()
+        assert state.lock.acquire(blocking=False)
+        state.lock.release()
+        token_revocation.revoke('en-bd', expires)
+        with monkeypatch.context() as patch:
+            patch.setattr(db.session, 'merge', unavailable)
+            token_revocation.revoke('en-archivo', expires)
+        return entries
+
+    monkeypatch.setattr(token_revocation, '_read_fallback', revoke_while_building)
+    assert not token_revocation.is_revoked('otro')
+    monkeypatch.undo()
+
+    app.config['TOKEN_REVOCATION_REFRESH'] = 3600
+    assert token_revocation.is_revoked('en-bd')
+    assert token_revocation.is_revoked('en-archivo')
+    assert state.fallback == {'en-archivo': expires}
+
+
+def test_bloom_filter_false_positive_rate():
+    """The filter stays near its configured error rate at capacity."""
+    bloom = BloomFilter(10000, 0.01)
+    for i in range(10000):
+        bloom.add(f'revocado-{i}')
+    assert all(f'revocado-{i}' in bloom for i in range(10000))
+    false_positives = sum(f'valido-{i}' in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+    assert abs(bloom.expected_error_rate() - 0.01) < 0.005
+
+
+def test_register_rejects_duplicates_with_one_insert(client, user, statements):
+    """Duplicate emails and names are caught by the unique indexes."""
+    statements.clear()
+    response = client.post('/api/auth/register', json={
+        'nombre': 'Otro', 'email': 'admin@test.com', 'password': 'secret123'
+    })
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Email already exists'}
+    assert not [s for s in statements if s.startswith('SELECT') and 'FROM "Usuario"' in s]
+
+    response = client.post('/api/auth/register', json={
+        'nombre': 'Admin', 'email': 'otro@test.com', 'password': 'secret123'
+    })
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Username already exists'}
+    assert Usuario.query.count() == 1
+
+
+def test_update_user_rejects_taken_email(client, user, auth_headers):
+    """Updating to another user's email or name returns the same 400 errors."""
+    agent = Usuario(Nombre='Agente', email='agente@test.com', ID_Rol=2, password='x')
+    db.session.add(agent)
+    db.session.commit()
+
+    response = client.put(f'/api/users/{agent.ID_usuario}', json={'email': 'admin@test.com'}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Email already exists'}
+
+    response = client.put(f'/api/users/{agent.ID_usuario}', json={'nombre': 'Admin '}, headers=auth_headers)
+    assert response.get_json() == {'error': 'Username already exists'}
+
+    response = client.put(f'/api/users/{agent.ID_usuario}', json={'email': 'agente@test.com'}, headers=auth_headers)
+    assert response.status_code == 200
+    entry = LogTransaccional.query.filter(LogTransaccional.Accion.like('usuario.actualizar%')).one()
+    assert (entry.Accion, entry.Usuario) == (f'usuario.actualizar {agent.ID_usuario}', user.ID_usuario)
+
+
+def test_refreshed_access_token_expires_like_login_token(client, user):
+    """/refresh issues access tokens with the same one-hour lifetime as login."""
+    tokens = user.get_tokens()
+    response = client.post('/api/auth/refresh', headers=_bearer(tokens['refresh_token']))
+    assert response.status_code == 200
+
+    issued = decode_token(tokens['access_token'])
+    refreshed = decode_token(response.get_json()['access_token'])
+    assert refreshed['exp'] - refreshed['iat'] == issued['exp'] - issued['iat'] == 3600
+    assert refreshed['perms'] == issued['perms']
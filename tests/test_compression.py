@@ -0,0 +1,53 @@
+import gzip
+
+import pytest
+
+from tests.test_tickets import _create_tickets
+
+
+def test_gzip_large_json(client, catalogs, auth_headers):
+    """Large JSON bodies are gzipped when the client accepts it."""
+    _create_tickets(50)
+    plain = client.get('/api/tickets/tickets', headers=auth_headers)
+    assert 'Content-Encoding' not in plain.headers
+    
+    response = client.get(
+        '/api/tickets/tickets', headers={**auth_headers, 'Accept-Encoding': 'gzip'}
+    )
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_small_json_not_compressed(client):
+    """Responses under COMPRESS_MIN_SIZE are sent as is."""
+    response = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_gzip_stream(app, client, catalogs, auth_headers):
+    """Streamed NDJSON is compressed chunk by chunk."""
+    app.config['STREAM_CHUNK_SIZE'] = 5
+    _create_tickets(20)
+    plain = client.get('/api/tickets/tickets?stream=1', headers=auth_headers)
+    
+    response = client.get(
+        '/api/tickets/tickets?stream=1',
+        headers={**auth_headers, 'Accept-Encoding': 'gzip'}
+    )
+    assert response.is_streamed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_brotli_preferred(client, catalogs, auth_headers):
+    """Brotli is used when installed and accepted."""
+    brotli = pytest.importorskip('brotli')
+    _create_tickets(50)
+    plain = client.get('/api/tickets/tickets', headers=auth_headers)
+    
+    response = client.get(
+        '/api/tickets/tickets', headers={**auth_headers, 'Accept-Encoding': 'gzip, br'}
+    )
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == plain.data
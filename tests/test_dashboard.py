@@ -0,0 +1,93 @@
+from app import db
+from app.models import Tiquet, TiquetContador, TiquetResumenDiario
+from app.services.ticket_stats import rebuild_counters, rebuild_rollups
+
+from tests.test_tickets import _create_tickets
+
+
+def _stats(client, headers):
+    return client.get('/api/tickets/dashboard/stats', headers=headers).get_json()['data']
+
+
+def test_dashboard_follows_ticket_writes(client, catalogs, auth_headers):
+    """Counters are maintained by create, update, close and delete."""
+    for criticidad in (1, 1, 2):
+        client.post('/api/tickets/tickets', json={
+            'Descripcion': 'x', 'Estado': 1, 'Criticidad': criticidad
+        }, headers=auth_headers)
+    ids = [t.Id_Tiquet for t in Tiquet.query.order_by(Tiquet.Id_Tiquet)]
+    
+    client.put(f'/api/tickets/tickets/{ids[0]}', json={'Criticidad': 2}, headers=auth_headers)
+    client.put(f'/api/tickets/tickets/{ids[1]}/close', headers=auth_headers)
+    client.delete(f'/api/tickets/tickets/{ids[2]}', headers=auth_headers)
+    
+    stats = _stats(client, auth_headers)
+    assert stats['total_tickets'] == 2
+    assert stats['tickets_abiertos'] == 1
+    assert stats['tickets_cerrados'] == 1
+    assert stats['tickets_por_estado'] == [
+        {'estado': 'Abierto', 'cantidad': 1},
+        {'estado': 'Cerrado', 'cantidad': 1},
+    ]
+    assert stats['tickets_por_criticidad'] == [
+        {'criticidad': 'Baja', 'cantidad': 1},
+        {'criticidad': 'Alta', 'cantidad': 1},
+    ]
+    assert rebuild_counters() == []
+
+
+def test_rebuild_counters(client, catalogs, auth_headers):
+    """Reconciliation recomputes counters written outside the API."""
+    _create_tickets(4)
+    assert TiquetContador.query.count() == 0
+    
+    differences = rebuild_counters()
+    db.session.commit()
+    assert ('estado', 1, 0, 4) in differences
+    assert _stats(client, auth_headers)['total_tickets'] == 4
+
+
+def test_timeseries_from_rollups(client, catalogs, auth_headers):
+    """Daily opened/closed counts and backlog come from the rollup table."""
+    for fecha, estado in (('28-02-2025', 1), ('01-03-2025', 1), ('01-03-2025', 2), ('03-03-2025', 1)):
+        client.post('/api/tickets/tickets', json={
+            'Descripcion': 'x', 'Estado': estado, 'fecha_apertura_input': fecha
+        }, headers=auth_headers)
+    ticket = Tiquet.query.filter_by(Estado=2).one()
+    client.put(f'/api/tickets/tickets/{ticket.Id_Tiquet}', json={'Estado': 1}, headers=auth_headers)
+    
+    response = client.get(
+        '/api/tickets/dashboard/timeseries?from=2025-03-01&to=2025-03-03', headers=auth_headers
+    )
+    data = response.get_json()['data']
+    assert [serie['nombre'] for serie in data['series']] == ['Total']
+    assert data['series'][0]['puntos'] == [
+        {'fecha': '01-03-2025', 'abiertos': 2, 'cerrados': 0, 'backlog': 3},
+        {'fecha': '02-03-2025', 'abiertos': 0, 'cerrados': 0, 'backlog': 3},
+        {'fecha': '03-03-2025', 'abiertos': 1, 'cerrados': 0, 'backlog': 4},
+    ]
+    
+    response = client.get(
+        '/api/tickets/dashboard/timeseries?from=01-03-2025&to=01-03-2025&group_by=estado',
+        headers=auth_headers
+    )
+    series = response.get_json()['data']['series']
+    assert [(serie['nombre'], serie['puntos'][0]['abiertos']) for serie in series] == [('Abierto', 2)]
+    
+    rows = {(r.Fecha, r.Estado): (r.Abiertos, r.Cerrados) for r in TiquetResumenDiario.query}
+    assert rebuild_rollups() == len([counts for counts in rows.values() if any(counts)])
+    db.session.commit()
+    assert {
+        (r.Fecha, r.Estado): (r.Abiertos, r.Cerrados) for r in TiquetResumenDiario.query
+    } == {key: counts for key, counts in rows.items() if any(counts)}
+
+
+def test_timeseries_rejects_bad_range(client, catalogs, auth_headers):
+    response = client.get(
+        '/api/tickets/dashboard/timeseries?from=2025-03-02&to=2025-03-01', headers=auth_headers
+    )
+    assert response.status_code == 400
+    response = client.get(
+        '/api/tickets/dashboard/timeseries?group_by=ubicacion', headers=auth_headers
+    )
+    assert response.status_code == 400
@@ -0,0 +1,36 @@
+from datetime import date
+
+from app import db
+from app.models import Tiquet, Ubicaciones
+from app.routes.tickets import TiquetSchema, UbicacionesSchema
+from app.utils.fast_serializer import compile_serializer
+
+
+def test_compiled_serializer_matches_marshmallow(app, catalogs, user):
+    """The compiled function produces exactly what Schema.dump produces."""
+    db.session.add_all([
+        Tiquet(Categoria=1, Ubicacion=1, Criticidad=2, Estado=1,
+               User_asig=user.ID_usuario, Descripcion='Impresora',
+               Tel_ext='1234', Fecha_apertura=date(2025, 3, 1)),
+        Tiquet(Descripcion=None, Fecha_apertura=None),
+    ])
+    db.session.commit()
+    tickets = Tiquet.query.order_by(Tiquet.Id_Tiquet).all()
+    
+    serialize = compile_serializer(TiquetSchema)
+    assert [serialize(t) for t in tickets] == TiquetSchema(many=True).dump(tickets)
+    
+    only = ('Id_Tiquet', 'Estado', 'usuario_asignado')
+    serialize = compile_serializer(TiquetSchema, only)
+    assert serialize(tickets[0]) == TiquetSchema(only=only).dump(tickets[0])
+
+
+def test_compiled_serializer_on_rows(app, catalogs):
+    """Row tuples are serialized like ORM objects; missing attributes are skipped."""
+    rows = db.session.execute(
+        db.select(Ubicaciones.Id_ubicacion, Ubicaciones.Nombre)
+    ).all()
+    
+    serialize = compile_serializer(UbicacionesSchema)
+    assert [serialize(row) for row in rows] == UbicacionesSchema(many=True).dump(rows)
+    assert serialize(rows[0]) == {'Id_ubicacion': 1, 'Nombre': 'Oficina central'}
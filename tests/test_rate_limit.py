@@ -0,0 +1,76 @@
+from app.models import Usuario
+from app.utils.rate_limit import MemoryBackend, SQLiteBackend, rate_limiter
+
+
+def _login(client, email, ip='10.0.0.1'):
+    return client.post(
+        '/api/auth/login', json={'email': email, 'password': 'incorrecta'},
+        environ_base={'REMOTE_ADDR': ip}
+    )
+
+
+def test_login_is_limited_per_email_before_hashing(client, app, user, monkeypatch):
+    """Rejected logins return 429 and never reach the password check."""
+    app.config['RATE_LIMIT_LOGIN_EMAIL'] = '2/60'
+    checks = []
+    original = Usuario.check_password
+    monkeypatch.setattr(Usuario, 'check_password', lambda self, pw: checks.append(pw) or original(self, pw))
+
+    statuses = [_login(client, 'admin@test.com', ip=f'10.0.0.{i}').status_code for i in range(4)]
+    assert statuses == [401, 401, 429, 429]
+    assert len(checks) == 2
+
+    response = _login(client, 'ADMIN@test.com ', ip='10.0.0.9')
+    assert response.status_code == 429
+    assert 1 <= int(response.headers['Retry-After']) <= 30
+
+    # Another account from the same addresses is not affected
+    assert _login(client, 'otro@test.com', ip='10.0.0.1').status_code == 401
+    stats = rate_limiter.stats()
+    assert stats['rejected'] == 3
+    assert stats['rejected_local'] == 2
+
+
+def test_login_is_limited_per_ip(client, app):
+    """One address cannot spray many accounts."""
+    app.config['RATE_LIMIT_LOGIN_IP'] = '3/60'
+    statuses = [_login(client, f'usuario{i}@test.com').status_code for i in range(4)]
+    assert statuses == [401, 401, 401, 429]
+    assert _login(client, 'usuario9@test.com', ip='10.0.0.2').status_code == 401
+
+
+def test_buckets_refill_over_time():
+    """A bucket gives back one token every seconds/capacity."""
+    backend = MemoryBackend()
+    rules = [('k', 2, 10)]
+    assert backend.take(rules, 0) == [0]
+    assert backend.take(rules, 0) == [0]
+    assert backend.take(rules, 1) == [4.0]
+    assert backend.take(rules, 5) == [0]
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    """Two backends on the same file draw from the same buckets."""
+    path = str(tmp_path / 'ratelimit.sqlite3')
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+    rules = [('login:ip:10.0.0.1', 3, 60), ('login:email:a@test.com', 5, 60)]
+
+    results = [backend.take(rules, 100.0) for backend in (first, second, first, second)]
+    assert results[:3] == [[0, 0]] * 3
+    assert results[3][0] > 0 and results[3][1] == 0
+    # Nothing was taken from the email bucket by the rejected request
+    assert second.take([rules[1]], 100.0) == [0]
+    assert second.take([rules[1]], 100.0) == [0]
+    assert second.take([rules[1]], 100.0)[0] > 0
+
+
+def test_sqlite_file_is_created_on_first_limited_request(app, client, tmp_path):
+    """Creating the app (CLI commands) does not touch the limiter's file."""
+    path = tmp_path / 'ratelimit.sqlite3'
+    app.config.update(RATE_LIMIT_BACKEND='sqlite', RATE_LIMIT_PATH=str(path))
+    rate_limiter.init_app(app)
+    assert not path.exists()
+
+    assert _login(client, 'usuario@test.com').status_code == 401
+    assert path.exists()
+    assert rate_limiter.stats()['backend'] == 'SQLiteBackend'
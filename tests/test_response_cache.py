@@ -0,0 +1,56 @@
+import threading
+import time
+
+from flask import jsonify
+
+from app.utils.response_cache import response_cache
+
+
+def test_dashboard_is_cached_until_ticket_write(client, catalogs, auth_headers):
+    """Dashboard hits are served from memory and writes invalidate them."""
+    client.get('/api/tickets/dashboard/stats', headers=auth_headers)
+    cached = client.get('/api/tickets/dashboard/stats', headers=auth_headers)
+    assert cached.get_json()['data']['total_tickets'] == 0
+    
+    stats = client.get('/metrics', headers=auth_headers).get_json()['response_cache']
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    
+    client.post('/api/tickets/tickets', json={'Estado': 1}, headers=auth_headers)
+    fresh = client.get('/api/tickets/dashboard/stats', headers=auth_headers)
+    assert fresh.get_json()['data']['total_tickets'] == 1
+
+
+def test_concurrent_requests_share_one_computation(app):
+    """Identical concurrent requests run the view once."""
+    calls = []
+    release = threading.Event()
+    
+    @app.route('/slow')
+    @response_cache.cached(ttl=60)
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return jsonify({'value': len(calls)})
+    
+    results = []
+    
+    def fetch():
+        with app.test_client() as client:
+            results.append(client.get('/slow').get_json())
+    
+    threads = [threading.Thread(target=fetch) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    with app.test_request_context():
+        while response_cache.stats()['coalesced'] < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert results == [{'value': 1}] * 5
+    with app.test_request_context():
+        assert response_cache.stats()['coalesced'] == 4
@@ -0,0 +1,493 @@
+import json
+import re
+from datetime import date
+
+from app import db
+from app.models import Comentarios, EstadoTiquet, LogTransaccional, Tiquet
+from app.routes.tickets import TICKET_SORTS
+from app.services.catalog_cache import CATALOGS, catalog_cache
+from app.services.principals import principals
+from app.services.ticket_stats import rebuild_counters
+from app.services.token_revocation import token_revocation
+
+
+def _create_tickets(n, user_id=None):
+    for i in range(n):
+        db.session.add(Tiquet(
+            Categoria=1 + i % 2,
+            Ubicacion=1,
+            Criticidad=1 + i % 2,
+            Estado=1,
+            User_asig=user_id,
+            Descripcion=f'Ticket {i}',
+            Fecha_apertura=date(2025, 1, 1 + i % 5)
+        ))
+    db.session.commit()
+
+
+def _touches_tiquet(statement):
+    return re.search(r'(INTO|FROM|UPDATE) "Tiquet"\s', statement) is not None
+
+
+def test_list_tickets_legacy_shape(client, catalogs, auth_headers):
+    """Without pagination parameters the whole list is returned."""
+    _create_tickets(3)
+    response = client.get('/api/tickets/tickets', headers=auth_headers)
+    assert response.status_code == 200
+    
+    data = response.get_json()
+    assert data['total'] == 3
+    assert data['data'][0]['categoria_rel']['Nombre'] == 'Hardware'
+
+
+def test_list_tickets_keyset_pagination(client, catalogs, auth_headers):
+    """Walking the cursor visits every ticket once in key order."""
+    _create_tickets(12)
+    db.session.add_all([Tiquet(Fecha_apertura=None), Tiquet(Fecha_apertura=None)])
+    db.session.commit()
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/tickets/tickets?limit=5'
+        if cursor:
+            url += f'&cursor={cursor}'
+        data = client.get(url, headers=auth_headers).get_json()
+        assert data['limit'] == 5
+        seen.extend(t['Id_Tiquet'] for t in data['data'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    
+    expected = [
+        t.Id_Tiquet for t in
+        Tiquet.query.order_by(Tiquet.Fecha_apertura, Tiquet.Id_Tiquet)
+    ]
+    assert seen == expected
+
+
+def test_keyset_pagination_descending_with_nulls(client, catalogs, auth_headers, statements):
+    """NULLs sort lowest in both directions, with the order spelled out in SQL."""
+    _create_tickets(6)
+    db.session.add_all([Tiquet(Fecha_apertura=None), Tiquet(Fecha_apertura=None)])
+    db.session.commit()
+    
+    statements.clear()
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/tickets/tickets?limit=3&sort=-Fecha_apertura'
+        if cursor:
+            url += f'&cursor={cursor}'
+        data = client.get(url, headers=auth_headers).get_json()
+        seen.extend(t['Id_Tiquet'] for t in data['data'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    
+    expected = sorted(
+        Tiquet.query.all(),
+        key=lambda t: (t.Fecha_apertura is not None, t.Fecha_apertura or date.min, t.Id_Tiquet),
+        reverse=True
+    )
+    assert seen == [t.Id_Tiquet for t in expected]
+    assert any('"Fecha_apertura" DESC NULLS LAST' in s for s in statements)
+
+
+def test_every_sort_has_a_matching_index():
+    """Each ?sort= key is backed by an index on (field, Id_Tiquet)."""
+    indexes = {tuple(c.name for c in index.columns) for index in Tiquet.__table__.indexes}
+    for column in TICKET_SORTS.values():
+        if column is not Tiquet.Id_Tiquet:
+            assert (column.key, 'Id_Tiquet') in indexes
+
+
+def test_list_tickets_invalid_cursor(client, catalogs, auth_headers):
+    """A tampered cursor is rejected."""
+    response = client.get('/api/tickets/tickets?cursor=bogus', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_list_tickets_ndjson_stream(app, client, catalogs, auth_headers):
+    """Streaming mode emits one JSON document per line in chunks."""
+    app.config['STREAM_CHUNK_SIZE'] = 4
+    _create_tickets(10)
+    
+    response = client.get(
+        '/api/tickets/tickets',
+        headers={**auth_headers, 'Accept': 'application/x-ndjson'}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 10
+    assert '"Nombre":"Hardware"' in lines[0]
+    
+    stream = client.get('/api/tickets/tickets?stream=1', headers=auth_headers)
+    assert stream.get_data(as_text=True) == response.get_data(as_text=True)
+    
+    # Pagination parameters do not apply to a stream
+    assert client.get('/api/tickets/tickets?stream=1&limit=2', headers=auth_headers).status_code == 400
+
+
+def test_stream_comment_count_across_chunks(app, client, catalogs, user, auth_headers, statements):
+    """comment_count comes from the streamed SELECT, not a query per chunk."""
+    app.config['STREAM_CHUNK_SIZE'] = 2
+    _create_tickets(5)
+    ids = [t.Id_Tiquet for t in Tiquet.query.order_by(Tiquet.Id_Tiquet)]
+    for n, ticket_id in enumerate(ids):
+        for i in range(n):
+            db.session.add(Comentarios(Id_Tiquet=ticket_id, usuario=user.ID_usuario, mensaje=f'C{i}'))
+    db.session.commit()
+    
+    statements.clear()
+    response = client.get(
+        '/api/tickets/tickets?stream=1&sort=Id_Tiquet&include=comment_count', headers=auth_headers
+    )
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(t['Id_Tiquet'], t['comment_count']) for t in lines] == [(i, n) for n, i in enumerate(ids)]
+    assert len([s for s in statements if 'FROM "Comentarios"' in s]) == 1
+
+
+def test_stream_does_not_reload_catalogs_mid_cursor(app, client, catalogs, auth_headers, statements):
+    """Catalogs are read before the stream starts, even when their TTL is over."""
+    app.config['STREAM_CHUNK_SIZE'] = 2
+    app.config['CATALOG_CACHE_TTL'] = 0
+    _create_tickets(5)
+    
+    statements.clear()
+    response = client.get('/api/tickets/tickets?stream=1', headers=auth_headers)
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 5 and '"Nombre":"Hardware"' in lines[0]
+    streamed = next(i for i, s in enumerate(statements) if _touches_tiquet(s))
+    assert statements[streamed + 1:] == []
+
+
+def test_catalog_miss_reloads_once_per_interval(app, client, catalogs, auth_headers, statements):
+    """A state created in another worker shows up without waiting for the TTL."""
+    app.config['CATALOG_MISS_RELOAD'] = 0
+    catalog_cache.all('estados')
+    db.session.add(EstadoTiquet(ID_estado=3, Nombre='En curso'))
+    db.session.add(Tiquet(Estado=3, Descripcion='Nuevo estado'))
+    db.session.commit()
+    
+    data = client.get('/api/tickets/tickets?include=estado_rel', headers=auth_headers).get_json()['data']
+    assert data[0]['estado_rel']['Nombre'] == 'En curso'
+    
+    app.config['CATALOG_MISS_RELOAD'] = 60
+    statements.clear()
+    assert catalog_cache.get('estados', 999) is None
+    assert catalog_cache.get('estados', 999) is None
+    assert not [s for s in statements if 'FROM "Estado_tiquet"' in s]
+
+
+def test_stream_resolves_assignee_in_the_same_select(app, client, catalogs, user, auth_headers, statements):
+    """Assignees are joined into the streamed SELECT; no query runs mid-cursor."""
+    app.config['STREAM_CHUNK_SIZE'] = 2
+    user_id = user.ID_usuario
+    _create_tickets(3, user_id=user_id)
+    _create_tickets(1)
+    
+    statements.clear()
+    response = client.get('/api/tickets/tickets?stream=1&sort=Id_Tiquet', headers=auth_headers)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [t['usuario_asignado'] for t in lines] == [
+        {'ID_usuario': user_id, 'Nombre': 'Admin', 'ID_Rol': 1}
+    ] * 3 + [None]
+    streamed = next(i for i, s in enumerate(statements) if _touches_tiquet(s))
+    assert statements[streamed + 1:] == []
+
+
+def test_list_tickets_filters_and_sort(client, catalogs, user, auth_headers):
+    """Filters are applied in SQL and sort is whitelisted."""
+    _create_tickets(10, user_id=user.ID_usuario)
+    _create_tickets(4)
+    
+    data = client.get(
+        '/api/tickets/tickets?categoria=1&criticidad=1,2'
+        f'&user_asig={user.ID_usuario}&fecha_desde=02-01-2025&sort=-Fecha_apertura',
+        headers=auth_headers
+    ).get_json()
+    fechas = [t['Fecha_apertura'] for t in data['data']]
+    assert data['total'] == 4
+    assert all(t['Categoria'] == 1 for t in data['data'])
+    assert fechas[0].startswith('Sun, 05 Jan 2025')
+    
+    paged = client.get(
+        '/api/tickets/tickets?categoria=1&limit=2&sort=-Fecha_apertura'
+        f'&user_asig={user.ID_usuario}&fecha_desde=02-01-2025',
+        headers=auth_headers
+    ).get_json()
+    assert [t['Id_Tiquet'] for t in paged['data']] == [
+        t['Id_Tiquet'] for t in data['data']
+    ][:2]
+    
+    response = client.get('/api/tickets/tickets?sort=Descripcion', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_list_tickets_sparse_fieldset(app, client, catalogs, auth_headers):
+    """Only the requested columns and relations are loaded and returned."""
+    _create_tickets(3)
+    
+    data = client.get(
+        '/api/tickets/tickets?fields=Id_Tiquet,Estado&include=estado_rel',
+        headers=auth_headers
+    ).get_json()
+    assert set(data['data'][0]) == {'Id_Tiquet', 'Estado', 'estado_rel'}
+    assert data['data'][0]['estado_rel']['Nombre'] == 'Abierto'
+    
+    paged = client.get(
+        '/api/tickets/tickets?fields=Estado&limit=2', headers=auth_headers
+    ).get_json()
+    assert set(paged['data'][0]) == {'Estado'}
+    assert paged['next_cursor']
+    
+    ticket_id = data['data'][0]['Id_Tiquet']
+    single = client.get(
+        f'/api/tickets/tickets/{ticket_id}?include=categoria_rel', headers=auth_headers
+    ).get_json()
+    assert 'Descripcion' in single['data']
+    assert 'estado_rel' not in single['data']
+    
+    response = client.get('/api/tickets/tickets?fields=password', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_list_tickets_resolves_catalogs_from_cache(client, catalogs, user, auth_headers, statements):
+    """Catalog relations come from the in-process cache and assignees from one batched query."""
+    user_id = user.ID_usuario
+    _create_tickets(2, user_id=user_id)
+    client.get('/api/tickets/tickets', headers=auth_headers)
+    
+    statements.clear()
+    data = client.get('/api/tickets/tickets', headers=auth_headers).get_json()
+    assert data['data'][0]['estado_rel'] == {
+        'ID_estado': 1, 'Nombre': 'Abierto', 'Descripcion': None
+    }
+    assert data['data'][0]['usuario_asignado'] == {'ID_usuario': user_id, 'Nombre': 'Admin', 'ID_Rol': 1}
+    assert len(statements) == 3
+    assert 'Estado_tiquet' not in statements[0]
+    assert 'Usuario' not in statements[0]
+    assert 'GROUP BY "Comentarios"."Id_Tiquet"' in statements[1]
+    assert 'FROM "Usuario"' in statements[2] and ' IN ' in statements[2]
+
+
+def test_ticket_writes_do_not_reread(client, catalogs, user, auth_headers, statements):
+    """Create and close build their responses from the written row."""
+    user_id = user.ID_usuario
+    for name in CATALOGS:
+        catalog_cache.all(name)
+    principals.get(user_id)
+    token_revocation.is_revoked('')
+    
+    statements.clear()
+    response = client.post('/api/tickets/tickets', json={
+        'Descripcion': 'Sin red', 'Estado': 1, 'User_asig': user_id
+    }, headers=auth_headers)
+    data = response.get_json()['data']
+    assert data['estado_rel']['Nombre'] == 'Abierto'
+    assert data['usuario_asignado']['Nombre'] == 'Admin'
+    tiquet = [s for s in statements if _touches_tiquet(s)]
+    assert len(tiquet) == 1 and tiquet[0].startswith('INSERT INTO "Tiquet"')
+    # Only the assignee is read, by id, with its public columns
+    selects = [s for s in statements if s.startswith('SELECT')]
+    assert len(selects) == 1 and 'FROM "Usuario"' in selects[0] and 'password' not in selects[0]
+    
+    statements.clear()
+    client.put(f'/api/tickets/tickets/{data["Id_Tiquet"]}/close', headers=auth_headers)
+    tiquet = [s.split()[0] for s in statements if _touches_tiquet(s)]
+    assert tiquet == ['SELECT', 'UPDATE']
+
+
+def test_update_categoria_invalidates_cache(client, catalogs, auth_headers):
+    """Catalog writes are visible to the next ticket read."""
+    _create_tickets(1)
+    client.get('/api/tickets/tickets', headers=auth_headers)
+    
+    client.put('/api/tickets/categorias/1', json={'Nombre': 'Equipos'}, headers=auth_headers)
+    data = client.get('/api/tickets/tickets', headers=auth_headers).get_json()
+    assert data['data'][0]['categoria_rel']['Nombre'] == 'Equipos'
+
+
+def test_close_ticket(client, catalogs, auth_headers):
+    """Closing resolves the closed state from the catalog cache."""
+    _create_tickets(1)
+    ticket_id = Tiquet.query.first().Id_Tiquet
+    
+    data = client.put(f'/api/tickets/tickets/{ticket_id}/close', headers=auth_headers).get_json()
+    assert data['status'] == 'success'
+    assert data['data']['Estado'] == 2
+    assert data['data']['Estado_nombre'] == 'Cerrado'
+    
+    again = client.put(f'/api/tickets/tickets/{ticket_id}/close', headers=auth_headers).get_json()
+    assert again['status'] == 'warning'
+
+
+def test_create_tickets_in_bulk(client, catalogs, auth_headers, statements):
+    """Bulk creation validates every item and inserts them in one batch."""
+    payload = [
+        {'Descripcion': f'Alerta {i}', 'Estado': 1, 'Criticidad': 2, 'fecha_apertura_input': '15-01-2025'}
+        for i in range(3)
+    ]
+    response = client.post('/api/tickets/tickets/bulk', json=payload, headers=auth_headers)
+    assert response.status_code == 201
+    ids = response.get_json()['data']['ids']
+    assert ids == sorted(ids) and len(ids) == 3
+    assert len([s for s in statements if s.startswith('INSERT INTO "Tiquet"')]) == 1
+    assert [t.Descripcion for t in Tiquet.query.order_by(Tiquet.Id_Tiquet)] == ['Alerta 0', 'Alerta 1', 'Alerta 2']
+    assert {t.Fecha_apertura for t in Tiquet.query} == {date(2025, 1, 15)}
+    assert rebuild_counters() == []
+    
+    response = client.post('/api/tickets/tickets/bulk', json={'tickets': [{'Estado': 'x'}]}, headers=auth_headers)
+    assert response.status_code == 400
+    response = client.post('/api/tickets/tickets/bulk', json=['a', 'b'], headers=auth_headers)
+    assert response.status_code == 400
+    assert Tiquet.query.count() == 3
+
+
+def test_update_tickets_in_bulk(client, catalogs, user, auth_headers, statements):
+    """A filter plus a whitelisted patch runs as one UPDATE."""
+    _create_tickets(4, user_id=user.ID_usuario)
+    _create_tickets(1)
+    rebuild_counters()
+    db.session.commit()
+    
+    statements.clear()
+    response = client.put('/api/tickets/tickets/bulk', json={
+        'filter': {'user_asig': user.ID_usuario, 'criticidad': 1},
+        'patch': {'User_asig': None, 'Criticidad': 2}
+    }, headers=auth_headers)
+    assert response.get_json()['data'] == {'affected': 2}
+    assert len([s for s in statements if s.startswith('UPDATE "Tiquet"')]) == 1
+    logged = LogTransaccional.query.filter_by(Accion='tiquet.actualizar_masivo')
+    assert sorted(e.Tiquet for e in logged) == [1, 3]
+    assert Tiquet.query.filter_by(User_asig=None).count() == 3
+    assert Tiquet.query.filter_by(Criticidad=2).count() == 4
+    assert rebuild_counters() == []
+    
+    response = client.put('/api/tickets/tickets/bulk', json={
+        'filter': {}, 'patch': {'Estado': 2}
+    }, headers=auth_headers)
+    assert response.status_code == 400
+    response = client.put('/api/tickets/tickets/bulk', json={
+        'ids': [1], 'patch': {'Descripcion': 'x'}
+    }, headers=auth_headers)
+    assert response.status_code == 400
+    for body in ([1], {'ids': [1], 'patch': [1]}, {'filter': {'fecha_desde': 5}, 'patch': {'Estado': 2}}):
+        assert client.put('/api/tickets/tickets/bulk', json=body, headers=auth_headers).status_code == 400
+
+
+def test_search_tickets(client, catalogs, auth_headers):
+    """Full-text search ranks matches and follows inserts and updates."""
+    client.post('/api/tickets/tickets/bulk', json=[
+        {'Descripcion': 'La impresora no imprime'},
+        {'Descripcion': 'Sin acceso a la red'},
+        {'Descripcion': 'Impresora atascada, impresora sin tóner'},
+    ], headers=auth_headers)
+    
+    data = client.get('/api/tickets/tickets/search?q=impresora', headers=auth_headers).get_json()
+    assert data['total'] == 2
+    assert [t['Descripcion'] for t in data['data']][0] == 'Impresora atascada, impresora sin tóner'
+    
+    data = client.get('/api/tickets/tickets/search?q=impresora toner&per_page=1', headers=auth_headers).get_json()
+    assert data['total'] == 1 and data['per_page'] == 1
+    
+    ticket_id = Tiquet.query.filter_by(Descripcion='Sin acceso a la red').one().Id_Tiquet
+    client.put(f'/api/tickets/tickets/{ticket_id}', json={'Descripcion': 'Impresora de red caída'}, headers=auth_headers)
+    data = client.get('/api/tickets/tickets/search?q=red impre', headers=auth_headers).get_json()
+    assert [t['Id_Tiquet'] for t in data['data']] == [ticket_id]
+    
+    response = client.get('/api/tickets/tickets/search?q=%22*', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_ticket_comments(client, catalogs, user, auth_headers, statements):
+    """Comments paginate by cursor and pages carry a batched comment_count."""
+    _create_tickets(2)
+    ticket_id = Tiquet.query.order_by(Tiquet.Id_Tiquet).first().Id_Tiquet
+    for i in range(3):
+        response = client.post(f'/api/tickets/tickets/{ticket_id}/comentarios', json={
+            'mensaje': f'Comentario {i}', 'Tipo': 'tecnico'
+        }, headers=auth_headers)
+        assert response.status_code == 201
+    assert response.get_json()['data']['usuario_rel']['Nombre'] == 'Admin'
+    
+    url = f'/api/tickets/tickets/{ticket_id}/comentarios?limit=2'
+    first = client.get(url, headers=auth_headers).get_json()
+    second = client.get(f"{url}&cursor={first['next_cursor']}", headers=auth_headers).get_json()
+    assert [c['mensaje'] for c in first['data'] + second['data']] == [
+        'Comentario 0', 'Comentario 1', 'Comentario 2'
+    ]
+    assert second['next_cursor'] is None
+    
+    statements.clear()
+    data = client.get('/api/tickets/tickets?limit=10', headers=auth_headers).get_json()['data']
+    assert [t['comment_count'] for t in data] == [3, 0]
+    assert len([s for s in statements if 'FROM "Comentarios"' in s]) == 1
+    
+    # The full list only counts the comments of the filtered tickets
+    statements.clear()
+    data = client.get(
+        '/api/tickets/tickets?categoria=1&fields=Id_Tiquet&include=comment_count', headers=auth_headers
+    ).get_json()['data']
+    assert data == [{'Id_Tiquet': ticket_id, 'comment_count': 3}]
+    counts = [s for s in statements if 'FROM "Comentarios"' in s]
+    assert len(counts) == 1 and 'FROM "Tiquet"' in counts[0]
+    
+    assert client.get('/api/tickets/tickets/999/comentarios', headers=auth_headers).status_code == 404
+    response = client.post(f'/api/tickets/tickets/{ticket_id}/comentarios', json={'mensaje': ''}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_close_tickets_in_bulk(client, catalogs, auth_headers, statements):
+    """Bulk close reports per-id results and issues a single UPDATE."""
+    _create_tickets(3)
+    rebuild_counters()
+    db.session.commit()
+    ids = [t.Id_Tiquet for t in Tiquet.query.order_by(Tiquet.Id_Tiquet)]
+    client.put(f'/api/tickets/tickets/{ids[0]}/close', headers=auth_headers)
+    client.get('/api/tickets/estados', headers=auth_headers)
+    
+    statements.clear()
+    response = client.put('/api/tickets/tickets/close', json={'ids': ids + [999]}, headers=auth_headers)
+    data = response.get_json()['data']
+    assert data['resumen'] == {'closed': 2, 'already_closed': 1, 'not_found': 1}
+    assert [r['resultado'] for r in data['resultados']] == [
+        'already_closed', 'closed', 'closed', 'not_found'
+    ]
+    assert len([s for s in statements if s.startswith('UPDATE "Tiquet"')]) == 1
+    assert {t.Estado for t in Tiquet.query} == {2}
+    
+    assert rebuild_counters() == []
+    
+    response = client.put('/api/tickets/tickets/close', json={'ids': []}, headers=auth_headers)
+    assert response.status_code == 400
+    response = client.put('/api/tickets/tickets/close', json=[1], headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_catalog_conditional_get(client, catalogs, auth_headers, statements):
+    """Catalogs carry a content ETag and revalidate without touching the database."""
+    response = client.get('/api/tickets/estados', headers=auth_headers)
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    assert 'max-age' in response.headers['Cache-Control']
+    assert [e['Nombre'] for e in response.get_json()['data']] == ['Abierto', 'Cerrado']
+    
+    statements.clear()
+    cached = client.get(
+        '/api/tickets/estados', headers={**auth_headers, 'If-None-Match': etag}
+    )
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+    assert statements == []
+    
+    first = client.get('/api/tickets/categorias', headers=auth_headers).headers['ETag']
+    client.post('/api/tickets/categorias', json={'Nombre': 'Redes'}, headers=auth_headers)
+    changed = client.get(
+        '/api/tickets/categorias', headers={**auth_headers, 'If-None-Match': first}
+    )
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != first